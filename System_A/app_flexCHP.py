@@ -65,16 +65,21 @@ from oemof.tools import helpers
 
 import oemof.solph as solph
 import oemof.outputlib as outputlib
-import oemof.graph as grph
-import networkx as nx
 
 import logging
 import os
+import sys
 import pandas as pd
 import pprint as pp
 import timeit
 start_time = timeit.default_timer()
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from oemof_heat_tools import (solve_model, solver_options_from_parameters,
+                              solve_quick_look, relaxation_summary, ModelModifier,
+                              create_timeindex, resample, scale_capacity_loss,
+                              hours_per_step, read_time_series)
+
 try:
     import matplotlib.pyplot as plt
 except ImportError:
@@ -82,9 +87,14 @@ except ImportError:
 
 solver = 'cbc'
 debug = False  # Set number_of_timesteps to 3 to get a readable lp-file.
-number_of_time_steps = 8760  # 24*7*8  # 8 weeks, every hour
-periods = number_of_time_steps
+number_of_time_steps = 8760  # 24*7*8  # 8 weeks, in hours
+resolution = 'H'  # '15min', 'H', '2H' or 'D'
+shared_inputs = False  # parallel runs on one machine share the parsed demand profile (oemof_heat_tools/inputs.py)
 solver_verbose = False  # show/hide solver output
+quick_look = False  # solve the LP relaxation of the MILP (GenericCHP) first and report it
+screening = False  # together with quick_look: keep the relaxation and skip the MILP
+storage_sweep = None  # (nom_capacity_storage_th, nom_capacity_storage_el) pairs solved on the same model,
+                      # e.g. [(250, 50), (1000, 50), (1000, 100)]
 
 # initiate the logger (see the API docs for more information)
 logger.define_logging(logfile='flex_CHB_A1.log',
@@ -92,8 +102,8 @@ logger.define_logging(logfile='flex_CHB_A1.log',
                       file_level=logging.DEBUG)
 
 logging.info('Initialize the energy system')
-date_time_index = pd.date_range('1/1/2030', periods=number_of_time_steps,
-                                freq='H')
+date_time_index = create_timeindex('1/1/2030', number_of_time_steps, resolution)
+periods = len(date_time_index)
 
 energysystem = solph.EnergySystem(timeindex=date_time_index)
 
@@ -103,7 +113,10 @@ try:
 except:
     print('ERROR: __file__ is not defined')
     filename = 'demand_profile_A_nominal_20180912.csv'
-data = pd.read_csv(filename)
+data = read_time_series(filename, shared=shared_inputs)
+if hours_per_step(resolution) != 1:
+    # hourly data is used as read, without a copy of the shared data
+    data = resample(data, resolution, start='1/1/2030').reset_index(drop=True)
 
 ##########################################################################
 # Read parameter values from data file
@@ -207,7 +220,7 @@ storage_th = solph.components.GenericStorage(
                             variable_costs=param_value['var_costs_input_bth_storage_th'])},
     outputs={bth: solph.Flow(nominal_value=param_value['nom_val_output_bth_storage_th'],
                              variable_costs=param_value['var_costs_output_bth_storage_th'])},
-    capacity_loss=param_value['capacity_loss_storage_th'],
+    capacity_loss=scale_capacity_loss(param_value['capacity_loss_storage_th'], resolution),
     initial_capacity=param_value['init_capacity_storage_th'],
     inflow_conversion_factor=param_value['inflow_conv_factor_storage_th'],
     outflow_conversion_factor=param_value['outflow_conv_factor_storage_th'])
@@ -219,7 +232,7 @@ storage_el = solph.components.GenericStorage(
                             variable_costs=param_value['var_costs_input_bel_storage_el'])},
     outputs={bel: solph.Flow(nominal_value=param_value['nom_val_output_bel_storage_el'],
                              variable_costs=param_value['var_costs_output_bel_storage_el'])},
-    capacity_loss=param_value['capacity_loss_storage_el'],
+    capacity_loss=scale_capacity_loss(param_value['capacity_loss_storage_el'], resolution),
     initial_capacity=param_value['init_capacity_storage_el'],
     inflow_conversion_factor=param_value['inflow_conv_factor_storage_el'],
     outflow_conversion_factor=param_value['outflow_conv_factor_storage_el'])
@@ -242,15 +255,46 @@ if debug:
 
 # if tee_switch is true solver messages will be displayed
 logging.info('Solve the optimization problem')
-model.solve(solver=solver, solve_kwargs={'tee': solver_verbose})
+if quick_look:
+    relaxation, milp_solved = solve_quick_look(
+        model, solver=solver, options=solver_options_from_parameters(param_value),
+        tee=solver_verbose, skip_milp=(lambda relaxation: screening))
+    print('********* LP relaxation *********')
+    print(relaxation_summary(relaxation))
+else:
+    solve_model(model, solver=solver,
+                options=solver_options_from_parameters(param_value),
+                tee=solver_verbose)
+    milp_solved = True
 
 logging.info('Store the energy system with the results.')
 
-energysystem.results['main'] = outputlib.processing.results(model)
-energysystem.results['meta'] = outputlib.processing.meta_results(model)
+if milp_solved:
+    energysystem.results['main'] = outputlib.processing.results(model)
+    energysystem.results['meta'] = outputlib.processing.meta_results(model)
+else:
+    energysystem.results['main'] = relaxation['main']
+    energysystem.results['meta'] = {'objective': relaxation['objective'],
+                                    'relaxation': True}
 
 energysystem.dump(dpath="dumps", filename="flexCHB_A1_dumps.oemof")
 
+# Storage sweep: modify the built model instead of building it again
+if storage_sweep is not None:
+    modifier = ModelModifier(model, solver=solver,
+                             options=solver_options_from_parameters(param_value),
+                             tee=solver_verbose)
+    for capacity_th, capacity_el in storage_sweep:
+        logging.info('Solve with storage capacities {0} MWh_th, {1} MWh_el'.format(
+            capacity_th, capacity_el))
+        modifier.set_storage_capacity('storage_th', capacity_th)
+        modifier.set_storage_capacity('storage_el', capacity_el)
+        modifier.solve()
+        energysystem.results['main'] = outputlib.processing.results(model)
+        energysystem.results['meta'] = outputlib.processing.meta_results(model)
+        energysystem.dump(dpath="dumps", filename="flexCHB_A1_dumps_storage_{0}_{1}.oemof".format(
+            capacity_th, capacity_el))
+
 stop_time = timeit.default_timer()
 run_time_in_sec = stop_time - start_time
 print("***Run Time***")
@@ -65,16 +65,18 @@ from oemof.tools import helpers
 
 import oemof.solph as solph
 import oemof.outputlib as outputlib
-import oemof.graph as grph
-import networkx as nx
 
 import logging
 import os
+import sys
 import pandas as pd
 import pprint as pp
 import timeit
 start_time = timeit.default_timer()
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from oemof_heat_tools import solve_model, solver_options_from_parameters
+
 try:
     import matplotlib.pyplot as plt
 except ImportError:
@@ -104,6 +106,11 @@ except:
     filename = 'demand_profile_A_nominal_20180912.csv'
 data = pd.read_csv(filename)
 
+# Read solver options from parameter file
+filename_param = 'data_public/parameter.csv'
+param_df = pd.read_csv(filename_param, header=2, index_col=1)  # uses second column of csv-file for indexing
+param_value = param_df['value']
+
 ##########################################################################
 # Create oemof object
 ##########################################################################
@@ -174,7 +181,9 @@ if debug:
 
 # if tee_switch is true solver messages will be displayed
 logging.info('Solve the optimization problem')
-model.solve(solver=solver, solve_kwargs={'tee': solver_verbose})
+solve_model(model, solver=solver,
+            options=solver_options_from_parameters(param_value),
+            tee=solver_verbose)
 
 logging.info('Store the energy system with the results.')
 
@@ -66,17 +66,22 @@ from oemof.tools import helpers
 
 import oemof.solph as solph
 import oemof.outputlib as outputlib
-import oemof.graph as grph
-import networkx as nx
 
 import logging
 import os
+import sys
 import pandas as pd
 import pprint as pp
 import timeit
 from oemof.tools import economics
 start_time = timeit.default_timer()
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from oemof_heat_tools import (solve_model, solver_options_from_parameters,
+                              apply_warm_start, restore_results,
+                              benders, split_periods, scenarios_from_years,
+                              solve_stochastic)
+
 try:
     import matplotlib.pyplot as plt
 except ImportError:
@@ -86,6 +91,14 @@ solver = 'cbc'
 debug = False  # Set number_of_timesteps to 3 to get a readable lp-file.
 number_of_time_steps = 3  # 24*7*8  # 8 weeks, every hour
 solver_verbose = False  # show/hide solver output
+warm_start_dump = None  # dump of a previous (e.g. coarse) run to start from, e.g. 'flexCHB_invest_dumps.oemof'
+warm_start_invest_window = None  # restrict invest variables to +-share of the previous solution, e.g. 0.2
+decomposition = False  # solve by Benders decomposition into monthly subproblems
+decomposition_period = 'M'  # length of the subproblems, e.g. 'M' (month) or 'W' (week)
+decomposition_processes = None  # number of worker processes, None uses all CPUs
+stochastic_profiles = None  # csv file with a time index and the neg_residual of several historical years, e.g.
+                            # 'neg_residual_history.csv': one set of capacities for the dispatch of all years
+stochastic_decomposed = False  # solve the years in parallel (Benders) instead of one extensive form
 
 # initiate the logger (see the API docs for more information)
 logger.define_logging(logfile='flex_CHB_invest.log',
@@ -96,8 +109,6 @@ logging.info('Initialize the energy system')
 date_time_index = pd.date_range('1/1/2030', periods=number_of_time_steps,
                                 freq='H')
 
-energysystem = solph.EnergySystem(timeindex=date_time_index)
-
 # Read data file
 try:
     filename = os.path.join(os.path.dirname(__file__), 'demand_profile_A_nominal_20180912.csv')
@@ -118,149 +129,206 @@ param_value = param_df['value']
 # Create oemof object
 ##########################################################################
 
-logging.info('Create oemof objects')
-
-bgas = solph.Bus(label="natural_gas")
-bel = solph.Bus(label="electricity")
-bth = solph.Bus(label='heat')
-
-energysystem.add(bgas, bel, bth)
-
-# Parameters for invest option
-epc_CHP = economics.annuity(
-    param_value['capex_chp'],
-    param_value['life_time_chp'],
-    param_value['wacc_chp'])
-epc_storage_th = economics.annuity(
-    param_value['capex_storage_th'],
-    param_value['life_time_storage_th'],
-    param_value['wacc_storage_th'])
-epc_storage_el = economics.annuity(
-    param_value['capex_storage_el'],
-    param_value['life_time_storage_el'],
-    param_value['wacc_storage_el'])
-epc_boiler = economics.annuity(
-    param_value['capex_boiler'],
-    param_value['life_time_boiler'],
-    param_value['wacc_boiler'])
-epc_PtH = economics.annuity(
-    param_value['capex_pth'],
-    param_value['life_time_pth'],
-    param_value['wacc_pth'])
-
-# Sources and sinks
-energysystem.add(solph.Sink(
-    label='excess_bel',
-    inputs={bel: solph.Flow(variable_costs=param_value['var_costs_excess_bel'])}))
-energysystem.add(solph.Sink(
-    label='excess_bth',
-    inputs={bth: solph.Flow(variable_costs=param_value['var_costs_excess_bth'])}))
-energysystem.add(solph.Source(
-    label='shortage_bel',
-    outputs={bel: solph.Flow(variable_costs=param_value['var_costs_shortage_bel'])}))
-energysystem.add(solph.Source(
-    label='shortage_bth',
-    outputs={bth: solph.Flow(variable_costs=param_value['var_costs_shortage_bth'])}))
-energysystem.add(solph.Source(
-    label='rgas',
-    outputs={bgas: solph.Flow(nominal_value=param_value['nom_val_gas'],
-                              summed_max=param_value['sum_max_gas'],
-                              variable_costs=param_value['var_costs_gas'])}))
-energysystem.add(solph.Source(
-    label='residual_el',
-    outputs={bel: solph.Flow(actual_value=data['neg_residual'],
-                             nominal_value=param_value['nom_val_neg_residual'],
-                             fixed=True)}))
-energysystem.add(solph.Sink(
-    label='demand_el',
-    inputs={bel: solph.Flow(actual_value=data['demand_el'],
-                            nominal_value=param_value['nom_val_demand_el'],
-                            fixed=True)}))
-
-energysystem.add(solph.Sink(
-    label='demand_th',
-    inputs={bth: solph.Flow(actual_value=data['demand_th'],
-                            nominal_value=param_value['nom_val_demand_th'],
-                            fixed=True)}))
-
-# energysystem.add(solph.Transformer(
-#     label="CHP",
-#     inputs={bgas: solph.Flow()},
-#     outputs={bel: solph.Flow(variable_costs=param_value['var_costs_chp_out_el'],
-#                              investment=solph.Investment(ep_costs=epc_CHP)),
-#              bth: solph.Flow(variable_costs=param_value['var_costs_chp_out_th'])},
-#     conversion_factors={bel: param_value['conversion_factor_chp_bel'], bth: param_value['conversion_factor_chp_bth']}))
-
-energysystem.add(solph.components.ExtractionTurbineCHP(
-    label="CHP",
-    inputs={bgas: solph.Flow()},
-    outputs={bel: solph.Flow(variable_costs=param_value['var_costs_chp_out_el'],
-                             investment=solph.Investment(ep_costs=epc_CHP)),
-             bth: solph.Flow(variable_costs=param_value['var_costs_chp_out_th'])},
-    conversion_factors={bel: param_value['conversion_factor_chp_bel'], bth: param_value['conversion_factor_chp_bth']},
-    conversion_factor_full_condensation={bel: param_value['conv_factor_full_cond_chp']}))
-
-energysystem.add(solph.Transformer(
-    label='boiler',
-    inputs={bgas: solph.Flow()},
-    outputs={bth: solph.Flow(nominal_value=param_value['nom_val_boiler'],
-                             variable_costs=param_value['var_costs_boiler'])},
-    conversion_factors={bth: param_value['conversion_factor_boiler']}))
-
-energysystem.add(solph.Transformer(
-    label='P2H',
-    inputs={bel: solph.Flow()},
-    outputs={bth: solph.Flow(nominal_value=150, variable_costs=0)},  # [MW_th], [-]
-    conversion_factors={bth: 0.99}))
-
-storage_th = solph.components.GenericStorage(
-    # nominal_capacity=500,  # [MWh_th]
-    label='storage_th',
-    inputs={bth: solph.Flow()},  # [MW_th]
-    outputs={bth: solph.Flow()},  # [MW_th]
-    capacity_loss=0.001,
-    # initial_capacity=0,
-    inflow_conversion_factor=1,
-    outflow_conversion_factor=0.99,
-    investment=solph.Investment(ep_costs=epc_storage_th))
-
-storage_el = solph.components.GenericStorage(
-    # nominal_capacity=200,  # [MWh_el]
-    label='storage_el',
-    inputs={bel: solph.Flow()},  # [MW_el]
-    outputs={bel: solph.Flow()},  # [MW_el]
-    capacity_loss=0.01,
-    # initial_capacity=0,
-    inflow_conversion_factor=1,
-    outflow_conversion_factor=0.60,
-    investment=solph.Investment(ep_costs=epc_storage_el))
-
-energysystem.add(storage_th, storage_el)
+
+def create_energysystem(timeindex, neg_residual=None):
+    r"""
+    Creates the energy system for a time index within date_time_index.
+    neg_residual replaces the profile of the negative residual load.
+    """
+    energysystem = solph.EnergySystem(timeindex=timeindex)
+
+    # time series of the period
+    first = date_time_index.get_loc(timeindex[0])
+    data_period = data.iloc[first:first + len(timeindex)].reset_index(drop=True)
+    if neg_residual is not None:
+        data_period['neg_residual'] = neg_residual[timeindex].values
+
+    logging.info('Create oemof objects')
+
+    bgas = solph.Bus(label="natural_gas")
+    bel = solph.Bus(label="electricity")
+    bth = solph.Bus(label='heat')
+
+    energysystem.add(bgas, bel, bth)
+
+    # Parameters for invest option
+    epc_CHP = economics.annuity(
+        param_value['capex_chp'],
+        param_value['life_time_chp'],
+        param_value['wacc_chp'])
+    epc_storage_th = economics.annuity(
+        param_value['capex_storage_th'],
+        param_value['life_time_storage_th'],
+        param_value['wacc_storage_th'])
+    epc_storage_el = economics.annuity(
+        param_value['capex_storage_el'],
+        param_value['life_time_storage_el'],
+        param_value['wacc_storage_el'])
+
+    # Sources and sinks
+    energysystem.add(solph.Sink(
+        label='excess_bel',
+        inputs={bel: solph.Flow(variable_costs=param_value['var_costs_excess_bel'])}))
+    energysystem.add(solph.Sink(
+        label='excess_bth',
+        inputs={bth: solph.Flow(variable_costs=param_value['var_costs_excess_bth'])}))
+    energysystem.add(solph.Source(
+        label='shortage_bel',
+        outputs={bel: solph.Flow(variable_costs=param_value['var_costs_shortage_bel'])}))
+    energysystem.add(solph.Source(
+        label='shortage_bth',
+        outputs={bth: solph.Flow(variable_costs=param_value['var_costs_shortage_bth'])}))
+    energysystem.add(solph.Source(
+        label='rgas',
+        outputs={bgas: solph.Flow(nominal_value=param_value['nom_val_gas'],
+                                  summed_max=param_value['sum_max_gas'],
+                                  variable_costs=param_value['var_costs_gas'])}))
+    energysystem.add(solph.Source(
+        label='residual_el',
+        outputs={bel: solph.Flow(actual_value=data_period['neg_residual'],
+                                 nominal_value=param_value['nom_val_neg_residual'],
+                                 fixed=True)}))
+    energysystem.add(solph.Sink(
+        label='demand_el',
+        inputs={bel: solph.Flow(actual_value=data_period['demand_el'],
+                                nominal_value=param_value['nom_val_demand_el'],
+                                fixed=True)}))
+
+    energysystem.add(solph.Sink(
+        label='demand_th',
+        inputs={bth: solph.Flow(actual_value=data_period['demand_th'],
+                                nominal_value=param_value['nom_val_demand_th'],
+                                fixed=True)}))
+
+    # energysystem.add(solph.Transformer(
+    #     label="CHP",
+    #     inputs={bgas: solph.Flow()},
+    #     outputs={bel: solph.Flow(variable_costs=param_value['var_costs_chp_out_el'],
+    #                              investment=solph.Investment(ep_costs=epc_CHP)),
+    #              bth: solph.Flow(variable_costs=param_value['var_costs_chp_out_th'])},
+    #     conversion_factors={bel: param_value['conversion_factor_chp_bel'], bth: param_value['conversion_factor_chp_bth']}))
+
+    energysystem.add(solph.components.ExtractionTurbineCHP(
+        label="CHP",
+        inputs={bgas: solph.Flow()},
+        outputs={bel: solph.Flow(variable_costs=param_value['var_costs_chp_out_el'],
+                                 investment=solph.Investment(ep_costs=epc_CHP)),
+                 bth: solph.Flow(variable_costs=param_value['var_costs_chp_out_th'])},
+        conversion_factors={bel: param_value['conversion_factor_chp_bel'], bth: param_value['conversion_factor_chp_bth']},
+        conversion_factor_full_condensation={bel: param_value['conv_factor_full_cond_chp']}))
+
+    energysystem.add(solph.Transformer(
+        label='boiler',
+        inputs={bgas: solph.Flow()},
+        outputs={bth: solph.Flow(nominal_value=param_value['nom_val_boiler'],
+                                 variable_costs=param_value['var_costs_boiler'])},
+        conversion_factors={bth: param_value['conversion_factor_boiler']}))
+
+    energysystem.add(solph.Transformer(
+        label='P2H',
+        inputs={bel: solph.Flow()},
+        outputs={bth: solph.Flow(nominal_value=150, variable_costs=0)},  # [MW_th], [-]
+        conversion_factors={bth: 0.99}))
+
+    storage_th = solph.components.GenericStorage(
+        # nominal_capacity=500,  # [MWh_th]
+        label='storage_th',
+        inputs={bth: solph.Flow()},  # [MW_th]
+        outputs={bth: solph.Flow()},  # [MW_th]
+        capacity_loss=0.001,
+        # initial_capacity=0,
+        inflow_conversion_factor=1,
+        outflow_conversion_factor=0.99,
+        investment=solph.Investment(ep_costs=epc_storage_th))
+
+    storage_el = solph.components.GenericStorage(
+        # nominal_capacity=200,  # [MWh_el]
+        label='storage_el',
+        inputs={bel: solph.Flow()},  # [MW_el]
+        outputs={bel: solph.Flow()},  # [MW_el]
+        capacity_loss=0.01,
+        # initial_capacity=0,
+        inflow_conversion_factor=1,
+        outflow_conversion_factor=0.60,
+        investment=solph.Investment(ep_costs=epc_storage_el))
+
+    energysystem.add(storage_th, storage_el)
+
+    return energysystem
+
+
+energysystem = create_energysystem(date_time_index)
 
 ##########################################################################
 # Optimise the energy system and plot the results
 ##########################################################################
 
-logging.info('Optimise the energy system')
+if stochastic_profiles is not None:
+    logging.info('Optimise the energy system for the years of {0}'.format(stochastic_profiles))
+    history = pd.read_csv(stochastic_profiles, index_col=0, parse_dates=True)['neg_residual']
+    scenarios = scenarios_from_years(history, date_time_index)
+    stochastic = solve_stochastic(
+        lambda year: create_energysystem(date_time_index, neg_residual=scenarios[year]),
+        scenarios.columns, solver=solver,
+        options=solver_options_from_parameters(param_value),
+        tee=solver_verbose, decomposed=stochastic_decomposed,
+        processes=decomposition_processes)
+    print('********* Capacities for all years *********')
+    print(stochastic['invest'])
+
+    logging.info('Store the energy system with the results of every year.')
+
+    for year, results in stochastic['scenarios'].items():
+        energysystem.results['main'] = results
+        energysystem.results['meta'] = {'objective': stochastic['objective'],
+                                        'invest': stochastic['invest'],
+                                        'probability': stochastic['probabilities'][year]}
+        energysystem.dump(dpath="dumps", filename="flexCHB_invest_{0}_dumps.oemof".format(year))
+
+elif decomposition:
+    logging.info('Optimise the energy system by Benders decomposition')
+    decomposed = benders(create_energysystem,
+                         split_periods(date_time_index, decomposition_period),
+                         solver=solver,
+                         options=solver_options_from_parameters(param_value),
+                         processes=decomposition_processes)
+
+    logging.info('Store the energy system with the results.')
+
+    energysystem.results['main'] = decomposed['main']
+    energysystem.results['meta'] = {'objective': decomposed['objective'],
+                                    'lower_bound': decomposed['lower_bound'],
+                                    'iterations': decomposed['iterations']}
+
+else:
+    logging.info('Optimise the energy system')
+
+    model = solph.Model(energysystem)
 
-model = solph.Model(energysystem)
+    if debug:
+        filename = os.path.join(
+            helpers.extend_basic_path('lp_files'), 'flexCHB_invest.lp')
+        logging.info('Store lp-file in {0}.'.format(filename))
+        model.write(filename, io_options={'symbolic_solver_labels': True})
 
-if debug:
-    filename = os.path.join(
-        helpers.extend_basic_path('lp_files'), 'flexCHB_invest.lp')
-    logging.info('Store lp-file in {0}.'.format(filename))
-    model.write(filename, io_options={'symbolic_solver_labels': True})
+    if warm_start_dump is not None:
+        logging.info('Warm start from {0}.'.format(warm_start_dump))
+        apply_warm_start(model, restore_results(dpath="dumps", filename=warm_start_dump),
+                         invest_window=warm_start_invest_window)
 
-# if tee_switch is true solver messages will be displayed
-logging.info('Solve the optimization problem')
-model.solve(solver=solver, solve_kwargs={'tee': solver_verbose})
+    # if tee_switch is true solver messages will be displayed
+    logging.info('Solve the optimization problem')
+    solve_model(model, solver=solver,
+                options=solver_options_from_parameters(param_value),
+                tee=solver_verbose, warmstart=warm_start_dump is not None)
 
-logging.info('Store the energy system with the results.')
+    logging.info('Store the energy system with the results.')
 
-energysystem.results['main'] = outputlib.processing.results(model)
-energysystem.results['meta'] = outputlib.processing.meta_results(model)
+    energysystem.results['main'] = outputlib.processing.results(model)
+    energysystem.results['meta'] = outputlib.processing.meta_results(model)
 
-energysystem.dump(dpath="dumps", filename="flexCHB_invest_dumps.oemof")
+if stochastic_profiles is None:
+    energysystem.dump(dpath="dumps", filename="flexCHB_invest_dumps.oemof")
 
 stop_time = timeit.default_timer()
 run_time_in_sec = stop_time - start_time
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+"""
+General description
+-------------------
+
+Dispatches the energy system of app_flexCHP.py by a merit order instead of
+solving the LP (see oemof_heat_tools/merit_order.py for the rules). Takes
+a fraction of a second, which allows to screen many scenarios.
+
+The results are dumped in the format of app_flexCHP.py and can be
+compared with the LP optimum, if its dump "flexCHB_A1_dumps.oemof" exists.
+Note that app_flexCHP.py models the CHP with a GenericCHP, while the merit
+order uses the CHP parameters of parameter.csv.
+
+
+Data
+----
+demand_profile_A_nominal.20180912.csv
+data_public/parameter.csv
+
+
+Installation requirements
+-------------------------
+
+This example requires the version v0.2.3 of oemof. Install by:
+
+    pip install 'oemof>=0.2.3,<0.3'
+
+"""
+
+
+###############################################################################
+# imports
+###############################################################################
+
+# Default logger of oemof
+from oemof.tools import logger
+
+import oemof.solph as solph
+
+import logging
+import os
+import sys
+import numpy as np
+import pandas as pd
+import timeit
+start_time = timeit.default_timer()
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from oemof_heat_tools import (system_a_parameters, system_a_variable_costs,
+                              dispatch_system_a, to_results, dispatch_costs,
+                              compare_dispatch, restore_results)
+
+number_of_time_steps = 8760
+compare_with_lp = True  # compare with the dump of app_flexCHP.py
+sweep_nom_val_neg_residual = None  # e.g. np.arange(0, 501, 10): dispatch all values at once and print the costs
+
+# initiate the logger (see the API docs for more information)
+logger.define_logging(logfile='flex_CHB_A1_merit_order.log',
+                      screen_level=logging.INFO,
+                      file_level=logging.DEBUG)
+
+date_time_index = pd.date_range('1/1/2030', periods=number_of_time_steps,
+                                freq='H')
+
+# Read data file
+try:
+    filename = os.path.join(os.path.dirname(__file__), 'demand_profile_A_nominal_20180912.csv')
+except:
+    print('ERROR: __file__ is not defined')
+    filename = 'demand_profile_A_nominal_20180912.csv'
+data = pd.read_csv(filename).iloc[:number_of_time_steps]
+
+filename_param = 'data_public/parameter.csv'
+param_df = pd.read_csv(filename_param, header=2, index_col=1)  # uses second column of csv-file for indexing
+param_value = param_df['value']
+
+##########################################################################
+# Dispatch by merit order
+##########################################################################
+
+logging.info('Dispatch the energy system by merit order')
+
+param = system_a_parameters(param_value)
+variable_costs = system_a_variable_costs(param_value)
+flows = dispatch_system_a(data['demand_th'], data['demand_el'],
+                          data['neg_residual'], param)
+
+energysystem = solph.EnergySystem(timeindex=date_time_index)
+energysystem.results['main'] = to_results(flows, date_time_index)
+energysystem.results['meta'] = {'objective': dispatch_costs(flows, variable_costs),
+                                'merit_order': True}
+logging.info('Variable costs of the merit order: {0:.2f}'.format(
+    energysystem.results['meta']['objective']))
+
+energysystem.dump(dpath="dumps", filename="flexCHB_A1_merit_order_dumps.oemof")
+
+if compare_with_lp and os.path.isfile(os.path.join("dumps", "flexCHB_A1_dumps.oemof")):
+    lp_results = restore_results("dumps", "flexCHB_A1_dumps.oemof")
+    comparison = compare_dispatch(energysystem.results['main'], lp_results,
+                                  variable_costs=variable_costs)
+    print('********* Merit order vs. LP *********')
+    print(comparison)
+    comparison.to_csv(os.path.join("dumps", "flexCHB_A1_merit_order_comparison.csv"))
+
+if sweep_nom_val_neg_residual is not None:
+    logging.info('Dispatch {0} values of nom_val_neg_residual'.format(
+        len(sweep_nom_val_neg_residual)))
+    sweep_param = dict(param, nom_val_neg_residual=np.asarray(sweep_nom_val_neg_residual))
+    profiles = [np.asarray(data[column])[:, None]
+                for column in ['demand_th', 'demand_el', 'neg_residual']]
+    sweep_flows = dispatch_system_a(*profiles, sweep_param)
+    sweep = pd.DataFrame({
+        'costs': dispatch_costs(sweep_flows, variable_costs),
+        'shortage_th': sweep_flows[('shortage_bth', 'heat')].sum(axis=0),
+        'excess_el': sweep_flows[('electricity', 'excess_bel')].sum(axis=0)},
+        index=pd.Index(sweep_nom_val_neg_residual, name='nom_val_neg_residual'))
+    print(sweep)
+    sweep.to_csv(os.path.join("dumps", "flexCHB_A1_merit_order_sweep.csv"))
+
+stop_time = timeit.default_timer()
+run_time_in_sec = stop_time - start_time
+print("***Run Time***")
+print("%6.2f" %run_time_in_sec, "seconds")
@@ -7,17 +7,22 @@ from oemof.tools import logger
 from oemof.tools import helpers
 
 import oemof.solph as solph
-import oemof.outputlib as outputlib
 import oemof.graph as grph
 import networkx as nx
 
 import logging
 import os
-import pandas as pd
 import pprint as pp
+import sys
 import matplotlib
 import matplotlib.pyplot as plt
 
+from plot_flexCHP import collect_series, plot_heating, plot_electricity
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from oemof_heat_tools import restore_results
+from oemof_heat_tools.results import Results
+from oemof_heat_tools.plotting import render_figures
+
 # ****************************************************************************
 # ********** PART 2 - Processing the results *********************************
 # ****************************************************************************
@@ -26,6 +31,8 @@ make_plots = True
 use_ggplot = True
 show_plots = True
 save_plots = True
+headless = False  # render the figures of all dump_files in worker processes to plots/
+dump_files = ['flexCHB_invest_dumps.oemof']  # e.g. add the dumps of a storage sweep
 print_slices = False
 print_keys = True
 print_meta = True
@@ -35,13 +42,14 @@ analyse = True
 
 # logging.info('Restore the energy system and the results.')
 energysystem = solph.EnergySystem()
-energysystem.restore(dpath="dumps", filename="flexCHB_invest_dumps.oemof")
+energysystem.restore(dpath="dumps", filename=dump_files[0])
 
 # define an alias for shorter calls below (optional)
 results = energysystem.results['main']
 storage_th_comp = energysystem.groups['storage_th']
     
-string_results = outputlib.views.convert_keys_to_strings(energysystem.results['main'])
+# one indexed frame of all results, buses and flows are selected from it
+string_results = Results(energysystem.results['main'])
 
 if print_slices==True:
     ## print a time slice of the state of charge
@@ -52,32 +60,20 @@ if print_slices==True:
     print('')
 
 # get all variables of a specific component/bus
-storage_th = outputlib.views.node(results, 'storage_th')
-electricity_bus = outputlib.views.node(results, 'electricity')
-heat_bus = outputlib.views.node(results, 'heat')
-gas_bus = outputlib.views.node(results, 'natural_gas')
-shortage_el = outputlib.views.node(results, 'shortage_bel')
+storage_th = string_results.node('storage_th')
+electricity_bus = string_results.node('electricity')
+heat_bus = string_results.node('heat')
+gas_bus = string_results.node('natural_gas')
+shortage_el = string_results.node('shortage_bel')
 
 # Collecting results for specific components and flows
-CHP_heat = string_results[('CHP', 'heat')]['sequences']
-CHP_electricity = string_results[('CHP', 'electricity')]['sequences']
-demand_th = string_results[('heat', 'demand_th')]['sequences']
-demand_el = string_results[('electricity', 'demand_el')]['sequences']
-boiler = string_results[('boiler', 'heat')]['sequences']
-CHP_heat_share = CHP_heat/demand_th*100  # in [%]
-boiler_share = boiler/demand_th*100  # in [%]
-CHP_el_share = CHP_electricity/demand_el*100  # in [%]
-P2H_el = string_results['electricity', 'P2H']['sequences']
-P2H_el_share = P2H_el/demand_el*100  # in [%]
-storage_discharge = string_results['storage_th', 'heat']['sequences']
-storage_charge = string_results['heat', 'storage_th']['sequences']
-storage_soc = string_results['storage_th', 'None']['sequences']  # State of charge in [MWh_th]
-storage_soc_rel = string_results['storage_th', 'None']['sequences']/string_results['storage_th', 'None']['sequences'].max()*100  # State of charge in [%]
-shortage_electricity = string_results['shortage_bel', 'electricity']['sequences']
-shortage_heat = string_results['shortage_bth', 'heat']['sequences']
-excess_electricity = string_results['electricity', 'excess_bel']['sequences']
-excess_heat = string_results['heat', 'excess_bth']['sequences']
-residual_el = string_results['residual_el', 'electricity']['sequences']
+series = collect_series(string_results)
+CHP_heat = series['CHP_heat']
+CHP_electricity = series['CHP_electricity']
+shortage_electricity = series['shortage_electricity']
+shortage_heat = series['shortage_heat']
+excess_electricity = series['excess_electricity']
+excess_heat = series['excess_heat']
 
 # Collecting results for invest option
 CHP_invest_MWh = string_results[('CHP', 'electricity')]['scalars']
@@ -87,106 +83,28 @@ storage_el_invest_MWh = string_results['storage_el', 'None']['scalars']
 
 
 if make_plots==True:
-    if use_ggplot==True:
-        plt.style.use('ggplot')
-        # colors for ggplot: red, bluisch and green = c("#CC6666", "#9999CC", "#66CC99")
-
-    start = pd.to_datetime('01.01.2030 00:00:00', format='%d.%m.%Y %H:%M:%S')
-    end = pd.to_datetime('31.12.2030 23:00:00', format='%d.%m.%Y %H:%M:%S')
-    start_axes = pd.to_datetime('01.01.2030 00:00:00', format='%d.%m.%Y %H:%M:%S')
-    end_axes = pd.to_datetime('31.12.2030 23:00:00', format='%d.%m.%Y %H:%M:%S')
-
-    ### PLOT 1 ###
-    fig1, (ax1, ax2, ax8, ax7, ax3) = plt.subplots(5, 1)
-    fig1.set_size_inches(10, 7)
-    plt.subplots_adjust(right=0.75)
-    fig1.subplots_adjust(hspace=0.3)  # make a little extra space between the subplots
-    fig1.autofmt_xdate()  # tilted labels on x-axes
-    fig1.suptitle("Heating", size=14)
-
-    ax1.set_title("Demand and Supply", size=10)
-    ax1.plot(demand_th[start:end], label='Heating Demand')
-    ax1.plot(boiler[start:end], label='Heat from Boiler')
-    ax1.plot(CHP_heat[start:end], label='Heat form CHP')
-    ax1.set_xlim(start_axes, end_axes)
-    ax1.set_ylim(0,1000)
-    # ax1.set_xlabel('Zeit')
-    ax1.set_ylabel('Leistung \nin $\mathrm{MW}_{th}$')
-    ax1.grid(True)
-    ax1.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
-
-    ax2.set_title('Thermal energy storage', size=10)
-    ln1 = ax2.plot(storage_discharge[start:end], label='Discharge')
-    ln2 = ax2.plot(storage_charge[start:end], label='Charge')
-    # ax22 = ax2.twinx()
-    # ln3 = ax22.plot(storage_soc_rel[start:end], c="#9999CC", label='State of Charge')
-    # ax2.set_ylim(-4000, 4000)
-    # ax22.set_ylim(-100, 100)
-    ax2.set_xlim(start_axes, end_axes)
-    ax2.set_ylabel('Leistung \nin $\mathrm{MW}_{th}$')
-    # ax22.set_ylabel('Füllstand in %')
-    # lns = ln1+ln2+ln3
-    # labs = [l.get_label() for l in lns]
-    # ax22.legend(lns, labs)
-    # ax22.legend(loc=4)
-    ax2.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
-    # ax8.plot(storage_soc_rel[start:end], label='State of Charge')
-    ax8.plot(storage_soc[start:end], label='State of Charge')
-    ax8.set_ylabel('Füllstand \nin %')
-    ax8.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
-
-    ax7.set_title('Shortage and Excess Heat', size=10)
-    ax7.plot(shortage_heat[start:end], label='shortage')
-    ax7.plot(excess_heat[start:end], label='excess')
-    ax7.set_xlim(start_axes, end_axes)
-    # ax3.set_ylim(0, 100)
-    ax7.set_ylabel('Leistung \nin $\mathrm{MW}_{th}$')
-    ax7.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
-
-    ax3.set_title('Anteil an der Wärmeversorgung (Deckungsgrad)', size=10)
-    ax3.plot(boiler_share[start:end], label='Heat from boiler')
-    ax3.plot(CHP_heat_share[start:end], label='Heat from CHP')
-    ax3.set_xlim(start_axes, end_axes)
-    # ax3.set_ylim(0, 150)
-    ax3.set_xlabel('Zeit in Stunden')
-    ax3.set_ylabel('Anteil \nin %')
-    ax3.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
-
-    ### PLOT 2 ###
-    fig2, (ax4, ax5, ax6) = plt.subplots(3, 1)
-    fig2.set_size_inches(10, 7)
-    plt.subplots_adjust(right=0.75)
-    fig2.subplots_adjust(hspace=0.3)  # make a little extra space between the subplots
-    fig2.autofmt_xdate()  # tilted labels on x-axes
-    fig2.suptitle("Electricity", size=14)
-
-    ax4.set_title("Demand and Shortage", size=10)
-    ax4.plot(demand_el[start:end], label='Electricity Demand')
-    ax4.plot(shortage_electricity[start:end], label='Shortage')
-    ax4.plot(CHP_electricity[start:end], label='Electricity form CHP')
-    ax4.set_xlim(start_axes, end_axes)
-    ax4.set_ylim(0, 1200)
-    ax4.set_ylabel('Leistung \nin $\mathrm{MW}_{el}$')
-    ax4.grid(True)
-    ax4.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
-
-    ax5.set_title('Residual load and P2H', size=10)
-    ax5.plot(residual_el[start:end], label='Residual load')
-    ax5.plot(P2H_el[start:end], label='Power consumption P2H')
-    ax5.set_xlim(start_axes, end_axes)
-    ax5.set_ylabel('Leistung in \n$\mathrm{MW}_{th}$')
-    ax5.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
-
-    ax6.set_title('Anteil des CHP an Stromversorgung (Deckungsgrad)', size=10)
-    # ax6.plot(P2H_el_share[start:end], label='P2H')
-    ax6.plot(CHP_el_share[start:end], label='CHP')
-    ax6.set_xlim(start_axes, end_axes)
-    ax6.set_ylim(0, 200)
-    ax6.set_xlabel('Zeit in Stunden')
-    ax6.set_ylabel('Anteil \nin %')
-    ax6.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
-
-    plt.show()
+    if headless==True:
+        # one job per figure and dump, figures of unchanged results are skipped
+        jobs = []
+        for dump_file in dump_files:
+            name = os.path.splitext(dump_file)[0]
+            dump_series = collect_series(Results(restore_results('dumps', dump_file)))
+            jobs.append((name + '_heating.png', plot_heating, dump_series,
+                         {'soc': 'absolute', 'use_ggplot': use_ggplot}))
+            jobs.append((name + '_electricity.png', plot_electricity, dump_series,
+                         {'use_ggplot': use_ggplot}))
+        pp.pprint(render_figures(jobs, plot_dir='plots'))
+    else:
+        fig1 = plot_heating(series, soc='absolute', use_ggplot=use_ggplot)
+        fig2 = plot_electricity(series, use_ggplot=use_ggplot)
+        if save_plots==True:
+            if not os.path.exists('plots'):
+                os.makedirs('plots')
+            name = os.path.splitext(dump_files[0])[0]
+            fig1.savefig(os.path.join('plots', name + '_heating.png'))
+            fig2.savefig(os.path.join('plots', name + '_electricity.png'))
+        if show_plots==True:
+            plt.show()
 
 if print_keys==True:
     print('********* Keys *********')
@@ -0,0 +1,177 @@
+"""
+Figures of the results of the flexCHP models.
+
+Used by plot_and_analyse_results_flexCHP.py and
+plot_and_analyse_results_flexCHP_invest.py. The plot functions take the
+series collected by collect_series and return the figure, so they can be
+drawn interactively or rendered headless in worker processes (see
+oemof_heat_tools/plotting.py). Full-year series are downsampled to the
+width of the axes, keeping the minimum and maximum per pixel.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import os
+import sys
+
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from oemof_heat_tools.plotting import plot_series
+
+
+def collect_series(string_results):
+    r"""
+    Collects the sequences of specific components and flows from the
+    results (keys as strings, e.g. oemof_heat_tools.Results).
+    """
+    s = {}
+    s['CHP_heat'] = string_results[('CHP', 'heat')]['sequences']
+    s['CHP_electricity'] = string_results[('CHP', 'electricity')]['sequences']
+    s['demand_th'] = string_results[('heat', 'demand_th')]['sequences']
+    s['demand_el'] = string_results[('electricity', 'demand_el')]['sequences']
+    s['boiler'] = string_results[('boiler', 'heat')]['sequences']
+    s['CHP_heat_share'] = s['CHP_heat']/s['demand_th']*100  # in [%]
+    s['boiler_share'] = s['boiler']/s['demand_th']*100  # in [%]
+    s['CHP_el_share'] = s['CHP_electricity']/s['demand_el']*100  # in [%]
+    s['P2H_el'] = string_results['electricity', 'P2H']['sequences']
+    s['P2H_el_share'] = s['P2H_el']/s['demand_el']*100  # in [%]
+    s['storage_discharge'] = string_results['storage_th', 'heat']['sequences']
+    s['storage_charge'] = string_results['heat', 'storage_th']['sequences']
+    s['storage_soc'] = string_results['storage_th', 'None']['sequences']  # State of charge in [MWh_th]
+    s['storage_soc_rel'] = s['storage_soc']/s['storage_soc'].max()*100  # State of charge in [%]
+    s['shortage_electricity'] = string_results['shortage_bel', 'electricity']['sequences']
+    s['shortage_heat'] = string_results['shortage_bth', 'heat']['sequences']
+    s['excess_electricity'] = string_results['electricity', 'excess_bel']['sequences']
+    s['excess_heat'] = string_results['heat', 'excess_bth']['sequences']
+    s['residual_el'] = string_results['residual_el', 'electricity']['sequences']
+
+    return s
+
+
+def _period(start, end):
+    if start is None:
+        start = pd.to_datetime('01.01.2030 00:00:00', format='%d.%m.%Y %H:%M:%S')
+    if end is None:
+        end = pd.to_datetime('31.12.2030 23:00:00', format='%d.%m.%Y %H:%M:%S')
+    return start, end
+
+
+def plot_heating(s, start=None, end=None, soc='relative', use_ggplot=True):
+    r"""
+    PLOT 1: demand and supply of heat, storage, shortage/excess and shares.
+
+    Parameters
+    ----------
+    s : dict
+        Series from collect_series.
+
+    soc : str
+        'relative' plots the state of charge in %, 'absolute' in MWh_th.
+    """
+    import matplotlib.pyplot as plt
+
+    if use_ggplot==True:
+        plt.style.use('ggplot')
+        # colors for ggplot: red, bluisch and green = c("#CC6666", "#9999CC", "#66CC99")
+    start, end = _period(start, end)
+    start_axes, end_axes = start, end
+
+    fig1, (ax1, ax2, ax8, ax7, ax3) = plt.subplots(5, 1)
+    fig1.set_size_inches(10, 7)
+    fig1.subplots_adjust(right=0.75)
+    fig1.subplots_adjust(hspace=0.3)  # make a little extra space between the subplots
+    fig1.autofmt_xdate()  # tilted labels on x-axes
+    fig1.suptitle("Heating", size=14)
+
+    ax1.set_title("Demand and Supply", size=10)
+    plot_series(ax1, s['demand_th'][start:end], label='Heating Demand')
+    plot_series(ax1, s['boiler'][start:end], label='Heat from Boiler')
+    plot_series(ax1, s['CHP_heat'][start:end], label='Heat form CHP')
+    ax1.set_xlim(start_axes, end_axes)
+    ax1.set_ylim(0,1000)
+    ax1.set_ylabel('Leistung \nin $\mathrm{MW}_{th}$')
+    ax1.grid(True)
+    ax1.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
+
+    ax2.set_title('Thermal energy storage', size=10)
+    plot_series(ax2, s['storage_discharge'][start:end], label='Discharge')
+    plot_series(ax2, s['storage_charge'][start:end], label='Charge')
+    ax2.set_xlim(start_axes, end_axes)
+    ax2.set_ylabel('Leistung \nin $\mathrm{MW}_{th}$')
+    ax2.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
+
+    if soc == 'relative':
+        plot_series(ax8, s['storage_soc_rel'][start:end], label='State of Charge')
+        ax8.set_ylabel('Füllstand \nin %')
+    else:
+        plot_series(ax8, s['storage_soc'][start:end], label='State of Charge')
+        ax8.set_ylabel('Füllstand \nin $\mathrm{MWh}_{th}$')
+    ax8.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
+
+    ax7.set_title('Shortage and Excess Heat', size=10)
+    plot_series(ax7, s['shortage_heat'][start:end], label='shortage')
+    plot_series(ax7, s['excess_heat'][start:end], label='excess')
+    ax7.set_xlim(start_axes, end_axes)
+    ax7.set_ylabel('Leistung \nin $\mathrm{MW}_{th}$')
+    ax7.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
+
+    ax3.set_title('Anteil an der Wärmeversorgung (Deckungsgrad)', size=10)
+    plot_series(ax3, s['boiler_share'][start:end], label='Heat from boiler')
+    plot_series(ax3, s['CHP_heat_share'][start:end], label='Heat from CHP')
+    ax3.set_xlim(start_axes, end_axes)
+    ax3.set_xlabel('Zeit in Stunden')
+    ax3.set_ylabel('Anteil \nin %')
+    ax3.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
+
+    return fig1
+
+
+def plot_electricity(s, start=None, end=None, use_ggplot=True):
+    r"""
+    PLOT 2: demand and supply of electricity, residual load and P2H and
+    the share of the CHP.
+    """
+    import matplotlib.pyplot as plt
+
+    if use_ggplot==True:
+        plt.style.use('ggplot')
+    start, end = _period(start, end)
+    start_axes, end_axes = start, end
+
+    fig2, (ax4, ax5, ax6) = plt.subplots(3, 1)
+    fig2.set_size_inches(10, 7)
+    fig2.subplots_adjust(right=0.75)
+    fig2.subplots_adjust(hspace=0.3)  # make a little extra space between the subplots
+    fig2.autofmt_xdate()  # tilted labels on x-axes
+    fig2.suptitle("Electricity", size=14)
+
+    ax4.set_title("Demand and Shortage", size=10)
+    plot_series(ax4, s['demand_el'][start:end], label='Electricity Demand')
+    plot_series(ax4, s['shortage_electricity'][start:end], label='Shortage')
+    plot_series(ax4, s['CHP_electricity'][start:end], label='Electricity form CHP')
+    ax4.set_xlim(start_axes, end_axes)
+    ax4.set_ylim(0, 1200)
+    ax4.set_ylabel('Leistung \nin $\mathrm{MW}_{el}$')
+    ax4.grid(True)
+    ax4.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
+
+    ax5.set_title('Residual load and P2H', size=10)
+    plot_series(ax5, s['residual_el'][start:end], label='Residual load')
+    plot_series(ax5, s['P2H_el'][start:end], label='Power consumption P2H')
+    ax5.set_xlim(start_axes, end_axes)
+    ax5.set_ylabel('Leistung in \n$\mathrm{MW}_{th}$')
+    ax5.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
+
+    ax6.set_title('Anteil des CHP an Stromversorgung (Deckungsgrad)', size=10)
+    # plot_series(ax6, s['P2H_el_share'][start:end], label='P2H')
+    plot_series(ax6, s['CHP_el_share'][start:end], label='CHP')
+    ax6.set_xlim(start_axes, end_axes)
+    ax6.set_ylim(0, 200)
+    ax6.set_xlabel('Zeit in Stunden')
+    ax6.set_ylabel('Anteil \nin %')
+    ax6.legend(bbox_to_anchor=(1.04,1), loc="upper left", borderaxespad=0)
+
+    return fig2
@@ -1,9 +1,14 @@
 import sys
 import os
 
-def setup_experiment():
+def setup_experiment(config_path=None):
     r"""
 
+    Parameters
+    ----------
+    config_path: path
+        Experiment config file, default is the first command line argument.
+
     Returns
     -------
     config_path: path
@@ -17,11 +22,12 @@ def setup_experiment():
     abs_path = os.path.dirname(os.path.abspath(os.path.join(__file__, '..')))
 
     # take command line arguments
-    try:
-        config_path = sys.argv[1]
-    except:
-        print('Please specify which experiment config to run as a command line argument.')
-        sys.exit(1)
+    if config_path is None:
+        try:
+            config_path = sys.argv[1]
+        except:
+            print('Please specify which experiment config to run as a command line argument.')
+            sys.exit(1)
 
     # Get absolute path of config file.
     config_path = os.path.abspath(config_path)
@@ -5,23 +5,22 @@ This script runs the whole workflow of the analysis
 
 from oemof.tools import logger
 import logging
+import os
+import sys
 import warnings
 warnings.filterwarnings("ignore", message="numpy.dtype size changed")
 warnings.filterwarnings("ignore", message="numpy.ufunc size changed")
 import subprocess
-from connect_to_oep import connect_to_oep
-from preprocess import prepare_timeseries
-from preprocess_closed_data import preprocess_closed_data
-from model_dessau import run_model_dessau
-from postprocess import postprocess
-from plot import create_plots
 import helpers
 import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
 
 def main(config_path, results_dir):
     r"""
-    This function runs the whole analysis pipeline
+    This function runs the whole analysis pipeline. The stages import
+    their packages (database connection, demandlib, matplotlib, graphviz)
+    when they run.
 
     """
     starttime = time.time()
@@ -30,20 +29,26 @@ def main(config_path, results_dir):
 
     # Preproccessing
     logging.info('Preprocess data')
+    from connect_to_oep import connect_to_oep
+    from preprocess import prepare_timeseries
+    from preprocess_closed_data import preprocess_closed_data
     connect_to_oep(config_path=config_path, results_dir=results_dir)
     prepare_timeseries(config_path=config_path, results_dir=results_dir)
     preprocess_closed_data(config_path=config_path, results_dir=results_dir)
 
     # Run the optimisation model
     logging.info('Run optimisation model')
+    from model_dessau import run_model_dessau
     run_model_dessau(config_path=config_path, results_dir=results_dir)
 
     # Postprocessing
     logging.info('Postprocess data')
+    from postprocess import postprocess
     postprocess(config_path=config_path, results_dir=results_dir)
 
     # Plotting
     logging.info('Create plots')
+    from plot import create_plots
     create_plots(config_path=config_path, results_dir=results_dir)
 
     # Build a report
@@ -56,6 +61,66 @@ def main(config_path, results_dir):
 
     return True
 
+
+def run_sweep(config_paths, max_attempts=2):
+    r"""
+    Runs the pipeline for several experiment configs. The status of each
+    config is kept in model_runs/sweep_journal.json, a restarted sweep
+    skips the configs that are done.
+
+    """
+    from oemof_heat_tools.journal import SweepJournal
+
+    abs_path = os.path.dirname(os.path.abspath(os.path.join(__file__, '..')))
+    journal = SweepJournal(abs_path + '/model_runs/sweep_journal.json',
+                           max_attempts=max_attempts)
+    for config_path in config_paths:
+        config_path, results_dir = helpers.setup_experiment(config_path)
+        journal.run(os.path.split(config_path)[1], main, config_path,
+                    results_dir, output=results_dir)
+
+    return journal.summary()
+
+
+def enqueue_sweep(config_paths, queue_url):
+    r"""
+    Puts the pipeline of each experiment config into a job queue, the
+    workers (python -m oemof_heat_tools.jobqueue <queue_url>) run them.
+
+    """
+    import yaml
+    from oemof_heat_tools.jobqueue import open_queue
+    from oemof_heat_tools.scheduling import (job_features, longest_first,
+                                             read_runtime_log, runtime_log_path)
+    from model_dessau import create_timeindex
+
+    jobs = []
+    for config_path in config_paths:
+        config_path, results_dir = helpers.setup_experiment(config_path)
+        with open(config_path, 'r') as ymlfile:
+            cfg = yaml.load(ymlfile)
+        jobs.append(('dessau_' + os.path.split(config_path)[1][:-4], {
+            'path': os.path.dirname(os.path.abspath(__file__)),
+            'func': 'main:main',
+            'kwargs': {'config_path': config_path, 'results_dir': results_dir},
+            'features': job_features('dessau', len(create_timeindex(cfg))),
+            'output': results_dir}))
+
+    # the workers take the longest jobs first
+    queue = open_queue(queue_url)
+    history = read_runtime_log(runtime_log_path(queue))
+    for key, payload in longest_first(jobs, history):
+        queue.put(key, payload)
+
+    return queue.counts()
+
+
 if __name__ == '__main__':
-    config_path, results_dir = helpers.setup_experiment()
-    main(config_path, results_dir)
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == '--queue':
+        # python main.py --queue sqlite:///model_runs/jobs.sqlite config1.yml config2.yml
+        print(enqueue_sweep(sys.argv[3:], sys.argv[2]))
+    elif len(sys.argv) > 2:
+        run_sweep(sys.argv[1:])
+    else:
+        config_path, results_dir = helpers.setup_experiment()
+        main(config_path, results_dir)
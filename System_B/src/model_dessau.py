@@ -23,54 +23,56 @@ from oemof.tools import logger, economics
 import oemof.tools.helpers
 import oemof.solph as solph
 from oemof.outputlib import processing
-import oemof.graph as graph
-import networkx as nx
 import logging
 import os
+import sys
+import numpy as np
 import pandas as pd
 import yaml
 import helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from oemof_heat_tools import (solve_model, solve_chunked, restore_chunks,
+                              hours_per_step, scale_capacity_loss)
 
 
 logger.define_logging()
 
 
-def run_model_dessau(config_path, results_dir):
+def create_timeindex(cfg):
     r"""
-    Create the energy system and run the optimisation model.
+    Time index of the model at cfg['resolution'], shortened in debug mode
+    and covering all years of cfg['horizon'] if given.
+    """
+    resolution = cfg.get('resolution', 'H')
+    if cfg['debug']:
+        number_timesteps = 200
+    elif cfg.get('horizon'):
+        return pd.date_range('{0}-01-01 00:00'.format(cfg['horizon']['start']),
+                             '{0}-12-31 23:59'.format(cfg['horizon']['end']),
+                             freq=resolution)
+    else:
+        number_timesteps = int(8760 / hours_per_step(resolution))
+
+    return pd.date_range('1/1/2017', periods=number_timesteps, freq=resolution)
+
+
+def create_energysystem(cfg, in_param, demand_heat_timeseries, date_time_index):
+    r"""
+    Create the energy system.
 
     Parameters
     ----------
-    config_path : Path to experiment config
-    results_dir : Directory for results
+    cfg : Experiment config
+    in_param : Input parameter
+    demand_heat_timeseries : Heat demand
+    date_time_index : Time index of the model
 
     Returns
     -------
-    energysystem.results : Dict containing results
+    energysystem : solph.EnergySystem
     """
-    abs_path = os.path.dirname(os.path.abspath(os.path.join(__file__, '..')))
-    with open(config_path, 'r') as ymlfile:
-        cfg = yaml.load(ymlfile)
-
-    # load input parameter
-    in_param = pd.read_csv(os.path.join(abs_path, cfg['input_parameter']), index_col=[1, 2])['var_value']
     wacc = in_param['general', 'wacc']
 
-    # load timeseries
-    demand_heat_timeseries = pd.read_csv(os.path.join(results_dir, cfg['timeseries']['timeseries_demand_heat']),
-                                         index_col=0, names=['demand_heat'], sep=',')['demand_heat']
-    print(demand_heat_timeseries.head())
-
-    # create timeindex
-    if cfg['debug']:
-        number_timesteps = 200
-    else:
-        number_timesteps = 8760
-
-    date_time_index = pd.date_range('1/1/2017',
-                                    periods=number_timesteps,
-                                    freq='H')
-
     logging.info('Initialize the energy system')
     energysystem = solph.EnergySystem(timeindex=date_time_index)
 
@@ -163,22 +165,77 @@ def run_model_dessau(config_path, results_dir):
             nominal_value=in_param['storage_heat','input_nominal_value'])},
         outputs={bth_prim: solph.Flow(
             nominal_value=in_param['storage_heat','output_nominal_value'])},
-        capacity_loss=in_param['storage_heat','capacity_loss'],
+        capacity_loss=scale_capacity_loss(in_param['storage_heat','capacity_loss'], cfg.get('resolution', 'H')),
         initial_capacity=in_param['storage_heat','initial_capacity'],
         capacity_max=in_param['storage_heat','nominal_capacity'],
         inflow_conversion_factor=1,
         outflow_conversion_factor=1))
 
-    energysystem_graph = graph.create_nx_graph(energysystem)
-    graph_file_name = os.path.join(results_dir, 'energysystem_graph.pkl')
-    nx.readwrite.write_gpickle(G=energysystem_graph, path=graph_file_name)
+    return energysystem
+
+
+def run_model_dessau(config_path, results_dir):
+    r"""
+    Create the energy system and run the optimisation model.
+
+    Parameters
+    ----------
+    config_path : Path to experiment config
+    results_dir : Directory for results
+
+    Returns
+    -------
+    energysystem.results : Dict containing results, for a multi-year
+                           horizon a DataFrame with one row per chunk
+    """
+    abs_path = os.path.dirname(os.path.abspath(os.path.join(__file__, '..')))
+    with open(config_path, 'r') as ymlfile:
+        cfg = yaml.load(ymlfile)
+
+    # load input parameter
+    in_param = pd.read_csv(os.path.join(abs_path, cfg['input_parameter']), index_col=[1, 2])['var_value']
+
+    # load timeseries
+    demand_heat_timeseries = pd.read_csv(os.path.join(results_dir, cfg['timeseries']['timeseries_demand_heat']),
+                                         index_col=0, names=['demand_heat'], sep=',')['demand_heat']
+    print(demand_heat_timeseries.head())
+
+    # create timeindex
+    date_time_index = create_timeindex(cfg)
+
+    if cfg.get('horizon') and not cfg['debug']:
+        # the demand profile of one year is repeated in every year of the horizon
+        def demand_heat(timeindex):
+            return pd.Series(np.resize(demand_heat_timeseries.values, len(timeindex)), index=timeindex)
+        demand_heat_horizon = demand_heat(date_time_index)
+    else:
+        demand_heat_horizon = demand_heat_timeseries
+
+    energysystem = create_energysystem(cfg, in_param, demand_heat_horizon, date_time_index)
+
+    if cfg.get('horizon') and not cfg['debug']:
+        logging.info('Solve the optimization problem chunk by chunk')
+        chunks = solve_chunked(
+            lambda timeindex: create_energysystem(cfg, in_param, demand_heat(timeindex), timeindex),
+            date_time_index, freq=cfg['horizon'].get('chunk', 'A'),
+            solver=cfg['solver'], options=cfg.get('solver_options'), tee=True,
+            dpath=results_dir + '/optimisation_results', filename='es_{chunk}.dump',
+            label='dessau')
+        chunks.to_csv(os.path.join(results_dir, 'optimisation_results', 'chunks.csv'))
+
+        # postprocessing and plots look at the whole horizon
+        energysystem.results = restore_chunks(list(chunks['file']))
+        energysystem.dump(dpath=results_dir + '/optimisation_results', filename='es.dump')
+
+        return chunks
 
     #####################################################################
     logging.info('Solve the optimization problem')
 
 
     om = solph.Model(energysystem)
-    om.solve(solver=cfg['solver'], solve_kwargs={'tee': True})
+    solve_model(om, solver=cfg['solver'], options=cfg.get('solver_options'), tee=True,
+                label='dessau')
 
     if cfg['debug']:
         filename = os.path.join(
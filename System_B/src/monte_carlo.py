@@ -0,0 +1,251 @@
+"""
+Monte-Carlo runs of the Dessau model over weather years.
+
+Draws weather years (or bootstrapped sequences of weeks from several
+years), creates the BDEW heat demand for each draw, solves the model in
+a process pool and aggregates the distribution of costs, capacities and
+summed flows.
+
+The temperature data of all years is read once and shared with the
+workers. Drawing whole years solves each distinct year only once. The
+results of the runs are written to model_runs/<experiment>/monte_carlo/
+runs.csv as they come in, the distribution is summarised in summary.csv.
+
+Usage: python monte_carlo.py ../experiment_configs/monte_carlo.yml
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import csv
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import yaml
+from oemof.tools import logger
+
+import helpers
+from preprocess import BDEW_PARAMETERS, demand_heat_bdew, read_temperature
+from model_dessau import create_energysystem, create_timeindex
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from oemof_heat_tools import solve_model, resample, hours_per_step
+
+abs_path = os.path.dirname(os.path.abspath(os.path.join(__file__, '..')))
+
+MODEL_YEAR = 2017
+
+_shared = {}
+
+
+def load_weather_years(filename_pattern, years):
+    r"""
+    Reads the temperature of several weather years.
+
+    Returns
+    -------
+    temperature : dict
+        Hourly temperature in degC (8760 values, 29th of February dropped)
+        per year. Missing or incomplete years are skipped.
+    """
+    temperature = {}
+    for year in years:
+        filename = os.path.join(abs_path, 'data_raw', filename_pattern.format(year=year))
+        if not os.path.isfile(filename):
+            logging.warning(f'No temperature data for {year}: {filename}')
+            continue
+        series = read_temperature(filename)['T']
+        series = series[~((series.index.month == 2) & (series.index.day == 29))]
+        if len(series) < 8760:
+            logging.warning(f'Skip {year}, it has only {len(series)} time steps.')
+            continue
+        temperature[year] = series.values[:8760]
+
+    return temperature
+
+
+def draw_weather(temperature, runs, sampling='years', block_days=7, seed=None):
+    r"""
+    Draws the weather of the runs.
+
+    Parameters
+    ----------
+    sampling : str
+        'years' draws whole weather years, 'bootstrap' puts together a year
+        of blocks of block_days days, each from a random year at the same
+        time of the year.
+
+    Returns
+    -------
+    draws : list
+        One tuple of years per run, with one year per block for
+        'bootstrap' and a single year for 'years'.
+    """
+    rng = np.random.RandomState(seed)
+    years = sorted(temperature)
+    if sampling == 'years':
+        return [(years[i],) for i in rng.randint(len(years), size=runs)]
+    if sampling == 'bootstrap':
+        blocks = int(np.ceil(365 / block_days))
+        return [tuple(years[i] for i in rng.randint(len(years), size=blocks))
+                for _ in range(runs)]
+    raise ValueError(f'Unknown sampling {sampling}.')
+
+
+def weather_sequence(temperature, draw, block_days=7):
+    r"""
+    Puts together the temperature of one draw.
+    """
+    if len(draw) == 1:
+        return temperature[draw[0]]
+    block = block_days * 24
+    return np.concatenate([temperature[year][n * block:(n + 1) * block]
+                           for n, year in enumerate(draw)])[:8760]
+
+
+def _init_worker(shared):
+    _shared.update(shared)
+
+
+def _summarise(om):
+    import oemof.outputlib as outputlib
+
+    results = outputlib.views.convert_keys_to_strings(
+        outputlib.processing.results(om))
+    row = {'objective': om.objective()}
+    for (n1, n2), res in sorted(results.items()):
+        if 'invest' in res['scalars']:
+            row[f'invest_{n1}_{n2}'] = res['scalars']['invest']
+        if n1 in ('ccgt', 'power_to_heat', 'shortage_heat', 'storage_heat') \
+                and 'flow' in res['sequences']:
+            row[f'flow_{n1}_{n2}'] = res['sequences']['flow'].sum()
+
+    return row
+
+
+def _run_worker(task):
+    import oemof.solph as solph
+
+    run, draw = task
+    cfg = _shared['cfg']
+    block_days = _shared['block_days']
+    row = {'run': run, 'weather': '-'.join(str(year) for year in draw)}
+    try:
+        temperature = pd.Series(
+            weather_sequence(_shared['temperature'], draw, block_days),
+            index=pd.date_range(f'1/1/{MODEL_YEAR}', periods=8760, freq='H'))
+        demand = demand_heat_bdew(MODEL_YEAR, BDEW_PARAMETERS, temperature,
+                                  holidays=_shared['holidays'])
+        demand = resample(demand, cfg.get('resolution', 'H'))
+        energysystem = create_energysystem(cfg, _shared['in_param'], demand,
+                                           _shared['date_time_index'])
+        om = solph.Model(energysystem)
+        solver_results = solve_model(om, solver=cfg['solver'],
+                                     options=cfg.get('solver_options'),
+                                     label='dessau')
+        row['status'] = solver_results['Solver'][0]['Termination condition'].key
+        row['demand_heat'] = demand.sum() * hours_per_step(cfg.get('resolution', 'H'))
+        row.update(_summarise(om))
+    except Exception as e:
+        row['status'] = f'{type(e).__name__}: {e}'
+
+    return row
+
+
+def run_monte_carlo(config_path, results_dir):
+    r"""
+    Runs the Dessau model for many weather draws.
+
+    Parameters
+    ----------
+    config_path : Path to experiment config
+    results_dir : Directory for results
+
+    Returns
+    -------
+    summary : pd.DataFrame
+        Distribution (count, mean, std, min, 5 %, 50 %, 95 %, max) of the
+        results of all runs.
+    """
+    # loaded once here instead of in every forked worker
+    import demandlib.bdew  # noqa: F401
+    from workalendar.europe import Germany
+
+    starttime = time.time()
+    with open(config_path, 'r') as ymlfile:
+        cfg = yaml.load(ymlfile)
+    mc = cfg['monte_carlo']
+    block_days = mc.get('block_days', 7)
+
+    # shared preprocessing
+    temperature = load_weather_years(mc['temperature'], mc['years'])
+    if not temperature:
+        raise ValueError('No temperature data found for the weather years.')
+    draws = draw_weather(temperature, mc['runs'], mc.get('sampling', 'years'),
+                         block_days, mc.get('seed'))
+    shared = {'cfg': cfg,
+              'in_param': pd.read_csv(os.path.join(abs_path, cfg['input_parameter']),
+                                      index_col=[1, 2])['var_value'],
+              'temperature': temperature,
+              'holidays': dict(Germany().holidays(MODEL_YEAR)),
+              'date_time_index': create_timeindex(cfg),
+              'block_days': block_days}
+
+    # identical draws are solved once
+    runs = {}
+    for run, draw in enumerate(draws):
+        runs.setdefault(draw, []).append(run)
+    logging.info(f'{len(draws)} runs, {len(runs)} distinct weather draws')
+
+    output_dir = os.path.join(results_dir, 'monte_carlo')
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    runs_file = os.path.join(output_dir, 'runs.csv')
+
+    context = multiprocessing.get_context('fork' if hasattr(os, 'fork') else 'spawn')
+    with context.Pool(mc.get('processes'), initializer=_init_worker,
+                      initargs=(shared,)) as pool, \
+            open(runs_file, 'w', newline='') as f:
+        writer = None
+        failed = []
+        tasks = [(same_runs[0], draw) for draw, same_runs in runs.items()]
+        tasks_by_run = dict(tasks)
+        for n, row in enumerate(pool.imap_unordered(_run_worker, tasks)):
+            logging.info(f'Weather draw {n + 1}/{len(tasks)}: {row["status"]}')
+            if 'objective' not in row:
+                failed.append(row)
+                continue
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(row), extrasaction='ignore')
+                writer.writeheader()
+            for run in runs[tasks_by_run[row['run']]]:
+                writer.writerow(dict(row, run=run))
+            f.flush()
+
+    if failed:
+        logging.warning(f'{len(failed)} weather draws failed, see failed.csv')
+        pd.DataFrame(failed).to_csv(os.path.join(output_dir, 'failed.csv'), index=False)
+    if writer is None:
+        raise RuntimeError('All weather draws failed.')
+
+    all_runs = pd.read_csv(runs_file, index_col='run')
+    optimal = all_runs['status'] == 'optimal'
+    if not optimal.all():
+        logging.warning(f'{(~optimal).sum()} runs are not optimal, see {runs_file}')
+    summary = all_runs[optimal].describe(percentiles=[0.05, 0.5, 0.95])
+    summary.to_csv(os.path.join(output_dir, 'summary.csv'))
+
+    logging.info(f'Monte-Carlo runs lasted {time.time() - starttime} sec.')
+
+    return summary
+
+
+if __name__ == '__main__':
+    config_path, results_dir = helpers.setup_experiment()
+    logger.define_logging(logpath=results_dir + '/optimisation_results')
+    print(run_monte_carlo(config_path, results_dir))
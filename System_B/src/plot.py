@@ -10,7 +10,12 @@ __copyright__ = "Reiner Lemoine Institut"
 __license__ = "GPLv3"
 __author__ = "c-moeller, jnnr"
 
+import hashlib
+import importlib.util
+import json
+import logging
 import os
+import tempfile
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib import rcParams as rcParams
@@ -31,9 +36,78 @@ def plot_heat_demand(df, filename):
     plt.savefig(filename, figsize=(12, 6), bbox_inches='tight')
 
 
+def topology_hash(grph):
+    r"""
+    Hash of the nodes and edges of a graph, independent of their order.
+    """
+    topology = [sorted(str(n) for n in grph.nodes),
+                sorted((str(u), str(v)) for u, v in grph.edges)]
+    return hashlib.sha1(json.dumps(topology).encode()).hexdigest()
+
+
+def _read_layouts(cache_file):
+    # an unreadable cache (e.g. written by an old version) counts as empty
+    try:
+        with open(cache_file, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_layouts(cache, cache_file):
+    # the cache is shared by the experiments, parallel workers must not see
+    # a half written file
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(cache_file)),
+                               suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(cache, f, indent=1)
+        os.replace(tmp, cache_file)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def graph_layout(grph, cache_file=None):
+    r"""
+    Positions of the nodes, from left to right with graphviz dot.
+
+    Without pygraphviz a spring layout of networkx is used. The layouts are
+    cached in cache_file by topology hash and layout program, so graphviz
+    only runs if the topology has changed.
+
+    Returns
+    -------
+    pos : dict
+        Position (x, y) per node.
+    """
+    prog = 'dot' if importlib.util.find_spec('pygraphviz') else 'spring'
+    key = f'{topology_hash(grph)}_{prog}'
+    if cache_file is not None:
+        cache = _read_layouts(cache_file)
+        if key in cache:
+            return {node: tuple(xy) for node, xy in cache[key].items()}
+
+    if prog == 'dot':
+        pos = nx.drawing.nx_agraph.graphviz_layout(grph, prog='dot', args="-Grankdir=LR")
+    else:
+        logging.warning('pygraphviz is not installed, the graph is drawn with a spring layout.')
+        pos = nx.spring_layout(grph, seed=0)
+    pos = {node: (float(x), float(y)) for node, (x, y) in pos.items()}
+
+    if cache_file is not None:
+        # layouts added by other workers in the meantime are kept
+        cache = _read_layouts(cache_file)
+        cache[key] = pos
+        _write_layouts(cache, cache_file)
+
+    return pos
+
+
 def draw_graph(grph, filename, edge_labels=True, node_color='#AFAFAF',
                edge_color='#CFCFCF', plot=True, store=False,
-               node_size=2000, node_shape='o', with_labels=True, arrows=True):
+               node_size=2000, node_shape='o', with_labels=True, arrows=True,
+               pos=None):
     """
     Draw a graph. This function will be removed in future versions.
 
@@ -64,6 +138,9 @@ def draw_graph(grph, filename, edge_labels=True, node_color='#AFAFAF',
         been passed.
     layout : string
         networkx graph layout, one of: neato, dot, twopi, circo, fdp, sfdp.
+
+    pos : dict
+        Positions of the nodes, see graph_layout. Computed if not given.
     """
     if type(node_color) is dict:
         node_color = [node_color.get(g, '#AFAFAF') for g in grph.nodes()]
@@ -83,7 +160,8 @@ def draw_graph(grph, filename, edge_labels=True, node_color='#AFAFAF',
 
     # draw graph
     plt.figure(figsize=(12, 6))
-    pos = nx.drawing.nx_agraph.graphviz_layout(grph, prog='dot', args="-Grankdir=LR")
+    if pos is None:
+        pos = graph_layout(grph)
     nx.draw(grph, pos=pos, labels=labeldict, **options)
 
     # add edge labels for all edges
@@ -160,7 +238,11 @@ def create_plots(config_path, results_dir):
 
     energysystem = solph.EnergySystem()
     energysystem.restore(dpath=results_dir + '/optimisation_results', filename='es.dump')
+
+    # the graph is built from the dump, its layout is cached for all experiments
     energysystem_graph = graph.create_nx_graph(energysystem)
+    pos = graph_layout(energysystem_graph,
+                       cache_file=os.path.join(os.path.dirname(results_dir), 'graph_layouts.json'))
 
     node_color = { 'natural gas': '#19A8B8',
                    'ccgt': '#19A8B8',
@@ -176,7 +258,7 @@ def create_plots(config_path, results_dir):
                    'demand_heat': '#eeac7e'}
     draw_graph(energysystem_graph, plot=False, store=True, filename=results_dir + '/plots/' + 'es_graph.pdf',
                node_size=5000, edge_color='k',
-               node_color=node_color)
+               node_color=node_color, pos=pos)
     rcParams['figure.figsize'] = [10.0, 10.0]
 
     demand = pd.read_csv(os.path.join(results_dir, cfg['timeseries']['timeseries_demand_heat']))
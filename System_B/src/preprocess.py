@@ -14,17 +14,31 @@ __author__ = "c-moeller, jnnr"
 
 
 import pandas as pd
-import demandlib.bdew as bdew
-import matplotlib
-import matplotlib.pyplot as plt
 import datetime
 import os
-from workalendar.europe import Germany
+import sys
 import yaml
 import helpers
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from oemof_heat_tools import resample, read_csv_cached
 
 abs_path = os.path.dirname(os.path.abspath(os.path.join(__file__, '..')))
 
+BDEW_PARAMETERS = {'efh':{'annual_demand': 0.357205 * 232000000, 'building_class': 4, 'wind_class': 1},
+                   'mfh':{'annual_demand': 0.642795 * 232000000, 'building_class': 4, 'wind_class': 1}}
+
+def read_temperature(filename):
+    """
+    Reads raw MERRA-2 temperature data and converts it to degC.
+    """
+    temperature = read_csv_cached(filename,
+                                  index_col=0,
+                                  usecols=['timestamp','T'],
+                                  parse_dates=True)
+    temperature['T'] -= 273.15
+
+    return temperature
+
 def prepare_timeseries_temperature(config_path, results_dir):
     """
     convert raw temperature data to appropriate format.
@@ -35,28 +49,25 @@ def prepare_timeseries_temperature(config_path, results_dir):
     # load temperature data
     output_file = os.path.join(results_dir, cfg['timeseries']['timeseries_temperature'])
     filename = os.path.join(abs_path, 'data_raw', cfg['raw']['temperature'])
-    temperature = pd.read_csv(filename,
-                              index_col=0,
-                              usecols=['timestamp','T'],
-                              parse_dates=True)
-    temperature['T'] -= 273.15
-    temperature.to_csv(output_file)
+    temperature = read_temperature(filename)
+    resample(temperature, cfg.get('resolution', 'H')).to_csv(output_file)
 
     return temperature
 
-def prepare_timeseries_demand_heat(year, bdew_parameters, temperature,
-                                   output_file):
+def demand_heat_bdew(year, bdew_parameters, temperature, holidays=None):
     """
-    Creates synthetic heat profiles using the BDEW method.
+    Creates a synthetic heat profile (sum of all building types) using the
+    BDEW method.
     """
+    import demandlib.bdew as bdew
+
     # get holidays for germany
-    cal = Germany()
-    holidays = dict(cal.holidays(year))
+    if holidays is None:
+        from workalendar.europe import Germany
+        cal = Germany()
+        holidays = dict(cal.holidays(year))
 
     # create a DataFrame to hold the timeseries
-    demand = pd.DataFrame(
-        index=pd.date_range(pd.datetime(year, 1, 1, 0),
-                            periods=8760, freq='H'))
     demand = pd.DataFrame(index=temperature.index)
 
     for key, param in bdew_parameters.items():
@@ -68,12 +79,24 @@ def prepare_timeseries_demand_heat(year, bdew_parameters, temperature,
                 annual_heat_demand=param['annual_demand'],
                 name=key).get_bdew_profile()
 
+    return demand.sum(axis=1)
+
+def prepare_timeseries_demand_heat(year, bdew_parameters, temperature,
+                                   output_file, resolution='H'):
+    """
+    Creates synthetic heat profiles using the BDEW method. The hourly
+    profile is resampled to the resolution of the model.
+    """
+    demand = demand_heat_bdew(year, bdew_parameters, temperature)
+    demand = resample(demand, resolution)
+
     # save heat demand time series
-    demand.sum(axis=1).to_csv(output_file)
+    demand.to_csv(output_file)
 
 def prepare_timeseries_price_gas():
     # prepare gas price time series
-    ger_day_ahead_prices_2006_2018 = pd.read_csv(abs_path +'/data/opsd-time_series-2018-06-30/time_series_60min_singleindex.csv', index_col='cet_cest_timestamp')['DE_price_day_ahead']
+    # only the day-ahead prices are read from the cached binary copy of the OPSD file
+    ger_day_ahead_prices_2006_2018 = read_csv_cached(abs_path +'/data/opsd-time_series-2018-06-30/time_series_60min_singleindex.csv', columns=['DE_price_day_ahead'], index_col='cet_cest_timestamp')['DE_price_day_ahead']
     print(ger_day_ahead_prices_2006_2018)
     ger_day_ahead_prices_2014 = ger_day_ahead_prices_2006_2018.loc['2014-01-01T00:00:00+0100':'2014-12-31T23:00:00+0100']
     ger_day_ahead_prices_2006_2018.to_csv(abs_path+'/data/'+'day_ahead_price_el_2006_2018.csv')
@@ -93,11 +116,9 @@ def prepare_timeseries(config_path, results_dir):
     temperature = prepare_timeseries_temperature(config_path, results_dir)
 
     # heat demand
-    bdew_parameters = {'efh':{'annual_demand': 0.357205 * 232000000, 'building_class': 4, 'wind_class': 1},
-                       'mfh':{'annual_demand': 0.642795 * 232000000, 'building_class': 4, 'wind_class': 1}}
-
-    prepare_timeseries_demand_heat(2017, bdew_parameters, temperature,
-                                   os.path.join(results_dir, cfg['timeseries']['timeseries_demand_heat']))
+    prepare_timeseries_demand_heat(2017, BDEW_PARAMETERS, temperature,
+                                   os.path.join(results_dir, cfg['timeseries']['timeseries_demand_heat']),
+                                   cfg.get('resolution', 'H'))
 
 if __name__ == '__main__':
     config_path, results_dir = helpers.setup_experiment()
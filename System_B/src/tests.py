@@ -1,8 +1,14 @@
 import os
+import sys
 from main import main
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from oemof_heat_tools.startup import import_profile
 
+# seconds, the import of oemof.solph and pyomo takes most of it
+IMPORT_TIME_LIMIT = 5
 
-def test_run_debug():
+
+def debug_experiment():
     abs_path = os.path.dirname(os.path.abspath(os.path.join(__file__, '..')))
 
     config_path = os.path.join(abs_path, 'experiment_configs/debug.yml')
@@ -11,6 +17,12 @@ def test_run_debug():
     config_filename = os.path.split(config_path)[1]
     results_dir = abs_path + '/model_runs/' + config_filename[:-4]
 
+    return config_path, results_dir
+
+
+def test_run_debug():
+    config_path, results_dir = debug_experiment()
+
     # create results directory if it does not exist
     if not os.path.exists(results_dir):
         os.makedirs(results_dir + '/data_preprocessed')
@@ -22,5 +34,29 @@ def test_run_debug():
     main(config_path, results_dir)
 
 
+def test_import_solve_only():
+    # modules used by solve-only workers must not load the packages of
+    # the other stages
+    src_path = os.path.dirname(os.path.abspath(__file__))
+    for module in ['main', 'model_dessau']:
+        profile = import_profile(module, path=src_path)
+        assert profile['heavy'] == [], f'{module} loads {profile["heavy"]}'
+        assert profile['seconds'] < IMPORT_TIME_LIMIT, \
+            f'Import of {module} took {profile["seconds"]:.1f} s'
+
+
+def test_solve_stage_imports():
+    # the solve stage of a worker must not load the packages of the plots,
+    # it uses the preprocessed data of test_run_debug
+    config_path, results_dir = debug_experiment()
+    src_path = os.path.dirname(os.path.abspath(__file__))
+    profile = import_profile(
+        'model_dessau', path=src_path,
+        call=f'model_dessau.run_model_dessau({config_path!r}, {results_dir!r})')
+    assert profile['heavy'] == [], f'The solve stage loads {profile["heavy"]}'
+
+
 if __name__ == '__main__':
-    test_run_debug()
\ No newline at end of file
+    test_import_solve_only()
+    test_run_debug()
+    test_solve_stage_imports()
@@ -20,9 +20,15 @@ import pyomo.environ as po
 import oemof.outputlib as outputlib
 
 import logging
+import os
+import sys
 import time
 import pandas as pd
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from oemof_heat_tools import (solve_model, solve_quick_look, relaxation_summary,
+                              read_csv_cached)
+
 # import oemof plots
 try:
     import matplotlib.pyplot as plt
@@ -30,6 +36,8 @@ except ImportError:
     plt = None
 
 number_of_time_steps = 500
+quick_look = False  # solve the LP relaxation (Desal min=0.5) first and report it
+screening = False  # together with quick_look: keep the relaxation and skip the MILP
 
 # initiate the logger
 logger.define_logging(logfile='oemof_example.log',
@@ -43,7 +51,7 @@ date_time_index = pd.date_range('1/1/2017', periods=number_of_time_steps,
 
 # Read data file
 # Import  PV and demand data
-data = pd.read_csv('data_input/example_wat3.csv', sep=';',)
+data = read_csv_cached('data_input/example_wat3.csv', sep=';')
 
 # Initialise the energysystem
 energysystem = solph.EnergySystem(timeindex=date_time_index)
@@ -173,10 +181,21 @@ myconstrains.storage_size = po.Constraint(expr=(
         om.GenericInvestmentStorageBlock.invest[storage_thh] <= 5*om.InvestmentFlow.invest[bthh, PB]))
 
 # Set tee to True to get the solver output
-om.solve(solver='cbc', solve_kwargs={'tee': True})
-
-energysystem.results['main'] = outputlib.processing.results(om)
-energysystem.results['meta'] = outputlib.processing.meta_results(om)
+if quick_look:
+    relaxation, milp_solved = solve_quick_look(
+        om, solver='cbc', tee=True, skip_milp=(lambda relaxation: screening))
+    print(relaxation_summary(relaxation))
+else:
+    solve_model(om, solver='cbc', tee=True)
+    milp_solved = True
+
+if milp_solved:
+    energysystem.results['main'] = outputlib.processing.results(om)
+    energysystem.results['meta'] = outputlib.processing.meta_results(om)
+else:
+    energysystem.results['main'] = relaxation['main']
+    energysystem.results['meta'] = {'objective': relaxation['objective'],
+                                    'relaxation': True}
 energysystem.results['param'] = outputlib.processing.param_results(om)
 
 # store the results to plot them in other file
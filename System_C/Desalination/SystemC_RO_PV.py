@@ -22,7 +22,11 @@ import oemof_visio as oev
 # import oemof base classes to create energy system objects
 import logging
 import os
+import sys
 import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from oemof_heat_tools import solve_model, read_csv_cached
 import pprint as pp
 
 # import oemof plots
@@ -48,7 +52,7 @@ date_time_index = pd.date_range('1/1/2017', periods=number_of_time_steps,
 
 # Read data file
 # Import  PV and demand data
-data = pd.read_csv('data_input/example_wat3.csv', sep=';',)
+data = read_csv_cached('data_input/example_wat3.csv', sep=';')
 
 # initialisation of the energysystem
 energysystem = solph.EnergySystem(timeindex=date_time_index)
@@ -133,7 +137,7 @@ logging.info('System build')
 # initialise the operational model (create problem)
 om = solph.Model(energysystem)
 # set tee to True to get the solver output
-om.solve(solver='cbc', solve_kwargs={'tee': True})
+solve_model(om, solver='cbc', tee=True)
 
 logging.info('Modell erstellt')
 
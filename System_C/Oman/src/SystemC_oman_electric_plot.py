@@ -15,22 +15,18 @@ System C: concrete example: Plot ocooling process with a solar collector
 from oemof.tools import logger
 import oemof.solph as solph
 
-import oemof.outputlib as outputlib
-import oemof_visio as oev
-
 import logging
 import os
 import yaml
 import pandas as pd
+import sys
 from SystemC_oman_electric import ep_costs_func
-
-# import oemof plots
-try:
-    import matplotlib.pyplot as plt
-except ImportError:
-    plt = None
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+from oemof_heat_tools.results import Results
+from kpi import KPICollector
 
 df_all_var = pd.DataFrame()
+all_variations = []
 
 
 def make_csv_and_plot_electric(config_path, var_number):
@@ -58,13 +54,15 @@ def make_csv_and_plot_electric(config_path, var_number):
     # Work with the results #
     #########################
 
-    results_strings = outputlib.views.convert_keys_to_strings(energysystem.results['main'])
+    # one indexed frame per results dict, the nodes are selected from it
+    results = Results(energysystem.results['main'])
+    param = Results(energysystem.results['param'])
 
-    cool_bus = outputlib.views.node(energysystem.results['main'], 'cool')
-    waste_bus = outputlib.views.node(energysystem.results['main'], 'waste')
-    el_bus = outputlib.views.node(energysystem.results['main'], 'electricity')
-    ambient_res = outputlib.views.node(energysystem.results['main'], 'ambient')
-    none_res = outputlib.views.node(energysystem.results['main'], 'None')
+    cool_bus = results.node('cool')
+    waste_bus = results.node('waste')
+    el_bus = results.node('electricity')
+    ambient_res = results.node('ambient')
+    none_res = results.node('None')
 
     # sequences:
     cool_seq = cool_bus['sequences']
@@ -77,7 +75,7 @@ def make_csv_and_plot_electric(config_path, var_number):
     waste_scal = waste_bus['scalars']
     el_scal = el_bus['scalars']
     # non_scal = none_res['scalars']
-    none_scal_given = outputlib.views.node(energysystem.results['param'], 'None')['scalars']
+    none_scal_given = param.node('None')['scalars']
     el_scal[(('pv', 'electricity'), 'invest')] = el_scal[(('pv', 'electricity'), 'invest')]*0.7616
     # Umrechnung, da das Invest-object der pv auf 0.7616 kWpeak normiert ist.
 
@@ -129,27 +127,30 @@ def make_csv_and_plot_electric(config_path, var_number):
     ########################
 
     # scalars:
-    scalars_all = cool_scal.append(waste_scal).append(el_scal)
-    for i in range(0, none_scal_given.count()):
-        if 'nominal_capacity' in none_scal_given.index[i]:
-            scalars_all = pd.concat([scalars_all, pd.Series([none_scal_given[i]], index=[none_scal_given.index[i]])])
-    scalars_all = pd.concat([scalars_all, pd.Series([sol_fraction_el], index=["('solar fraction', 'electric'), ' ')"])])
-    if df_control_el['Product'].sum() != 0:
-        scalars_all = pd.concat([scalars_all, pd.Series([df_control_el['Product'].sum()], index=["Has to be 0!!!"])])
-    scalars_all = pd.concat([scalars_all, pd.Series([el_used], index=["('grid_el', 'electricity'), 'summe')"])])
+    kpis = KPICollector()
+    for scalars in (cool_scal, waste_scal, el_scal):
+        kpis.add_scalars(scalars)
+    kpis.add_scalars(none_scal_given[[('nominal_capacity' in i) for i in none_scal_given.index]])
+    kpis.check_zero('grid to excess', df_control_el['Product'].sum())
+    kpis.add("('solar fraction', 'electric'), ' ')", sol_fraction_el)
+    kpis.add("('grid_el', 'electricity'), 'summe')", el_used)
     if cfg['exp_number'] != 20:
-        scalars_all = pd.concat(
-            [scalars_all, pd.Series([costs_total_w_stor], index=["('costs', 'w_stor'), 'per year')"])])
-    scalars_all = pd.concat([scalars_all, pd.Series([costs_total], index=["('costs', 'wo_stor'), 'per year')"])])
+        kpis.add("('costs', 'w_stor'), 'per year')", costs_total_w_stor)
+    kpis.add("('costs', 'wo_stor'), 'per year')", costs_total)
     if cfg['exp_number'] == 20:
-        scalars_all = pd.concat(
-            [scalars_all, pd.Series([costs_total_wo_stor], index=["('costs', 'wo stor'), 'per year')"])])
-    scalars_all = pd.concat([scalars_all, pd.Series(['{0}_{1}'.format(cfg['exp_number'], var_number)], index=["('Exp', 'Var'), 'number')"])])
+        kpis.add("('costs', 'wo stor'), 'per year')", costs_total_wo_stor)
+    kpis.add("('Exp', 'Var'), 'number')", '{0}_{1}'.format(cfg['exp_number'], var_number))
+    scalars_all = kpis.to_series()
 
     scalars_all.to_csv(csv_path + 'Oman_electric_{0}_{1}_scalars.csv'.format(cfg['exp_number'], var_number))
 
-    df_all_var = pd.concat([df_all_var, scalars_all], axis=1, sort=True)
+    # the variations are joined once, after the last one
+    all_variations.append(scalars_all.rename(var_number))
+    collected = None
     if var_number == (cfg['number_of_variations']-1):
+        df_all_var = pd.concat(all_variations, axis=1, sort=False)
+        collected = df_all_var
+        del all_variations[:]
         df_all_var.to_csv(csv_path + 'Oman_electric_{0}_scalars_all_variations.csv'.format(cfg['exp_number']))
         logging.info('Writing DF_all_variations into csv')
 
@@ -161,10 +162,19 @@ def make_csv_and_plot_electric(config_path, var_number):
     sequences_df = pd.merge(sequences_df, cool_seq, left_index=True, right_index=True)
     sequences_df.to_csv(csv_path + 'Oman_electric_{0}_{1}_sequences.csv'.format(cfg['exp_number'], var_number))
 
+    # duals: marginal costs of the buses, reduced costs and cost sensitivities
+    duals = energysystem.results.get('duals', {})
+    for name, df in duals.items():
+        df.to_csv(csv_path + 'Oman_electric_{0}_{1}_{2}.csv'.format(cfg['exp_number'], var_number, name))
+
     ########################
     # Plotting the results #
     ########################
 
+    # plotting packages are only loaded when plotting
+    import matplotlib.pyplot as plt
+    import oemof_visio as oev
+
     cool_seq_resample = cool_seq.iloc[sp:ep]
     waste_seq_resample = waste_seq.iloc[sp:ep]
     el_seq_resample = el_seq.iloc[sp:ep]
@@ -312,4 +322,5 @@ def make_csv_and_plot_electric(config_path, var_number):
 
     # plt.show()
 
-    return df_all_var
+    # the scalars of all variations after the last one, else None
+    return collected
@@ -58,15 +58,16 @@ import oemof.outputlib as outputlib
 
 import logging
 import os
+import sys
 import yaml
 import pandas as pd
 import pyomo.environ as po
 
-# import oemof plots
-try:
-    import matplotlib.pyplot as plt
-except ImportError:
-    plt = None
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+from oemof_heat_tools import (solve_model, apply_warm_start, restore_results,
+                              enable_duals, dual_results, resample,
+                              hours_per_step, scale_capacity_loss,
+                              read_time_series)
 
 
 def ep_costs_func(capex, n, opex, wacc):
@@ -102,7 +103,12 @@ def run_model_thermal(config_path, var_number):
     param_value = param_df['value']
 
     # Import  PV and demand data
-    data = pd.read_csv((data_ts_path + cfg['time_series_file_name']), sep=';')
+    data = read_time_series((data_ts_path + cfg['time_series_file_name']),
+                            shared=cfg.get('shared_inputs', False), sep=';')
+    resolution = cfg.get('resolution', 'H')
+    if hours_per_step(resolution) != 1:
+        # hourly data is used as read, without a copy of the shared data
+        data = resample(data, resolution).reset_index(drop=True)
 
     # redefine ep_costs_function:
     def ep_costs_f(capex, n, opex):
@@ -114,7 +120,8 @@ def run_model_thermal(config_path, var_number):
                           screen_level=logging.INFO,
                           file_level=logging.DEBUG)
 
-    date_time_index = pd.date_range('1/1/2017', periods=(2 if debug is True else number_of_time_steps), freq='H')
+    date_time_index = pd.date_range('1/1/2017', periods=(2 if debug is True else int(number_of_time_steps / hours_per_step(resolution))),
+                                    freq=resolution)
 
     # Initialise the energysystem
     logging.info('Initialize the energy system')
@@ -221,7 +228,7 @@ def run_model_thermal(config_path, var_number):
             label='storage_cool',
             inputs={bco: solph.Flow()},
             outputs={bco: solph.Flow()},
-            capacity_loss=param_value['capac_loss_stor_cool'],
+            capacity_loss=scale_capacity_loss(param_value['capac_loss_stor_cool'], resolution),
             # invest_relation_input_capacity=1 / 6,
             # invest_relation_output_capacity=1 / 6,
             inflow_conversion_factor=param_value['conv_factor_stor_cool_input'],
@@ -234,7 +241,7 @@ def run_model_thermal(config_path, var_number):
             label='storage_cool',
             inputs={bco: solph.Flow()},
             outputs={bco: solph.Flow()},
-            capacity_loss=param_value['capac_loss_stor_cool'],
+            capacity_loss=scale_capacity_loss(param_value['capac_loss_stor_cool'], resolution),
             # invest_relation_input_capacity=1 / 6,
             # invest_relation_output_capacity=1 / 6,
             inflow_conversion_factor=param_value['conv_factor_stor_cool_input'],
@@ -246,7 +253,7 @@ def run_model_thermal(config_path, var_number):
             label='storage_thermal',
             inputs={bth: solph.Flow()},
             outputs={bth: solph.Flow()},
-            capacity_loss=param_value['capac_loss_stor_thermal'],
+            capacity_loss=scale_capacity_loss(param_value['capac_loss_stor_thermal'], resolution),
             # invest_relation_input_capacity=1 / 6,
             # invest_relation_output_capacity=1 / 6,
             inflow_conversion_factor=param_value['conv_factor_stor_thermal_input'],
@@ -259,7 +266,7 @@ def run_model_thermal(config_path, var_number):
             label='storage_thermal',
             inputs={bth: solph.Flow()},
             outputs={bth: solph.Flow()},
-            capacity_loss=param_value['capac_loss_stor_thermal'],
+            capacity_loss=scale_capacity_loss(param_value['capac_loss_stor_thermal'], resolution),
             # invest_relation_input_capacity=1 / 6,
             # invest_relation_output_capacity=1 / 6,
             inflow_conversion_factor=param_value['conv_factor_stor_thermal_input'],
@@ -271,7 +278,7 @@ def run_model_thermal(config_path, var_number):
             label='storage_electricity',
             inputs={bel: solph.Flow()},
             outputs={bel: solph.Flow()},
-            capacity_loss=param_value['capac_loss_stor_el'],
+            capacity_loss=scale_capacity_loss(param_value['capac_loss_stor_el'], resolution),
             # invest_relation_input_capacity=1 / 6,
             # invest_relation_output_capacity=1 / 6,
             inflow_conversion_factor=param_value['conv_factor_stor_el_input'],
@@ -285,7 +292,7 @@ def run_model_thermal(config_path, var_number):
             label='storage_electricity',
             inputs={bel: solph.Flow()},
             outputs={bel: solph.Flow()},
-            capacity_loss=param_value['capac_loss_stor_el'],
+            capacity_loss=scale_capacity_loss(param_value['capac_loss_stor_el'], resolution),
             # invest_relation_input_capacity=1 / 6,
             # invest_relation_output_capacity=1 / 6,
             inflow_conversion_factor=param_value['conv_factor_stor_el_input'],
@@ -301,8 +308,26 @@ def run_model_thermal(config_path, var_number):
     # Initialise the operational model (create the problem) with constrains
     model = solph.Model(energysystem)
 
+    # Import duals and reduced costs for the sensitivity analysis
+    if cfg.get('duals', False):
+        enable_duals(model)
+
+    # Start from the solution of the previous variation
+    warm_start = cfg.get('warm_start', False) and var_number > 0
+    if warm_start:
+        previous = 'oman_thermal_{0}_{1}.oemof'.format(cfg['exp_number'], var_number - 1)
+        # the previous variation may have failed, been skipped or still run on another worker
+        if not os.path.exists(os.path.join(results_path, 'dumps', previous)):
+            logging.warning('No dump of the previous variation ({0}), cold start.'.format(previous))
+            warm_start = False
+    if warm_start:
+        apply_warm_start(model, restore_results(
+            dpath=(results_path + '/dumps'), filename=previous),
+            invest_window=cfg.get('warm_start_invest_window'))
+
     logging.info('Solve the optimization problem')
-    model.solve(solver=solver, solve_kwargs={'tee': solver_verbose})
+    solve_model(model, solver=solver, options=cfg.get('solver_options'), tee=solver_verbose,
+                label='oman_thermal', warmstart=warm_start)
 
     if cfg['debug']:
         filename = results_path + '/lp_files/' + 'Oman_thermal_{0}_{1}.lp'.format(cfg['exp_number'], var_number)
@@ -314,6 +339,8 @@ def run_model_thermal(config_path, var_number):
     energysystem.results['main'] = outputlib.processing.results(model)
     energysystem.results['meta'] = outputlib.processing.meta_results(model)
     energysystem.results['param'] = outputlib.processing.parameter_as_dict(model)
+    if cfg.get('duals', False):
+        energysystem.results['duals'] = dual_results(model)
 
     energysystem.dump(dpath=(results_path + '/dumps'),
                       filename='oman_thermal_{0}_{1}.oemof'.format(cfg['exp_number'], var_number))
@@ -15,24 +15,241 @@ System C: concrete example: Plot ocooling process with a solar collector
 from oemof.tools import logger
 import oemof.solph as solph
 
-import oemof.outputlib as outputlib
-import oemof_visio as oev
-
 import logging
 import os
 import yaml
 import pandas as pd
+import sys
 from SystemC_oman_thermal import ep_costs_func
-
-# import oemof plots
-try:
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+from oemof_heat_tools.plotting import downsample, axes_points
+from oemof_heat_tools.results import Results
+from kpi import KPICollector
+
+
+def shape_legend(node, reverse=False, **kwargs):  # just copied
+    handels = kwargs['handles']
+    labels = kwargs['labels']
+    axes = kwargs['ax']
+    parameter = {}
+
+    new_labels = []
+    for label in labels:
+        label = label.replace('(', '')
+        label = label.replace('), flow)', '')
+        label = label.replace(node, '')
+        label = label.replace(',', '')
+        label = label.replace(' ', '')
+        new_labels.append(label)
+    labels = new_labels
+
+    parameter['bbox_to_anchor'] = kwargs.get('bbox_to_anchor', (1, 1))
+    parameter['loc'] = kwargs.get('loc', 'upper left')
+    parameter['ncol'] = kwargs.get('ncol', 1)
+    plotshare = kwargs.get('plotshare', 0.9)
+
+    if reverse:
+        handels = handels.reverse()
+        labels = labels.reverse()
+
+    box = axes.get_position()
+    axes.set_position([box.x0, box.y0, box.width * plotshare, box.height])
+
+    parameter['handles'] = handels
+    parameter['labels'] = labels
+    axes.legend(**parameter)
+    return axes
+
+
+CDICT = {
+    (('collector', 'thermal'), 'flow'): '#ffde32',
+    (('boiler', 'thermal'), 'flow'): '#ff0000',
+    (('storage_thermal', 'thermal'), 'flow'): '#9acd32',
+    (('thermal', 'storage_thermal'), 'flow'): '#9acd32',
+    (('thermal', 'absorption_chiller'), 'flow'): '#4682b4',
+    (('thermal', 'excess_thermal'), 'flow'): '#4682b4',
+    (('absorption_chiller', 'cool'), 'flow'): '#4682b4',
+    (('storage_cool', 'cool'), 'flow'): '#555555',
+    (('cool', 'storage_cool'), 'flow'): '#9acd32',
+    (('cool', 'demand'), 'flow'): '#cd0000',
+    (('el_grid', 'electricity'), 'flow'): '#999999',
+    (('pv', 'electricity'), 'flow'): '#ffde32',
+    (('storage_el', 'electricity'), 'flow'): '#9acd32',
+    (('electricity', 'storage_el'), 'flow'): '#9acd32',
+    (('electricity', 'cooling_tower'), 'flow'): '#ff0000',
+    (('electricity', 'aquifer'), 'flow'): '#555555',
+    (('storage_cool', 'None'), 'capacity'): '#555555',
+    (('storage_cool', 'cool'), 'flow'): '#9acd32',
+    (('absorpion_chiller', 'waste'), 'flow'): '#4682b4',
+    (('waste', 'cool_tower'), 'flow'): '#42c77a'}
+
+# define order of inputs and outputs
+INORDERTHERMAL = [(('collector', 'thermal'), 'flow'),
+                  (('storage_thermal', 'thermal'), 'flow'),
+                  (('boiler', 'thermal'), 'flow')]
+OUTORDERTHERMAL = [(('thermal', 'absorption_chiller'), 'flow'),
+                   (('thermal', 'storage_thermal'), 'flow'),
+                   (('thermal', 'excess_thermal'), 'flow')]
+INORDERCOOL = [(('absorption_chiller', 'cool'), 'flow'),
+               (('storage_cool', 'cool'), 'flow')]
+OUTORDERCOOL = [(('cool', 'demand'), 'flow'),
+                (('cool', 'storage_cool'), 'flow')]
+INORDEREL = [(('pv', 'electricity'), 'flow'),
+             (('storage_el', 'electricity'), 'flow'),
+             (('el_grid', 'electricity'), 'flow')]
+OUTORDEREL = [(('electricity', 'cooling_tower'), 'flow'),
+              (('electricity', 'aquifer'), 'flow'),
+              (('electricity', 'storage_electricity'), 'flow')]
+# inorderstor = [(('cool', 'storage_cool'), 'flow')]
+# outorderstor = [(('storage_cool', 'cool'), 'flow'),
+#                 (('storage_cool', 'None'), 'capacity')]
+
+
+def _tick_points(tick_distance, seq, data):
+    # tick distance in points of the downsampled sequences
+    steps = len(data['thermal'])
+    return max(int(round(tick_distance * len(seq) / steps)), 1)
+
+
+def plot_thermal(data, tick_distance=14):
+    r"""
+    Plots the thermal, cooling and electrical bus of a variation into
+    one figure.
+
+    Parameters
+    ----------
+    data : dict
+        Sequences of the buses 'thermal', 'cool' and 'electricity' in
+        the plotted period. Long periods are downsampled to the width of
+        the axes, keeping the time steps with the minimum and maximum
+        total flow of the bus, so the stacked flows stay balanced.
+
+    tick_distance : int
+        Time steps between the ticks.
+    """
+    # plotting packages are only loaded when plotting
     import matplotlib.pyplot as plt
-except ImportError:
-    plt = None
+    import oemof_visio as oev
+
+    fig = plt.figure(figsize=(15, 15))
+
+    # plot thermal energy
+    ax = fig.add_subplot(2, 2, 2)
+    seq = downsample(data['thermal'], axes_points(ax), total=True)
+    ticks = _tick_points(tick_distance, seq, data)
+    my_plot_thermal = oev.plot.io_plot(
+            'thermal', seq, cdict=CDICT,
+            inorder=INORDERTHERMAL, outorder=OUTORDERTHERMAL,
+            ax=ax, smooth=False)
+
+    ax_thermal = shape_legend('thermal', **my_plot_thermal)
+    oev.plot.set_datetime_ticks(ax_thermal, seq.index, tick_distance=ticks,
+                                date_format='%d-%m-%H', offset=1)
+
+    ax_thermal.set_ylabel('Power in kW')
+    ax_thermal.set_xlabel('time')
+    ax_thermal.set_title("thermal")
+
+    # plot cooling energy
+    ax = fig.add_subplot(2, 2, 1)
+    seq = downsample(data['cool'], axes_points(ax), total=True)
+    ticks = _tick_points(tick_distance, seq, data)
+    my_plot_cool = oev.plot.io_plot(
+            'cool', seq, cdict=CDICT,
+            inorder=INORDERCOOL, outorder=OUTORDERCOOL,
+            ax=ax, smooth=False)
+
+    ax_cool = shape_legend('cool', **my_plot_cool)
+    oev.plot.set_datetime_ticks(ax_cool, seq.index, tick_distance=ticks,
+                                date_format='%d-%m-%H', offset=1)
+
+    ax_cool.set_ylabel('Power in kW')
+    ax_cool.set_xlabel('time')
+    ax_cool.set_title("cool")
+
+    # plot electrical energy
+    ax = fig.add_subplot(2, 2, 3)
+    seq = downsample(data['electricity'], axes_points(ax), total=True)
+    ticks = _tick_points(tick_distance, seq, data)
+    my_plot_el = oev.plot.io_plot(
+            'electricity', seq, cdict=CDICT,
+            inorder=INORDEREL, outorder=OUTORDEREL,
+            ax=ax, smooth=False)
+
+    ax_el = shape_legend('electricity', **my_plot_el)
+    oev.plot.set_datetime_ticks(ax_el, seq.index, tick_distance=ticks,
+                                date_format='%d-%m-%H', offset=1)
+
+    ax_el.set_ylabel('Power in kW')
+    ax_el.set_xlabel('time')
+    ax_el.set_title("electricity")
+
+    #
+    # def shape_legend_stor(node, reverse=False, **kwargs):  # just copied
+    #     handels = kwargs['handles']
+    #     labels = kwargs['labels']
+    #     axes = kwargs['ax']
+    #     parameter = {}
+    #
+    #     new_labels = []
+    #     for label in labels:
+    #         label = label.replace('(', '')
+    #         label = label.replace('), flow)', '')
+    #         label = label.replace('None', '')
+    #         label = label.replace(')', '')
+    #         label = label.replace('_'+str(node), '')
+    #         label = label.replace(node, '')
+    #         label = label.replace(',', '')
+    #         label = label.replace(' ', '')
+    #         label = label.replace('cool', 'input/output')
+    #         if label not in new_labels:
+    #             new_labels.append(label)
+    #     labels = new_labels
+    #
+    #     parameter['bbox_to_anchor'] = kwargs.get('bbox_to_anchor', (1, 1))
+    #     parameter['loc'] = kwargs.get('loc', 'upper left')
+    #     parameter['ncol'] = kwargs.get('ncol', 1)
+    #     plotshare = kwargs.get('plotshare', 0.9)
+    #
+    #     if reverse:
+    #         handels = handels.reverse()
+    #         labels = labels.reverse()
+    #
+    #     box = axes.get_position()
+    #     axes.set_position([box.x0, box.y0, box.width * plotshare, box.height])
+    #
+    #     parameter['handles'] = handels
+    #     parameter['labels'] = labels
+    #     axes.legend(**parameter)
+    #     return axes
+    #
+    #
+    # # plot storage capacity
+    # my_plot_stor = oev.plot.io_plot(
+    #         'storage_cool', ambient_seq_resample, cdict=CDICT,
+    #         inorder=inorderstor, outorder=outorderstor,
+    #         ax=fig.add_subplot(2, 2, 4), smooth=False)
+    #
+    # ax_stor = shape_legend_stor('storage_cool', **my_plot_stor)
+    # oev.plot.set_datetime_ticks(ax_stor, ambient_seq_resample.index,
+    #                             tick_distance=tick_distance,
+    #                             date_format='%d-%m-%H', offset=1)
+    #
+    # ax_stor.set_ylabel('Power in kW and capacity in kWh')
+    # ax_stor.set_xlabel('time')
+    # ax_stor.set_title("cooling storage")
+
+    return fig
+
 
 df_all_var = pd.DataFrame()
 
-def make_csv_and_plot(config_path, var_number):
+def make_csv_and_plot(config_path, var_number, plot_jobs=None):
+    r"""
+    Writes the results of a variation to csv and plots them. If plot_jobs
+    is a list, the figure is appended as a job for
+    oemof_heat_tools.plotting.render_figures instead of being drawn.
+    """
     global df_all_var
     global df_all_var_all_exp
 
@@ -58,15 +275,17 @@ def make_csv_and_plot(config_path, var_number):
     # Work with the results #
     #########################
 
-    results_strings = outputlib.views.convert_keys_to_strings(energysystem.results['main'])
+    # one indexed frame per results dict, the nodes are selected from it
+    results = Results(energysystem.results['main'])
+    param = Results(energysystem.results['param'])
 
-    thermal_bus = outputlib.views.node(energysystem.results['main'], 'thermal')
-    cool_bus = outputlib.views.node(energysystem.results['main'], 'cool')
-    waste_bus = outputlib.views.node(energysystem.results['main'], 'waste')
-    el_bus = outputlib.views.node(energysystem.results['main'], 'electricity')
-    gas_bus = outputlib.views.node(energysystem.results['main'], 'gas')
-    ambient_res = outputlib.views.node(energysystem.results['main'], 'ambient')
-    none_res = outputlib.views.node(energysystem.results['main'], 'None')
+    thermal_bus = results.node('thermal')
+    cool_bus = results.node('cool')
+    waste_bus = results.node('waste')
+    el_bus = results.node('electricity')
+    gas_bus = results.node('gas')
+    ambient_res = results.node('ambient')
+    none_res = results.node('None')
 
     # sequences:
     thermal_seq = thermal_bus['sequences']
@@ -82,7 +301,7 @@ def make_csv_and_plot(config_path, var_number):
     waste_scal = waste_bus['scalars']
     el_scal = el_bus['scalars']
     none_scal = none_res['scalars']
-    none_scal_given = outputlib.views.node(energysystem.results['param'], 'None')['scalars']
+    none_scal_given = param.node('None')['scalars']
     el_scal[(('pv', 'electricity'), 'invest')] = el_scal[(('pv', 'electricity'), 'invest')]*0.7616
     # Umrechnung, da das Invest-object der pv auf 0.7616 kWpeak normiert ist.
     # solarer Deckungsanteil
@@ -147,25 +366,23 @@ def make_csv_and_plot(config_path, var_number):
     ########################
 
     # scalars:
-    scalars_all = thermal_scal.append(cool_scal).append(waste_scal).append(none_scal).append(el_scal)
-    for i in range(0, none_scal_given.count()):
-        if 'nominal_capacity' in none_scal_given.index[i]:
-            scalars_all = pd.concat([scalars_all, pd.Series([none_scal_given[i]], index=[none_scal_given.index[i]])])
-    scalars_all = pd.concat([scalars_all, pd.Series([sol_fraction_th], index=["('solar fraction', 'thermal'), ' ')"])])
-    if df_control_th['Product'].sum() != 0:
-        scalars_all = pd.concat([scalars_all, pd.Series([df_control_th['Product'].sum()], index=["Has to be 0!!!"])])
-    scalars_all = pd.concat([scalars_all, pd.Series([sol_fraction_el], index=["('solar fraction', 'electric'), ' ')"])])
-    if df_control_el['Product'].sum() != 0:
-        scalars_all = pd.concat([scalars_all, pd.Series([df_control_el['Product'].sum()], index=["Has to be 0!!!"])])
-    scalars_all = pd.concat([scalars_all, pd.Series([gas_used], index=["('natural gas', 'gas'), 'summe')"])])
+    kpis = KPICollector()
+    for scalars in (thermal_scal, cool_scal, waste_scal, none_scal, el_scal):
+        kpis.add_scalars(scalars)
+    kpis.add_scalars(none_scal_given[[('nominal_capacity' in i) for i in none_scal_given.index]])
+    kpis.check_zero('boiler to excess', df_control_th['Product'].sum())
+    kpis.check_zero('grid to excess', df_control_el['Product'].sum())
+    kpis.add("('solar fraction', 'thermal'), ' ')", sol_fraction_th)
+    kpis.add("('solar fraction', 'electric'), ' ')", sol_fraction_el)
+    kpis.add("('natural gas', 'gas'), 'summe')", gas_used)
+    kpis.add("('grid_el', 'electricity'), 'summe')", el_from_grid)
     if cfg['exp_number'] != 10:
-        scalars_all = pd.concat(
-            [scalars_all, pd.Series([costs_total_w_stor], index=["('costs', 'w_stor'), 'per year')"])])
-    scalars_all = pd.concat([scalars_all, pd.Series([costs_total], index=["('costs', 'wo_stor'), 'per year')"])])
+        kpis.add("('costs', 'w_stor'), 'per year')", costs_total_w_stor)
+    kpis.add("('costs', 'wo_stor'), 'per year')", costs_total)
     if cfg['exp_number'] == 10:
-        scalars_all = pd.concat(
-            [scalars_all, pd.Series([costs_total_wo_stor], index=["('costs', 'wo stor'), 'per year')"])])
-    scalars_all = pd.concat([scalars_all, pd.Series(['{0}_{1}'.format(cfg['exp_number'], var_number)], index=["('Exp', 'Var'), 'number')"])])
+        kpis.add("('costs', 'wo stor'), 'per year')", costs_total_wo_stor)
+    kpis.add("('Exp', 'Var'), 'number')", '{0}_{1}'.format(cfg['exp_number'], var_number))
+    scalars_all = kpis.to_series()
 
     scalars_all.to_csv(csv_path + 'Oman_thermal_{0}_{1}_scalars.csv'.format(cfg['exp_number'], var_number))
 
@@ -180,6 +397,11 @@ def make_csv_and_plot(config_path, var_number):
     sequences_df[('storage_cool', 'None'), 'capacity'] = none_res['sequences'][(('storage_cool', 'None'), 'capacity')]
     sequences_df.to_csv(csv_path + 'Oman_thermal_{0}_{1}_sequences.csv'.format(cfg['exp_number'], var_number))
 
+    # duals: marginal costs of the buses, reduced costs and cost sensitivities
+    duals = energysystem.results.get('duals', {})
+    for name, df in duals.items():
+        df.to_csv(csv_path + 'Oman_thermal_{0}_{1}_{2}.csv'.format(cfg['exp_number'], var_number, name))
+
     ########################
     # Plotting the results #
     ########################
@@ -191,182 +413,18 @@ def make_csv_and_plot(config_path, var_number):
     gas_seq_resample = gas_seq.iloc[sp:ep]
     ambient_seq_resample = ambient_seq.iloc[sp:ep]
 
-    def shape_legend(node, reverse=False, **kwargs):  # just copied
-        handels = kwargs['handles']
-        labels = kwargs['labels']
-        axes = kwargs['ax']
-        parameter = {}
-
-        new_labels = []
-        for label in labels:
-            label = label.replace('(', '')
-            label = label.replace('), flow)', '')
-            label = label.replace(node, '')
-            label = label.replace(',', '')
-            label = label.replace(' ', '')
-            new_labels.append(label)
-        labels = new_labels
-
-        parameter['bbox_to_anchor'] = kwargs.get('bbox_to_anchor', (1, 1))
-        parameter['loc'] = kwargs.get('loc', 'upper left')
-        parameter['ncol'] = kwargs.get('ncol', 1)
-        plotshare = kwargs.get('plotshare', 0.9)
-
-        if reverse:
-            handels = handels.reverse()
-            labels = labels.reverse()
-
-        box = axes.get_position()
-        axes.set_position([box.x0, box.y0, box.width * plotshare, box.height])
-
-        parameter['handles'] = handels
-        parameter['labels'] = labels
-        axes.legend(**parameter)
-        return axes
-
-    cdict = {
-        (('collector', 'thermal'), 'flow'): '#ffde32',
-        (('boiler', 'thermal'), 'flow'): '#ff0000',
-        (('storage_thermal', 'thermal'), 'flow'): '#9acd32',
-        (('thermal', 'storage_thermal'), 'flow'): '#9acd32',
-        (('thermal', 'absorption_chiller'), 'flow'): '#4682b4',
-        (('thermal', 'excess_thermal'), 'flow'): '#4682b4',
-        (('absorption_chiller', 'cool'), 'flow'): '#4682b4',
-        (('storage_cool', 'cool'), 'flow'): '#555555',
-        (('cool', 'storage_cool'), 'flow'): '#9acd32',
-        (('cool', 'demand'), 'flow'): '#cd0000',
-        (('el_grid', 'electricity'), 'flow'): '#999999',
-        (('pv', 'electricity'), 'flow'): '#ffde32',
-        (('storage_el', 'electricity'), 'flow'): '#9acd32',
-        (('electricity', 'storage_el'), 'flow'): '#9acd32',
-        (('electricity', 'cooling_tower'), 'flow'): '#ff0000',
-        (('electricity', 'aquifer'), 'flow'): '#555555',
-        (('storage_cool', 'None'), 'capacity'): '#555555',
-        (('storage_cool', 'cool'), 'flow'): '#9acd32',
-        (('absorpion_chiller', 'waste'), 'flow'): '#4682b4',
-        (('waste', 'cool_tower'), 'flow'): '#42c77a'}
-
-    # define order of inputs and outputs
-    inorderthermal = [(('collector', 'thermal'), 'flow'),
-                      (('storage_thermal', 'thermal'), 'flow'),
-                      (('boiler', 'thermal'), 'flow')]
-    outorderthermal = [(('thermal', 'absorption_chiller'), 'flow'),
-                       (('thermal', 'storage_thermal'), 'flow'),
-                       (('thermal', 'excess_thermal'), 'flow')]
-    inordercool = [(('absorption_chiller', 'cool'), 'flow'),
-                   (('storage_cool', 'cool'), 'flow')]
-    outordercool = [(('cool', 'demand'), 'flow'),
-                    (('cool', 'storage_cool'), 'flow')]
-    inorderel = [(('pv', 'electricity'), 'flow'),
-                 (('storage_el', 'electricity'), 'flow'),
-                 (('el_grid', 'electricity'), 'flow')]
-    outorderel = [(('electricity', 'cooling_tower'), 'flow'),
-                  (('electricity', 'aquifer'), 'flow'),
-                  (('electricity', 'storage_electricity'), 'flow')]
-    # inorderstor = [(('cool', 'storage_cool'), 'flow')]
-    # outorderstor = [(('storage_cool', 'cool'), 'flow'),
-    #                 (('storage_cool', 'None'), 'capacity')]
-
-    fig = plt.figure(figsize=(15, 15))
-
-    # plot thermal energy
-    my_plot_thermal = oev.plot.io_plot(
-            'thermal', thermal_seq_resample, cdict=cdict,
-            inorder=inorderthermal, outorder=outorderthermal,
-            ax=fig.add_subplot(2, 2, 2), smooth=False)
-
-    ax_thermal = shape_legend('thermal', **my_plot_thermal)
-    oev.plot.set_datetime_ticks(ax_thermal, thermal_seq_resample.index, tick_distance=14,
-                                date_format='%d-%m-%H', offset=1)
-
-    ax_thermal.set_ylabel('Power in kW')
-    ax_thermal.set_xlabel('time')
-    ax_thermal.set_title("thermal")
-
-    # plot cooling energy
-    my_plot_cool = oev.plot.io_plot(
-            'cool', cool_seq_resample, cdict=cdict,
-            inorder=inordercool, outorder=outordercool,
-            ax=fig.add_subplot(2, 2, 1), smooth=False)
-
-    ax_cool = shape_legend('cool', **my_plot_cool)
-    oev.plot.set_datetime_ticks(ax_cool, cool_seq_resample.index, tick_distance=14,
-                                date_format='%d-%m-%H', offset=1)
-
-    ax_cool.set_ylabel('Power in kW')
-    ax_cool.set_xlabel('time')
-    ax_cool.set_title("cool")
-
-    # plot electrical energy
-    my_plot_el = oev.plot.io_plot(
-            'electricity', el_seq_resample, cdict=cdict,
-            inorder=inorderel, outorder=outorderel,
-            ax=fig.add_subplot(2, 2, 3), smooth=False)
-
-    ax_el = shape_legend('electricity', **my_plot_el)
-    oev.plot.set_datetime_ticks(ax_el, el_seq_resample.index, tick_distance=14,
-                                date_format='%d-%m-%H', offset=1)
-
-    ax_el.set_ylabel('Power in kW')
-    ax_el.set_xlabel('time')
-    ax_el.set_title("electricity")
-
-    #
-    # def shape_legend_stor(node, reverse=False, **kwargs):  # just copied
-    #     handels = kwargs['handles']
-    #     labels = kwargs['labels']
-    #     axes = kwargs['ax']
-    #     parameter = {}
-    #
-    #     new_labels = []
-    #     for label in labels:
-    #         label = label.replace('(', '')
-    #         label = label.replace('), flow)', '')
-    #         label = label.replace('None', '')
-    #         label = label.replace(')', '')
-    #         label = label.replace('_'+str(node), '')
-    #         label = label.replace(node, '')
-    #         label = label.replace(',', '')
-    #         label = label.replace(' ', '')
-    #         label = label.replace('cool', 'input/output')
-    #         if label not in new_labels:
-    #             new_labels.append(label)
-    #     labels = new_labels
-    #
-    #     parameter['bbox_to_anchor'] = kwargs.get('bbox_to_anchor', (1, 1))
-    #     parameter['loc'] = kwargs.get('loc', 'upper left')
-    #     parameter['ncol'] = kwargs.get('ncol', 1)
-    #     plotshare = kwargs.get('plotshare', 0.9)
-    #
-    #     if reverse:
-    #         handels = handels.reverse()
-    #         labels = labels.reverse()
-    #
-    #     box = axes.get_position()
-    #     axes.set_position([box.x0, box.y0, box.width * plotshare, box.height])
-    #
-    #     parameter['handles'] = handels
-    #     parameter['labels'] = labels
-    #     axes.legend(**parameter)
-    #     return axes
-    #
-    #
-    # # plot storage capacity
-    # my_plot_stor = oev.plot.io_plot(
-    #         'storage_cool', ambient_seq_resample, cdict=cdict,
-    #         inorder=inorderstor, outorder=outorderstor,
-    #         ax=fig.add_subplot(2, 2, 4), smooth=False)
-    #
-    # ax_stor = shape_legend_stor('storage_cool', **my_plot_stor)
-    # oev.plot.set_datetime_ticks(ax_stor, ambient_seq_resample.index,
-    #                             tick_distance=14,
-    #                             date_format='%d-%m-%H', offset=1)
-    #
-    # ax_stor.set_ylabel('Power in kW and capacity in kWh')
-    # ax_stor.set_xlabel('time')
-    # ax_stor.set_title("cooling storage")
-
-    plt.savefig(plot_path + 'Oman_thermal_{0}_{1}.png'.format(cfg['exp_number'], var_number))
+    plot_data = {'thermal': thermal_seq_resample,
+                 'cool': cool_seq_resample,
+                 'electricity': el_seq_resample}
+    plot_file = 'Oman_thermal_{0}_{1}.png'.format(cfg['exp_number'], var_number)
+    if plot_jobs is None:
+        import matplotlib.pyplot as plt
+        fig = plot_thermal(plot_data)
+        fig.savefig(plot_path + plot_file)
+        plt.close(fig)
+    else:
+        # rendered later in worker processes, see oemof_heat_tools/plotting.py
+        plot_jobs.append((plot_file, plot_thermal, plot_data))
     csv_plot = pd.merge(thermal_seq_resample, cool_seq_resample, left_index=True, right_index=True)
     csv_plot = pd.merge(csv_plot, el_seq_resample, left_index=True, right_index=True)
     csv_plot.to_csv(plot_path + 'Oman_thermal_plot_{0}_{1}.csv'.format(cfg['exp_number'], var_number))
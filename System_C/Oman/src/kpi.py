@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+Scalar results (KPIs) of a variation of the Oman models.
+
+The values are collected in lists and turned into one Series when the
+csv is written, instead of concatenating a Series per value. Thermal and
+electric model share the KPI rows: a KPI a model does not have (e.g. the
+gas use of the electric model) is written as NaN, so the scalars of all
+variations and both models have the same rows.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+
+# rows of the KPIs, in this order after the scalars of the components
+KPIS = ["('solar fraction', 'thermal'), ' ')",
+        "('solar fraction', 'electric'), ' ')",
+        "('natural gas', 'gas'), 'summe')",
+        "('grid_el', 'electricity'), 'summe')",
+        "('costs', 'w_stor'), 'per year')",
+        "('costs', 'wo_stor'), 'per year')",
+        "('costs', 'wo stor'), 'per year')",
+        "('Exp', 'Var'), 'number')"]
+
+# prefix of the control values, which are only written if they are not 0
+CONTROL = 'Has to be 0!!!'
+
+
+class KPICollector:
+    r"""
+    Collects the scalars of the components and the KPIs of a variation.
+    """
+    def __init__(self):
+        self._index = []
+        self._values = []
+        self._kpis = dict.fromkeys(KPIS, np.nan)
+
+    def add_scalars(self, scalars):
+        r"""
+        Adds the scalars of a node (a Series), e.g. invest of the flows.
+        """
+        self._index.extend(scalars.index)
+        self._values.extend(scalars.values)
+
+    def add(self, kpi, value):
+        r"""
+        Sets one of the KPIS.
+        """
+        if kpi not in self._kpis:
+            raise KeyError(f'Unknown KPI {kpi}, add it to KPIS.')
+        self._kpis[kpi] = value
+
+    def check_zero(self, name, value):
+        r"""
+        Adds a control value, e.g. the product of two flows that must not
+        be active at the same time, if it is not 0.
+        """
+        if value != 0:
+            logging.warning(f'{name}: {value} has to be 0.')
+            self._index.append(f'{CONTROL} ({name})')
+            self._values.append(value)
+
+    def to_series(self):
+        r"""
+        Scalars and KPIs as one Series.
+        """
+        return pd.Series(self._values + list(self._kpis.values()),
+                         index=self._index + list(self._kpis), dtype=object)
@@ -6,15 +6,44 @@ Author: Franziska Pleissner
 
 """
 
-from SystemC_oman_thermal import run_model_thermal
-from SystemC_oman_thermal_plot import make_csv_and_plot
-from SystemC_oman_electric import run_model_electric
-from SystemC_oman_electric_plot import make_csv_and_plot_electric
-# from SystemC_oman_plot import combine_results
+# the stages import their packages when they run, so solve-only runs start fast
+import logging
 import os
-import pandas as pd
+import sys
 import yaml
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../..')))
+
+
+def enqueue_variations(cfg, config_file_path):
+    from oemof_heat_tools.jobqueue import open_queue
+    from oemof_heat_tools.resolution import hours_per_step
+    from oemof_heat_tools.scheduling import (job_features, longest_first,
+                                             read_runtime_log, runtime_log_path)
+    if cfg['debug']:
+        size = 3
+    else:
+        size = int(cfg['number_timesteps'] / hours_per_step(cfg.get('resolution', 'H')))
+    jobs = []
+    for n in range(cfg['number_of_variations']):
+        jobs.append(('oman_thermal_{0}_{1}'.format(cfg['exp_number'], n), {
+            'path': os.path.dirname(os.path.abspath(__file__)),
+            'func': 'SystemC_oman_thermal:run_model_thermal',
+            'kwargs': {'config_path': config_file_path, 'var_number': n},
+            'parameters_file_name': cfg['parameters_file_name'][n],
+            'features': job_features('oman_thermal', size),
+            'memory_limit': (None if cfg.get('job_memory_limit') is None
+                             else int(cfg['job_memory_limit'] * 1024 ** 3)),
+            'time_limit': cfg.get('job_time_limit'),
+            'output': os.path.abspath('../results/dumps/oman_thermal_{0}_{1}.oemof'.format(
+                cfg['exp_number'], n))}))
+    queue = open_queue(cfg['job_queue'], max_attempts=cfg.get('max_attempts', 2))
+    # the workers take the longest jobs first
+    history = read_runtime_log(runtime_log_path(queue))
+    for key, payload in longest_first(jobs, history):
+        queue.put(key, payload)
+    logging.info('Jobs in {0}: {1}'.format(cfg['job_queue'], queue.counts()))
+
 
 def main(yaml_file):
     # Choose configuration file to run model with
@@ -24,16 +53,49 @@ def main(yaml_file):
         cfg = yaml.load(ymlfile)
 
     global df_all_var
-    if cfg['run_model']:
-        for n in range(cfg['number_of_variations']):
-            run_model_thermal(config_path=config_file_path, var_number=n)
+    enqueued = False
+    if cfg['run_model'] and cfg.get('job_queue'):
+        # the variations are run by workers, see oemof_heat_tools/jobqueue.py
+        enqueue_variations(cfg, config_file_path)
+        enqueued = True
+    elif cfg['run_model']:
+        from SystemC_oman_thermal import run_model_thermal
+        if cfg.get('sweep_journal', False):
+            # a restarted sweep skips the variations that are done
+            from oemof_heat_tools.journal import SweepJournal
+            journal = SweepJournal(
+                os.path.abspath('../results/sweep_{0}.json'.format(exp_cfg_file_name[:-4])),
+                max_attempts=cfg.get('max_attempts', 2))
+            for n in range(cfg['number_of_variations']):
+                journal.run('thermal_{0}'.format(n), run_model_thermal,
+                            config_path=config_file_path, var_number=n,
+                            output=os.path.abspath('../results/dumps/oman_thermal_{0}_{1}.oemof'.format(
+                                cfg['exp_number'], n)))
+            logging.info('Sweep: {0}'.format(journal.summary()))
+        else:
+            for n in range(cfg['number_of_variations']):
+                run_model_thermal(config_path=config_file_path, var_number=n)
     #if cfg['run_model_electric']:
+    #    from SystemC_oman_electric import run_model_electric
     #    for n in range(cfg['number_of_variations']):
     #        run_model_electric(config_path=config_file_path, var_number=n)
-    if cfg['run_postprocessing']:
+    if cfg['run_postprocessing'] and enqueued:
+        # the dumps are written by the workers
+        logging.info('Postprocessing skipped, run it with run_model: false '
+                     'after the queue {0} is drained.'.format(cfg['job_queue']))
+    elif cfg['run_postprocessing']:
+        from SystemC_oman_thermal_plot import make_csv_and_plot
+        from oemof_heat_tools.plotting import render_figures
+        # headless: the figures are rendered in parallel after all csv files are written
+        plot_jobs = [] if cfg.get('headless_plots', False) else None
         for n in range(cfg['number_of_variations']):
-            make_csv_and_plot(config_path=config_file_path, var_number=n)
+            make_csv_and_plot(config_path=config_file_path, var_number=n,
+                              plot_jobs=plot_jobs)
+        if plot_jobs:
+            render_figures(plot_jobs, os.path.abspath('../results/plots'),
+                           processes=cfg.get('plot_processes'))
     #if cfg['run_postprocessing_electric']:
+    #    from SystemC_oman_electric_plot import make_csv_and_plot_electric
     #    for n in range(cfg['number_of_variations']):
     #        make_csv_and_plot_electric(config_path=config_file_path, var_number=n)
 
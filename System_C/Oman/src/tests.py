@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from kpi import KPICollector, KPIS, CONTROL
+
+# rows of the KPIs in the scalars csv of both models, changing them breaks
+# the comparison with the csv files of earlier experiments
+KPI_ROWS = ["('solar fraction', 'thermal'), ' ')",
+            "('solar fraction', 'electric'), ' ')",
+            "('natural gas', 'gas'), 'summe')",
+            "('grid_el', 'electricity'), 'summe')",
+            "('costs', 'w_stor'), 'per year')",
+            "('costs', 'wo_stor'), 'per year')",
+            "('costs', 'wo stor'), 'per year')",
+            "('Exp', 'Var'), 'number')"]
+
+
+def thermal_kpis(boiler_to_excess=0):
+    # the scalars of a thermal variation, as in make_csv_and_plot
+    kpis = KPICollector()
+    kpis.add_scalars(pd.Series([10., 20.], index=["(('boiler', 'thermal'), 'invest')",
+                                                  "(('storage_thermal', 'None'), 'invest')"]))
+    kpis.check_zero('boiler to excess', boiler_to_excess)
+    kpis.check_zero('grid to excess', 0)
+    kpis.add("('solar fraction', 'thermal'), ' ')", 0.6)
+    kpis.add("('solar fraction', 'electric'), ' ')", 0.3)
+    kpis.add("('natural gas', 'gas'), 'summe')", 100.)
+    kpis.add("('grid_el', 'electricity'), 'summe')", 50.)
+    kpis.add("('costs', 'w_stor'), 'per year')", 1000.)
+    kpis.add("('costs', 'wo_stor'), 'per year')", 900.)
+    kpis.add("('Exp', 'Var'), 'number')", '5_0')
+    return kpis.to_series()
+
+
+def electric_kpis():
+    # the scalars of an electric variation, as in make_csv_and_plot_electric
+    kpis = KPICollector()
+    kpis.add_scalars(pd.Series([30.], index=["(('pv', 'electricity'), 'invest')"]))
+    kpis.check_zero('grid to excess', 0)
+    kpis.add("('solar fraction', 'electric'), ' ')", 0.5)
+    kpis.add("('grid_el', 'electricity'), 'summe')", 70.)
+    kpis.add("('costs', 'wo_stor'), 'per year')", 800.)
+    kpis.add("('costs', 'wo stor'), 'per year')", 850.)
+    kpis.add("('Exp', 'Var'), 'number')", '20_1')
+    return kpis.to_series()
+
+
+def test_kpi_rows_thermal():
+    assert KPIS == KPI_ROWS
+    scalars = thermal_kpis()
+    assert list(scalars.index) == ["(('boiler', 'thermal'), 'invest')",
+                                   "(('storage_thermal', 'None'), 'invest')"] + KPI_ROWS
+    assert np.isnan(scalars["('costs', 'wo stor'), 'per year')"])
+    assert scalars["('grid_el', 'electricity'), 'summe')"] == 50.
+
+    # control values come after the scalars of the components, before the KPIs
+    scalars = thermal_kpis(boiler_to_excess=2.)
+    assert list(scalars.index[:3]) == ["(('boiler', 'thermal'), 'invest')",
+                                       "(('storage_thermal', 'None'), 'invest')",
+                                       CONTROL + ' (boiler to excess)']
+    assert scalars[CONTROL + ' (boiler to excess)'] == 2.
+    assert list(scalars.index[3:]) == KPI_ROWS
+
+
+def test_kpi_rows_electric():
+    scalars = electric_kpis()
+    assert list(scalars.index) == ["(('pv', 'electricity'), 'invest')"] + KPI_ROWS
+    for kpi in ["('solar fraction', 'thermal'), ' ')",
+                "('natural gas', 'gas'), 'summe')",
+                "('costs', 'w_stor'), 'per year')"]:
+        assert np.isnan(scalars[kpi]), kpi
+
+    # the KPIs of both models are in the same rows
+    assert list(thermal_kpis().index[-len(KPIS):]) == \
+        list(scalars.index[-len(KPIS):])
+    try:
+        KPICollector().add('unknown', 1)
+    except KeyError:
+        pass
+    else:
+        raise AssertionError('unknown KPI is not rejected')
+
+
+if __name__ == '__main__':
+    test_kpi_rows_thermal()
+    test_kpi_rows_electric()
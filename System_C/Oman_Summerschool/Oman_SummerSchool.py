@@ -26,6 +26,13 @@ p_elec_buy = 0.10  # Euro/kWh
 p_elec_sell = 0  # Euro/kWh
 p_gas = 0.04  # Euro/kWh
 
+# Optimise the sizes of ACM, CCM and cooling tower with size dependent
+# investment costs (costs.py) instead of the nominal values above
+invest_chillers = False
+max_ACM = 500  # kW_cool
+max_CCM = 500  # kW_cool
+max_CT = 3000  # kW_input
+
 # Import packages
 from oemof.tools import logger
 import oemof.solph as solph
@@ -34,8 +41,15 @@ import pyomo.environ as po
 
 import time
 import logging
+import os
+import sys
 import pandas as pd
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from oemof_heat_tools import solve_model, add_piecewise_investment, read_csv_cached
+from oemof.tools import economics
+import costs
+
 # import oemof plots
 try:
     import matplotlib.pyplot as plt
@@ -56,7 +70,7 @@ date_time_index = pd.date_range('1/1/2017', periods=number_of_time_steps,
 
 # Read data file
 # Import  PV and demand data
-data = pd.read_csv('data_input/Oman3.csv', sep=';',)
+data = read_csv_cached('data_input/Oman3.csv', sep=';')
 
 # Initialise the energysystem
 energysystem = solph.EnergySystem(timeindex=date_time_index)
@@ -118,9 +132,22 @@ energysystem.add(pv, collector, gas_grid, el_grid, cool_shortage, demand,
 
 # Transformers
 
+if invest_chillers:
+    # costs are added to the objective after the model is built
+    flow_CT = solph.Flow(investment=solph.Investment(ep_costs=0,
+                                                     maximum=max_CT))
+    flow_ACM = solph.Flow(investment=solph.Investment(ep_costs=0,
+                                                      maximum=max_ACM))
+    flow_CCM = solph.Flow(investment=solph.Investment(ep_costs=0,
+                                                      maximum=max_CCM))
+else:
+    flow_CT = solph.Flow(nominal_value=nv_CT)
+    flow_ACM = solph.Flow(nominal_value=nv_ACM)
+    flow_CCM = solph.Flow(nominal_value=nv_CCM)
+
 CT = solph.Transformer(
         label='cooling_tower',
-        inputs={bwh: solph.Flow(nominal_value=nv_CT), bel: solph.Flow()},
+        inputs={bwh: flow_CT, bel: solph.Flow()},
         outputs={bwh2: solph.Flow()},
         conversion_factors={bwh: 0.988, bel: 0.012,
                             bwh2: 1})
@@ -128,13 +155,13 @@ CT = solph.Transformer(
 ACM = solph.Transformer(
         label='absorpion_chiller',
         inputs={bh: solph.Flow()},
-        outputs={bc: solph.Flow(nominal_value=nv_ACM), bwh: solph.Flow()},
+        outputs={bc: flow_ACM, bwh: solph.Flow()},
         conversion_factors={bc: 0.7, bwh: 1.7})
 
 CCM = solph.Transformer(
         label='compression_chiller',
         inputs={bel: solph.Flow()},
-        outputs={bc: solph.Flow(nominal_value=nv_CCM), bwh: solph.Flow()},
+        outputs={bc: flow_CCM, bwh: solph.Flow()},
         conversion_factors={bc: 3.5, bwh: 4.5})
 
 boiler = solph.Transformer(
@@ -191,6 +218,14 @@ energysystem.add(stor_cool, battery, stor_heat)
 om = solph.Model(energysystem)
 
 ### Add own constrains ###
+if invest_chillers:
+    for unit, flow, maximum in [('ACM', (ACM, bc), max_ACM),
+                                ('CCM', (CCM, bc), max_CCM),
+                                ('ct', (bwh, CT), max_CT)]:
+        factor = (economics.annuity(1, costs.LIFETIME[unit], costs.wacc)
+                  + costs.OPEX[unit])
+        add_piecewise_investment(om, flow, costs.BRACKETS[unit], maximum,
+                                 factor=factor)
 # Get value for components withouta name
 
 # Create a block and add it to the system
@@ -200,7 +235,7 @@ om = solph.Model(energysystem)
 
 
 # Set tee to True to get the solver output
-om.solve(solver='cbc', solve_kwargs={'tee': True})
+solve_model(om, solver='cbc', tee=True)
 
 energysystem.results['main'] = outputlib.processing.results(om)
 energysystem.results['meta'] = outputlib.processing.meta_results(om)
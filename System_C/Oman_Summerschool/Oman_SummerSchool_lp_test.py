@@ -35,8 +35,12 @@ import pyomo.environ as po
 import time
 import logging
 import os
+import sys
 import pandas as pd
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from oemof_heat_tools import solve_model, read_csv_cached
+
 # import oemof plots
 try:
     import matplotlib.pyplot as plt
@@ -57,7 +61,7 @@ date_time_index = pd.date_range('1/1/2017', periods=number_of_time_steps,
 
 # Read data file
 # Import  PV and demand data
-data = pd.read_csv('data_input/Oman3.csv', sep=';',)
+data = read_csv_cached('data_input/Oman3.csv', sep=';')
 
 # Initialise the energysystem
 energysystem = solph.EnergySystem(timeindex=date_time_index)
@@ -201,7 +205,7 @@ om = solph.Model(energysystem)
 
 
 # Set tee to True to get the solver output
-om.solve(solver='cbc', solve_kwargs={'tee': True})
+solve_model(om, solver='cbc', tee=True)
 
 filename = os.path.join(
         helpers.extend_basic_path('lp_files'),
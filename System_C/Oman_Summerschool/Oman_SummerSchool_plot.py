@@ -19,8 +19,14 @@ import oemof.outputlib as outputlib
 import oemof_visio as oev
 
 import logging
+import os
+import sys
 import pandas as pd
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+from oemof_heat_tools import bracket_costs
+import costs
+
 # import oemof plots
 try:
     import matplotlib.pyplot as plt
@@ -35,7 +41,7 @@ except ImportError:
 file_imp = 'Oman_SS20181029-1624.oemof'
 
 # Weighted average cost of capital
-wacc = 0.07
+wacc = costs.wacc
 
 # investcosts without chillers and cooling tower:
 ic_pv = 650  # Euro/kW_p
@@ -49,24 +55,24 @@ ic_elec_kW = 50  # Euro/kW
 # lifetimes [years]:
 lt_pv = 25
 lt_collector = 25
-lt_ACM = 18
-lt_CCM = 15
+lt_ACM = costs.LIFETIME['ACM']
+lt_CCM = costs.LIFETIME['CCM']
 lt_boiler = 20
 lt_cool = 25
 lt_heat = 25
-lt_ct = 25
+lt_ct = costs.LIFETIME['ct']
 lt_elec_kWh = 20
 lt_elec_kW = 20
 
 # OPEX [% of ic]:
 op_pv = 0.015
 op_collector = 0.02
-op_ACM = 0.015
-op_CCM = 0.02
+op_ACM = costs.OPEX['ACM']
+op_CCM = costs.OPEX['CCM']
 op_boiler = 0.02
 op_cool = 0.02
 op_heat = 0.02
-op_ct = 0.02
+op_ct = costs.OPEX['ct']
 op_elec_kWh = 0
 op_elec_kW = 0
 
@@ -92,18 +98,24 @@ results_strings_param = outputlib.views.convert_keys_to_strings(energysystem.res
 
 logging.info('results received')
 
+
+def nominal_value(flow):
+    # optimised size of investment flows (invest_chillers in the model)
+    invest = results_strings[flow]['scalars'].get('invest')
+    if invest is not None:
+        return invest
+    return results_strings_param[flow]['scalars']['nominal_value']
+
+
 # get data from the import
+nv_ACM = nominal_value(('absorpion_chiller', 'cool'))
+nv_CCM = nominal_value(('compression_chiller', 'cool'))
+nv_ct = nominal_value(('waste', 'cooling_tower'))
 nv_pv = (results_strings_param['pv', 'elec']['scalars']['nominal_value'])
 nv_collector = (results_strings_param['collector', 'heat']['scalars']
                 ['nominal_value'])
-nv_ACM = (results_strings_param['absorpion_chiller', 'cool']['scalars']
-          ['nominal_value'])
-nv_CCM = (results_strings_param['compression_chiller', 'cool']['scalars']
-          ['nominal_value'])
 nv_boiler = (results_strings_param['boiler', 'heat']['scalars']
              ['nominal_value'])
-nv_ct = (results_strings_param['waste', 'cooling_tower']['scalars']
-         ['nominal_value'])
 nc_cool = (results_strings_param['storage_cool', 'None']['scalars']
            ['nominal_capacity'])
 nc_heat = (results_strings_param['storage_heat', 'None']['scalars']
@@ -130,45 +142,11 @@ p_gas_b = (results_strings_param['naturalgas', 'gas']['scalars']
 #print(p_elec_s)
 #print(p_gas_b)
 
-if nv_CCM < 25:
-    ic_CCM = 650
-else:
-    if nv_CCM < 50:
-        ic_CCM = 600
-    else:
-        if nv_CCM < 75:
-            ic_CCM = 400
-        else:
-            if nv_CCM < 100:
-                ic_CCM = 325
-            else:
-                ic_CCM = 200
-
-if nv_ACM < 25:
-    ic_ACM = 1000
-else:
-    if nv_ACM < 50:
-        ic_ACM = 900
-    else:
-        if nv_ACM < 75:
-            ic_ACM = 625
-        else:
-            if nv_ACM < 100:
-                ic_ACM = 550
-            else:
-                ic_ACM = 400
-
-if nv_ct < 100:
-    ic_ct = 55
-else:
-    if nv_ct < 200:
-        ic_ct = 40
-    else:
-        if nv_ct < 400:
-            ic_ct = 32.5
-        else:
-            ic_ct = 28
-          
+# specific invest costs of chillers and cooling tower depend on the size
+ic_CCM = bracket_costs(nv_CCM, costs.BRACKETS['CCM'])
+ic_ACM = bracket_costs(nv_ACM, costs.BRACKETS['ACM'])
+ic_ct = bracket_costs(nv_ct, costs.BRACKETS['ct'])
+
 #print(ic_ACM)
 #print(ic_CCM)
 #print(ic_ct)
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""
+Investment costs of the units with size dependent specific costs.
+
+Brackets are (upper bound, specific investment costs) in ascending order,
+a size equal to a bound belongs to the next bracket. Used by the model
+(step costs of the investment, see oemof_heat_tools.economies_of_scale)
+and by the plot, so both report the same costs.
+"""
+
+wacc = 0.07
+
+# (upper bound, Euro/kW), ACM and CCM in kW_cool, cooling tower in kW_input
+BRACKETS = {
+    'ACM': [(25, 1000), (50, 900), (75, 625), (100, 550), (None, 400)],
+    'CCM': [(25, 650), (50, 600), (75, 400), (100, 325), (None, 200)],
+    'ct': [(100, 55), (200, 40), (400, 32.5), (None, 28)]}
+
+# lifetime in years
+LIFETIME = {'ACM': 18, 'CCM': 15, 'ct': 25}
+
+# operational costs as share of the investment costs per year
+OPEX = {'ACM': 0.015, 'CCM': 0.02, 'ct': 0.02}
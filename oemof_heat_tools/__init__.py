@@ -0,0 +1,28 @@
+"""oemof_heat tools
+
+Helpers shared by the models of System A, B and C.
+"""
+
+from .solver import (solver_options, solver_options_from_parameters,
+                     is_mip, solve_model, record_model_classes)
+from .race import race_solvers, best_solver, available_solvers
+from .warm_start import apply_warm_start, restore_results
+from .relaxation import solve_relaxation, solve_quick_look, relaxation_summary
+from .duals import enable_duals, dual_results
+from .decomposition import benders, split_periods
+from .modify import ModelModifier
+from .merit_order import (system_a_parameters, system_a_variable_costs,
+                          dispatch_system_a, to_results, dispatch_costs,
+                          compare_dispatch)
+from .stochastic import (scenarios_from_years, extensive_form,
+                         solve_stochastic)
+from .horizon import (solve_chunked, concat_results, restore_chunks,
+                      storage_levels, link_storage_levels)
+from .resolution import (hours_per_step, create_timeindex, resample,
+                         scale_capacity_loss, scale_gradient)
+from .results import Results
+from .economies_of_scale import (bracket_costs, cost_curve,
+                                 add_piecewise_investment)
+from .journal import SweepJournal
+from .inputs import (read_csv_cached, shared_frame, read_time_series,
+                     clear_cache, clear_shared)
@@ -0,0 +1,375 @@
+"""
+Benders decomposition of investment models.
+
+The investment variables (e.g. epc_CHP, epc_storage_th, epc_storage_el)
+couple all time steps of an investment model. The decomposition splits
+the model into
+
+* a master problem over the capacities and one estimate of the operating
+  costs per period,
+* one operational LP per period (e.g. month) with the capacities fixed
+  to the proposal of the master problem.
+
+The subproblems are built once in worker processes and solved in
+parallel. The dual values of the constraints fixing the capacities give
+a cut per period, which is added to the master problem until the gap
+between lower bound (master problem) and upper bound (best solution
+found) is closed.
+
+The model has to be an LP and feasible for every capacity proposal, which
+is the case if shortage sources are part of the energy system. Storage
+levels are not linked between periods, every period is optimised on its
+own. Limits over the whole horizon (summed_max, summed_min, e.g. a gas
+budget) are split between the periods by their length, so the budget
+cannot be shifted between periods. Both make the decomposed model a
+restriction of the full model: its costs are an upper bound of the costs
+of the full model.
+
+With weights, the subproblems can as well be scenarios over the same
+time index, e.g. the second stage of a stochastic model, see
+:mod:`stochastic`.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import logging
+import multiprocessing
+import os
+import time
+
+import pandas as pd
+
+from .duals import enable_duals
+from .horizon import concat_results
+from .solver import solve_model, solver_options
+
+
+def split_periods(timeindex, freq='M'):
+    r"""
+    Splits a time index into consecutive periods, e.g. months ('M') or
+    weeks ('W').
+    """
+    groups = timeindex.to_series().groupby(pd.Grouper(freq=freq))
+    return [group.index for _, group in groups if len(group)]
+
+
+def _strip_investment_costs(energysystem):
+    r"""
+    Collects the investment parameters of all flows and storages and sets
+    their ep_costs to zero, as the investment costs are part of the
+    master problem.
+    """
+    investments = {}
+    for node in energysystem.nodes:
+        for target, flow in node.outputs.items():
+            investment = getattr(flow, 'investment', None)
+            if investment is not None:
+                investments[(str(node), str(target))] = investment
+        investment = getattr(node, 'investment', None)
+        if investment is not None and hasattr(node, 'nominal_capacity'):
+            investments[(str(node), 'None')] = investment
+
+    parameters = {}
+    for key, investment in investments.items():
+        parameters[key] = {'ep_costs': investment.ep_costs,
+                           'minimum': investment.minimum,
+                           'maximum': investment.maximum}
+        investment.ep_costs = 0
+
+    return parameters
+
+
+def _prorate_summed_limits(energysystem, share):
+    r"""
+    Scales summed_max and summed_min of all flows to a period that is
+    share of the horizon.
+    """
+    scaled = []
+    for node in energysystem.nodes:
+        for target, flow in node.outputs.items():
+            for attribute in ('summed_max', 'summed_min'):
+                value = getattr(flow, attribute, None)
+                if value is not None:
+                    setattr(flow, attribute, value * share)
+                    scaled.append((str(node), str(target), attribute))
+
+    return scaled
+
+
+def _invest_variables(model):
+    variables = {}
+    invest_flow = getattr(model, 'InvestmentFlow', None)
+    if invest_flow is not None:
+        for (i, o) in invest_flow.invest:
+            variables[(str(i), str(o))] = invest_flow.invest[i, o]
+    invest_storage = getattr(model, 'GenericInvestmentStorageBlock', None)
+    if invest_storage is not None:
+        for n in invest_storage.invest:
+            variables[(str(n), 'None')] = invest_storage.invest[n]
+
+    return variables
+
+
+def _build_subproblem(build_energysystem, period, share=None):
+    import pyomo.environ as po
+    import oemof.solph as solph
+
+    energysystem = build_energysystem(period)
+    if share is not None:
+        _prorate_summed_limits(energysystem, share)
+    parameters = _strip_investment_costs(energysystem)
+    model = solph.Model(energysystem)
+    variables = _invest_variables(model)
+    keys = sorted(variables)
+
+    model.BENDERS_INVEST = po.Set(initialize=keys, dimen=2, ordered=True)
+    model.benders_capacity = po.Param(model.BENDERS_INVEST, mutable=True,
+                                      initialize=0)
+    model.benders_fix = po.Constraint(
+        model.BENDERS_INVEST,
+        rule=lambda m, i, o: variables[i, o] == m.benders_capacity[i, o])
+    enable_duals(model)
+
+    return model, keys, parameters
+
+
+def _subproblem_worker(build_energysystem, periods, shares, solver, options,
+                       connection):
+    import oemof.outputlib as outputlib
+
+    try:
+        models = {p: _build_subproblem(build_energysystem, period, shares[p])
+                  for p, period in periods.items()}
+        parameters = next(iter(models.values()))[2]
+        connection.send(('ready', parameters))
+
+        while True:
+            message, capacities = connection.recv()
+            if message == 'stop':
+                break
+            reply = {}
+            for p, (model, keys, _) in models.items():
+                if message == 'solve':
+                    for key in keys:
+                        model.benders_capacity[key] = capacities[key]
+                    results = solve_model(model, solver=solver,
+                                          options=options)
+                    termination_condition = \
+                        results['Solver'][0]['Termination condition'].key
+                    if termination_condition != 'optimal':
+                        raise RuntimeError(
+                            f'Subproblem {p} is {termination_condition}.')
+                    reply[p] = (model.objective(),
+                                {key: model.dual[model.benders_fix[key]]
+                                 for key in keys})
+                elif message == 'results':
+                    reply[p] = outputlib.views.convert_keys_to_strings(
+                        outputlib.processing.results(model))
+            connection.send(('ok', reply))
+    except Exception as e:
+        connection.send(('error', f'{type(e).__name__}: {e}'))
+    finally:
+        connection.close()
+
+
+class _WorkerPool(object):
+    r"""
+    Worker processes holding the subproblems of some periods each.
+    """
+    def __init__(self, build_energysystem, periods, shares, solver, options,
+                 processes):
+        context = multiprocessing.get_context(
+            'fork' if hasattr(os, 'fork') else 'spawn')
+        processes = min(processes or os.cpu_count() or 1, len(periods))
+        self.workers = []
+        for n in range(processes):
+            own_periods = {p: periods[p] for p in range(n, len(periods),
+                                                         processes)}
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_subproblem_worker,
+                args=(build_energysystem, own_periods, shares, solver,
+                      options, child))
+            process.start()
+            self.workers.append((process, parent))
+        self.parameters = self._gather()[0]
+
+    def _gather(self):
+        replies = []
+        for _, connection in self.workers:
+            status, reply = connection.recv()
+            if status == 'error':
+                self.close()
+                raise RuntimeError(reply)
+            replies.append(reply)
+        return replies
+
+    def request(self, message, capacities=None):
+        for _, connection in self.workers:
+            connection.send((message, capacities))
+        merged = {}
+        for reply in self._gather():
+            merged.update(reply)
+        return merged
+
+    def close(self):
+        for process, connection in self.workers:
+            try:
+                connection.send(('stop', None))
+            except (BrokenPipeError, OSError):
+                pass
+        for process, _ in self.workers:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+
+def _solve_master(master, solver, options):
+    from pyomo.opt import SolverFactory
+
+    opt = SolverFactory(solver)
+    for key, value in solver_options(solver, options).items():
+        opt.options[key] = value
+    results = opt.solve(master)
+    termination_condition = results['Solver'][0]['Termination condition'].key
+    if termination_condition != 'optimal':
+        raise RuntimeError(f'Master problem is {termination_condition}.')
+
+
+def benders(build_energysystem, periods, solver='cbc', options=None,
+            processes=None, tolerance=1e-4, max_iterations=100,
+            theta_lower_bound=0, weights=None):
+    r"""
+    Solves an investment model by Benders decomposition.
+
+    Parameters
+    ----------
+    build_energysystem : callable
+        Returns the solph.EnergySystem for a given period. It is called
+        in the worker processes once per period.
+
+    periods : list
+        Time indices of the periods, see :func:`split_periods`, or other
+        arguments of build_energysystem, e.g. scenarios. summed_max and
+        summed_min of the flows are scaled by the share of the period in
+        the horizon.
+
+    solver : str
+        Solver for master and subproblems.
+
+    options : dict
+        Generic solver options, see :func:`solver.solver_options`.
+
+    processes : int
+        Number of worker processes. Defaults to the number of CPUs.
+
+    tolerance : float
+        Relative gap between upper and lower bound to stop at.
+
+    max_iterations : int
+        Maximum number of master iterations.
+
+    theta_lower_bound : float
+        Lower bound of the operating costs of each period. 0 is valid if
+        all variable costs are non-negative.
+
+    weights : list
+        Weights of the operating costs of the periods, e.g. the
+        probabilities of scenarios. If given, the periods are treated as
+        scenarios over the same time index.
+
+    Returns
+    -------
+    decomposition : dict
+        'invest': capacities, 'objective': costs of the best solution,
+        'lower_bound', 'iterations': bounds per iteration, 'main':
+        results dict (keys as strings) of the subproblems at the best
+        capacities. With weights, 'main' holds one results dict per
+        period instead.
+    """
+    import pyomo.environ as po
+
+    scenarios = weights is not None
+    if not scenarios:
+        weights = [1] * len(periods)
+    if scenarios or not all(hasattr(period, '__len__') for period in periods):
+        # every scenario covers the whole horizon
+        shares = [None] * len(periods)
+    else:
+        total = sum(len(period) for period in periods)
+        shares = [len(period) / total for period in periods]
+    start = time.time()
+    pool = _WorkerPool(build_energysystem, periods, shares, solver, options,
+                       processes)
+    try:
+        parameters = pool.parameters
+        keys = sorted(parameters)
+
+        def _bounds(m, i, o):
+            maximum = parameters[i, o]['maximum']
+            return (parameters[i, o]['minimum'],
+                    None if maximum in (None, float('inf')) else maximum)
+
+        master = po.ConcreteModel()
+        master.INVEST = po.Set(initialize=keys, dimen=2, ordered=True)
+        master.PERIODS = po.Set(initialize=list(range(len(periods))))
+        master.capacity = po.Var(master.INVEST, bounds=_bounds)
+        master.theta = po.Var(master.PERIODS, bounds=(theta_lower_bound, None))
+        master.objective = po.Objective(
+            expr=sum(parameters[k]['ep_costs'] * master.capacity[k]
+                     for k in keys) + sum(weights[p] * master.theta[p]
+                                          for p in master.PERIODS),
+            sense=po.minimize)
+        master.cuts = po.ConstraintList()
+
+        capacities = {k: parameters[k]['minimum'] for k in keys}
+        best_capacities, upper_bound, lower_bound = None, float('inf'), \
+            -float('inf')
+        iterations = []
+        for iteration in range(max_iterations):
+            cuts = pool.request('solve', capacities)
+            costs = sum(parameters[k]['ep_costs'] * capacities[k]
+                        for k in keys) + sum(weights[p] * c
+                                             for p, (c, _) in cuts.items())
+            if costs < upper_bound:
+                upper_bound, best_capacities = costs, dict(capacities)
+
+            for p, (cost, gradient) in cuts.items():
+                master.cuts.add(master.theta[p] >= cost + sum(
+                    gradient[k] * (master.capacity[k] - capacities[k])
+                    for k in keys))
+
+            _solve_master(master, solver, options)
+            lower_bound = po.value(master.objective)
+            capacities = {k: master.capacity[k].value for k in keys}
+
+            gap = (upper_bound - lower_bound) / max(abs(upper_bound), 1)
+            iterations.append({'lower_bound': lower_bound,
+                               'upper_bound': upper_bound, 'gap': gap,
+                               'time': time.time() - start})
+            logging.info(f'Benders iteration {iteration}: lower bound '
+                         f'{lower_bound:.2f}, upper bound {upper_bound:.2f}, '
+                         f'gap {gap:.2%}')
+            if gap <= tolerance:
+                break
+        else:
+            logging.warning('Benders decomposition stopped after '
+                            f'{max_iterations} iterations at gap {gap:.2%}.')
+
+        pool.request('solve', best_capacities)
+        per_period = pool.request('results')
+    finally:
+        pool.close()
+
+    if scenarios:
+        main = [per_period[p] for p in sorted(per_period)]
+    else:
+        main = concat_results([per_period[p] for p in sorted(per_period)])
+
+    return {'invest': pd.Series(best_capacities),
+            'objective': upper_bound,
+            'lower_bound': lower_bound,
+            'iterations': pd.DataFrame(iterations),
+            'main': main}
@@ -0,0 +1,148 @@
+"""
+Dual values and cost sensitivities of LP models.
+
+For an LP, one solve answers how the costs react to changed prices:
+
+* the dual value of a bus balance is the marginal cost of one more unit
+  of energy at this bus and time step (e.g. marginal heat, cool or
+  electricity costs per hour),
+* the reduced cost of an investment variable is the change of the
+  objective if one unit of this capacity is forced into the solution,
+* the derivative of the objective with respect to a cost parameter is
+  the quantity it is multiplied with in the objective: the summed flow
+  for variable_costs (e.g. price_gas, price_electr) and the invested
+  capacity for ep_costs.
+
+All values are only valid for LP models and for small changes, i.e. as
+long as the optimal basis does not change.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import logging
+
+import pandas as pd
+
+from .solver import is_mip
+
+
+def enable_duals(model):
+    r"""
+    Declares the suffixes to import duals and reduced costs. Has to be
+    called before the model is solved.
+    """
+    import pyomo.environ as po
+
+    for name in ('dual', 'rc'):
+        if isinstance(getattr(model, name, None), po.Suffix):
+            continue
+        if name in model.__dict__:
+            delattr(model, name)
+        setattr(model, name, po.Suffix(direction=po.Suffix.IMPORT))
+
+
+def bus_duals(model):
+    r"""
+    Dual values of the bus balances.
+
+    Returns
+    -------
+    duals : pd.DataFrame
+        Marginal costs per time step (index) and bus label (columns).
+    """
+    balance = model.Bus.balance
+    duals = {}
+    for (bus, t) in balance:
+        duals.setdefault(str(bus), {})[t] = model.dual.get(balance[bus, t])
+    duals = pd.DataFrame(duals).sort_index()
+    duals.index = model.es.timeindex[duals.index]
+
+    return duals
+
+
+def investment_reduced_costs(model):
+    r"""
+    Reduced costs of the investment variables of flows and storages.
+
+    Returns
+    -------
+    reduced_costs : pd.Series
+        Indexed by (label, label) as in the results dict.
+    """
+    reduced_costs = {}
+    invest_flow = getattr(model, 'InvestmentFlow', None)
+    if invest_flow is not None:
+        for (i, o) in invest_flow.invest:
+            reduced_costs[(str(i), str(o))] = model.rc.get(
+                invest_flow.invest[i, o])
+    invest_storage = getattr(model, 'GenericInvestmentStorageBlock', None)
+    if invest_storage is not None:
+        for n in invest_storage.invest:
+            reduced_costs[(str(n), 'None')] = model.rc.get(
+                invest_storage.invest[n])
+
+    return pd.Series(reduced_costs)
+
+
+def cost_sensitivity(model):
+    r"""
+    Derivative of the objective with respect to every cost parameter.
+
+    Returns
+    -------
+    sensitivity : pd.DataFrame
+        Indexed by ((label, label), parameter) with the columns 'value'
+        (current cost parameter, mean value for time series) and
+        'sensitivity' (change of the objective per unit change of the
+        parameter in every time step).
+    """
+    records = {}
+    for (i, o), flow in model.flows.items():
+        costs = [flow.variable_costs[t] or 0 for t in model.TIMESTEPS]
+        if any(costs):
+            summed_flow = sum(model.flow[i, o, t].value * model.timeincrement[t]
+                              for t in model.TIMESTEPS)
+            records[((str(i), str(o)), 'variable_costs')] = {
+                'value': sum(costs) / len(costs), 'sensitivity': summed_flow}
+        investment = getattr(flow, 'investment', None)
+        if investment is not None:
+            records[((str(i), str(o)), 'ep_costs')] = {
+                'value': investment.ep_costs,
+                'sensitivity': model.InvestmentFlow.invest[i, o].value}
+
+    invest_storage = getattr(model, 'GenericInvestmentStorageBlock', None)
+    if invest_storage is not None:
+        for n in invest_storage.invest:
+            records[((str(n), 'None'), 'ep_costs')] = {
+                'value': n.investment.ep_costs,
+                'sensitivity': invest_storage.invest[n].value}
+
+    return pd.DataFrame.from_dict(records, orient='index',
+                                  columns=['value', 'sensitivity'])
+
+
+def dual_results(model):
+    r"""
+    Collects duals, reduced costs and cost sensitivities of a solved
+    model to be stored in energysystem.results['duals'].
+
+    Returns
+    -------
+    results : dict
+        'bus_balance', 'reduced_costs' and 'cost_sensitivity'. Empty for
+        MILP models.
+    """
+    import pyomo.environ as po
+
+    if is_mip(model):
+        logging.warning('Duals are not defined for MILP models.')
+        return {}
+    if not isinstance(getattr(model, 'dual', None), po.Suffix):
+        logging.warning('Call enable_duals(model) before solving the model.')
+        return {}
+
+    return {'bus_balance': bus_duals(model),
+            'reduced_costs': investment_reduced_costs(model),
+            'cost_sensitivity': cost_sensitivity(model)}
@@ -0,0 +1,172 @@
+"""
+Size dependent investment costs inside the optimisation.
+
+The specific investment costs of chillers and cooling towers fall with
+the size of the unit (cost brackets). With fixed ep_costs the optimal
+size and the bracket it belongs to have to be matched by re-solving.
+:func:`add_piecewise_investment` adds the total investment costs as a
+function of the invest variable to a built model, so the size and its
+costs come out of one solve.
+
+The costs are modelled exactly as in :func:`bracket_costs`, i.e. size
+times the specific costs of its bracket, with a jump at each bound: every
+bracket has a binary variable and a size variable within the bounds of
+the bracket, at most one bracket is chosen.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+
+def bracket_costs(size, brackets):
+    r"""
+    Specific investment costs of a size.
+
+    Parameters
+    ----------
+    size : float
+        Size of the unit, e.g. kW_cool.
+
+    brackets : list
+        (upper bound, specific costs) in ascending order, upper bound None
+        for the last bracket, e.g. [(25, 650), (50, 600), (None, 200)].
+        A size equal to a bound belongs to the next bracket.
+
+    Returns
+    -------
+    specific_costs : float
+    """
+    for bound, costs in brackets:
+        if bound is None or size < bound:
+            return costs
+    raise ValueError(f'No bracket for size {size}, the last upper bound '
+                     'has to be None.')
+
+
+def _segments(brackets, maximum):
+    # (lower bound, upper bound, specific costs) of the brackets up to the
+    # maximum size
+    segments, lower = [], 0
+    for bound, specific_costs in brackets:
+        if bound is None or bound >= maximum:
+            segments.append((lower, maximum, specific_costs))
+            return segments
+        segments.append((lower, bound, specific_costs))
+        lower = bound
+    raise ValueError('The last upper bound of the brackets has to be None.')
+
+
+def cost_curve(brackets, maximum):
+    r"""
+    Breakpoints of the total investment costs up to the maximum size.
+
+    Each bound appears twice, with the total costs of the bracket below
+    and of the bracket above it (jump of the step costs).
+
+    Returns
+    -------
+    points : list
+        Sizes, starting at 0 and ending at maximum.
+
+    costs : list
+        Total investment costs at the points.
+    """
+    points, costs = [], []
+    for lower, upper, specific_costs in _segments(brackets, maximum):
+        points += [lower, upper]
+        costs += [lower * specific_costs, upper * specific_costs]
+
+    return points, costs
+
+
+def _invest_variable(model, target):
+    if isinstance(target, tuple):
+        block = getattr(model, 'InvestmentFlow', None)
+        for i, o in (block.FLOWS if block is not None else []):
+            if (str(i), str(o)) == tuple(str(n) for n in target):
+                return block.invest[i, o]
+    else:
+        block = getattr(model, 'GenericInvestmentStorageBlock', None)
+        for n in (block.INVESTSTORAGES if block is not None else []):
+            if str(n) == str(target):
+                return block.invest[n]
+    raise ValueError(f'{target} is neither an investment flow nor an '
+                     'investment storage of the model.')
+
+
+def add_piecewise_investment(model, target, brackets, maximum, factor=1,
+                             name=None):
+    r"""
+    Adds size dependent investment costs of a flow or storage to a model.
+
+    The Investment of the target should have ep_costs=0, the costs are
+    added to the objective by this block.
+
+    Parameters
+    ----------
+    model : solph.Model
+        Built optimisation model.
+
+    target : tuple or node
+        (source, target) of an investment flow or an investment storage,
+        as nodes or labels.
+
+    brackets : list
+        Specific investment costs per size bracket, see
+        :func:`bracket_costs`.
+
+    maximum : float
+        Maximum size, the upper bound of the curve.
+
+    factor : float
+        Factor from the total investment costs to the costs in the
+        objective, e.g. annuity factor plus operational costs share.
+
+    name : str
+        Name of the block, default 'piecewise_invest_<target>'.
+
+    Returns
+    -------
+    block : pyomo.Block
+        With the variables capex (total investment costs), size and
+        active (per bracket).
+    """
+    import pyomo.environ as po
+
+    invest = _invest_variable(model, target)
+    if invest.ub is None or invest.ub > maximum:
+        invest.setub(maximum)
+    segments = _segments(brackets, maximum)
+
+    if name is None:
+        label = '_'.join(str(n) for n in target) \
+            if isinstance(target, tuple) else str(target)
+        name = 'piecewise_invest_' + label
+    block = po.Block()
+    model.add_component(name, block)
+    block.BRACKETS = po.Set(initialize=range(len(segments)), ordered=True)
+    block.capex = po.Var(within=po.NonNegativeReals)
+    block.size = po.Var(block.BRACKETS, within=po.NonNegativeReals)
+    block.active = po.Var(block.BRACKETS, within=po.Binary)
+
+    def _lower_rule(b, k):
+        return b.size[k] >= segments[k][0] * b.active[k]
+    block.lower = po.Constraint(block.BRACKETS, rule=_lower_rule)
+
+    def _upper_rule(b, k):
+        return b.size[k] <= segments[k][1] * b.active[k]
+    block.upper = po.Constraint(block.BRACKETS, rule=_upper_rule)
+
+    block.one_bracket = po.Constraint(
+        expr=sum(block.active[k] for k in block.BRACKETS) <= 1)
+    block.total_size = po.Constraint(
+        expr=invest == sum(block.size[k] for k in block.BRACKETS))
+    block.total_costs = po.Constraint(
+        expr=block.capex == sum(segments[k][2] * block.size[k]
+                                for k in block.BRACKETS))
+    block._objective_expression = lambda: factor * block.capex
+
+    model._add_objective(sense=model.objective.sense, update=True)
+
+    return block
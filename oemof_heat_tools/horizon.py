@@ -0,0 +1,237 @@
+"""
+Multi-year horizons solved chunk by chunk.
+
+A horizon of several years is split into chunks (e.g. years), which are
+built, solved and stored one after another, so only one chunk is held in
+memory. The chunks are linked:
+
+* the storage content at the end of a chunk is the content before the
+  first time step of the next chunk (instead of the cyclic initial
+  capacity of a single run),
+* limits over the whole horizon (summed_max, summed_min) are budgets,
+  which are reduced by the energy used in the previous chunks.
+  summed_max and summed_min are distributed over the remaining chunks by
+  their number of time steps, so the first chunk cannot use up the whole
+  budget. Energy not used by a chunk is left to the following ones.
+
+The chunks are optimised one after another (myopic), i.e. a chunk does
+not know the following ones. Investment models have to be solved as a
+whole, the capacities of the chunks have to be fixed.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import logging
+import os
+
+import pandas as pd
+
+from .solver import solve_model
+
+
+def concat_results(results_list):
+    r"""
+    Concatenates the results dicts (keys as strings) of consecutive
+    chunks or periods. The scalars of the first one are kept.
+    """
+    results = {}
+    for chunk in results_list:
+        for key, res in chunk.items():
+            entry = results.setdefault(key, {'scalars': res['scalars'],
+                                             'sequences': []})
+            entry['sequences'].append(res['sequences'])
+    for entry in results.values():
+        entry['sequences'] = pd.concat(entry['sequences'])
+
+    return results
+
+
+def restore_chunks(files):
+    r"""
+    Results of the whole horizon from the dumps of its chunks.
+
+    Parameters
+    ----------
+    files : list
+        Dumps of the chunks in time order, e.g. the column 'file' of the
+        frame returned by :func:`solve_chunked`.
+
+    Returns
+    -------
+    results : dict
+        'main' and 'param' concatenated (keys as strings), 'meta' of the
+        first chunk with the objective of all chunks.
+    """
+    import oemof.outputlib as outputlib
+    import oemof.solph as solph
+
+    main, param, meta = [], [], None
+    for chunk_file in files:
+        energysystem = solph.EnergySystem()
+        energysystem.restore(dpath=os.path.dirname(chunk_file),
+                             filename=os.path.basename(chunk_file))
+        results = energysystem.results
+        main.append(outputlib.views.convert_keys_to_strings(results['main']))
+        param.append(outputlib.views.convert_keys_to_strings(results['param']))
+        if meta is None:
+            meta = dict(results['meta'], objective=0)
+        meta['objective'] += results['meta']['objective']
+
+    return {'main': concat_results(main), 'param': concat_results(param),
+            'meta': meta}
+
+
+def storage_levels(model):
+    r"""
+    Content of the storages at the last time step, keyed by label.
+    """
+    block = getattr(model, 'GenericStorageBlock', None)
+    if block is None:
+        return {}
+    last = model.TIMESTEPS[-1]
+    return {str(n): block.capacity[n, last].value for n in block.STORAGES}
+
+
+def link_storage_levels(model, levels):
+    r"""
+    Starts the storages of a built model at the given contents instead of
+    the cyclic initial capacity.
+
+    Parameters
+    ----------
+    levels : dict
+        Storage content before the first time step, keyed by label.
+    """
+    import pyomo.environ as po
+
+    block = getattr(model, 'GenericStorageBlock', None)
+    if block is None:
+        return
+    first, last = model.TIMESTEPS.first(), model.TIMESTEPS[-1]
+    storages = [n for n in block.STORAGES if str(n) in levels]
+
+    def _start_rule(m, n):
+        inflow = sum(model.flow[i, n, first] for i in n.inputs)
+        outflow = sum(model.flow[n, o, first] for o in n.outputs)
+        return (block.capacity[n, first] ==
+                levels[str(n)] * (1 - n.capacity_loss[first])
+                + inflow * n.inflow_conversion_factor[first]
+                * model.timeincrement[first]
+                - outflow / n.outflow_conversion_factor[first]
+                * model.timeincrement[first])
+
+    for n in storages:
+        block.balance[n, first].deactivate()
+        block.capacity[n, last].unfix()
+    block.chunk_start = po.Constraint(storages, rule=_start_rule)
+
+
+def _flows_with_limits(energysystem):
+    for node in energysystem.nodes:
+        for target, flow in node.outputs.items():
+            if getattr(flow, 'investment', None) is not None \
+                    or flow.nominal_value is None:
+                continue
+            if flow.summed_max is not None or flow.summed_min is not None:
+                yield (str(node), str(target)), flow
+
+
+def _apply_budgets(energysystem, budgets, share):
+    for key, flow in _flows_with_limits(energysystem):
+        nominal_value = flow.nominal_value
+        if key not in budgets:
+            budgets[key] = {
+                'max': (None if flow.summed_max is None
+                        else flow.summed_max * nominal_value),
+                'min': (None if flow.summed_min is None
+                        else flow.summed_min * nominal_value)}
+        if budgets[key]['max'] is not None:
+            flow.summed_max = max(budgets[key]['max'], 0) * share / nominal_value
+        if budgets[key]['min'] is not None:
+            flow.summed_min = max(budgets[key]['min'], 0) * share / nominal_value
+
+
+def _update_budgets(model, budgets):
+    for (i, o) in model.flows:
+        key = (str(i), str(o))
+        if key not in budgets:
+            continue
+        used = sum(model.flow[i, o, t].value * model.timeincrement[t]
+                   for t in model.TIMESTEPS)
+        for limit in ('max', 'min'):
+            if budgets[key][limit] is not None:
+                budgets[key][limit] -= used
+
+
+def solve_chunked(build_energysystem, timeindex, freq='A', solver='cbc',
+                  options=None, tee=False, dpath='.',
+                  filename='chunk_{chunk}.oemof', label=None):
+    r"""
+    Solves a long horizon chunk by chunk and dumps every chunk with its
+    results.
+
+    Parameters
+    ----------
+    build_energysystem : callable
+        Returns the solph.EnergySystem for the time index of a chunk. The
+        limits (summed_max, summed_min) refer to the whole horizon.
+
+    timeindex : pd.DatetimeIndex
+        Time index of the whole horizon.
+
+    freq : str
+        Length of the chunks, e.g. 'A' (year), see
+        :func:`decomposition.split_periods`.
+
+    dpath, filename : str
+        Directory and name of the dumps; '{chunk}' is replaced by the
+        first time step of the chunk, e.g. 2017 for yearly chunks.
+
+    Returns
+    -------
+    chunks : pd.DataFrame
+        Start, end, objective, dump file and final storage contents per
+        chunk.
+    """
+    import oemof.outputlib as outputlib
+    import oemof.solph as solph
+    from .decomposition import split_periods
+
+    chunks = split_periods(timeindex, freq)
+    remaining_steps = len(timeindex)
+    levels, budgets, summary = {}, {}, []
+    for timeindex_chunk in chunks:
+        name = timeindex_chunk[0].year if freq.startswith('A') \
+            else timeindex_chunk[0].strftime('%Y-%m-%d')
+        logging.info(f'Solve chunk {name} ({len(timeindex_chunk)} time steps)')
+
+        energysystem = build_energysystem(timeindex_chunk)
+        _apply_budgets(energysystem, budgets,
+                       len(timeindex_chunk) / remaining_steps)
+        model = solph.Model(energysystem)
+        link_storage_levels(model, levels)
+        solve_model(model, solver=solver, options=options, tee=tee,
+                    label=label)
+
+        levels = storage_levels(model)
+        _update_budgets(model, budgets)
+        remaining_steps -= len(timeindex_chunk)
+
+        energysystem.results['main'] = outputlib.processing.results(model)
+        energysystem.results['meta'] = outputlib.processing.meta_results(model)
+        energysystem.results['param'] = \
+            outputlib.processing.parameter_as_dict(model)
+        chunk_file = filename.format(chunk=name)
+        energysystem.dump(dpath=dpath, filename=chunk_file)
+
+        summary.append(dict({'chunk': name,
+                             'start': timeindex_chunk[0],
+                             'end': timeindex_chunk[-1],
+                             'objective': model.objective(),
+                             'file': os.path.join(dpath, chunk_file)},
+                            **{f'level_{k}': v for k, v in levels.items()}))
+        del model, energysystem
+
+    return pd.DataFrame(summary).set_index('chunk')
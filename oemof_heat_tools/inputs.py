@@ -0,0 +1,398 @@
+"""
+Input time series: cached binary copies of the raw csv files and time
+series shared by the workers of a sweep.
+
+Parsing the raw csv files (OPSD time series, MERRA-2 weather, the time
+series of the models) takes longer than the runs that use a small part of
+them. :func:`read_csv_cached` converts a csv on first use to one binary
+file per column in CACHE_DIR, keyed by the hash of the file content and
+the read options, and reads later only the requested columns from it:
+
+>>> prices = read_csv_cached('time_series_60min_singleindex.csv',
+...                          columns=['DE_price_day_ahead'],
+...                          index_col='cet_cest_timestamp')
+
+Every worker of a sweep reads the same time series csv (e.g.
+time_series.csv of the Oman models) and keeps its own copy.
+:func:`shared_frame` parses the csv once, writes the numeric columns as
+one float64 array to a .npy file in SHARED_DIR (shared memory on Linux)
+and returns a DataFrame on a read-only memory map of it. All processes on
+a machine use the same pages of the file.
+
+>>> data = shared_frame('time_series.csv', sep=';')
+
+Neither is removed automatically, a changed csv adds a new cache and a
+new store. :func:`clear_cache` removes caches that were not used for some
+days, :func:`clear_shared` the stores (e.g. after a sweep), also from the
+command line:
+
+    python -m oemof_heat_tools.inputs --clear-cache 30 --clear-shared
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.oemof', 'csv_cache')
+
+SHARED_DIR = os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(),
+    'oemof_heat_inputs')
+
+
+def _store_key(path, read_csv_kwargs):
+    stat = os.stat(path)
+    key = json.dumps([os.path.abspath(path), stat.st_mtime_ns, stat.st_size,
+                      sorted(read_csv_kwargs.items())], default=str)
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def _replace(write, target):
+    # write to a temporary file first, so that no worker reads a half file
+    directory = os.path.dirname(target)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, target)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def file_hash(path, cache_dir=None):
+    r"""
+    sha1 of the content of a file. The hash is kept per path, modification
+    time and size in cache_dir/hashes.json, so unchanged files are not
+    read again.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    hashes_file = os.path.join(cache_dir, 'hashes.json')
+    stat = os.stat(path)
+    key = os.path.abspath(path)
+    signature = [stat.st_mtime_ns, stat.st_size]
+    hashes = {}
+    if os.path.exists(hashes_file):
+        with open(hashes_file, 'r') as f:
+            hashes = json.load(f)
+    if key in hashes and hashes[key][:2] == signature:
+        return hashes[key][2]
+
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(2 ** 20), b''):
+            sha1.update(chunk)
+    hashes[key] = signature + [sha1.hexdigest()]
+
+    def write_hashes(tmp):
+        with open(tmp, 'w') as f:
+            json.dump(hashes, f, indent=1)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    _replace(write_hashes, hashes_file)
+
+    return sha1.hexdigest()
+
+
+def _save_column(directory, number, values):
+    # numeric and naive datetime columns as .npy, others (strings, time
+    # zones, the index) pickled
+    if isinstance(values, pd.Series) and isinstance(values.dtype, np.dtype) \
+            and values.dtype.kind in 'biufcmM':
+        filename = f'{number}.npy'
+        np.save(os.path.join(directory, filename), values.to_numpy())
+    else:
+        filename = f'{number}.pkl'
+        with open(os.path.join(directory, filename), 'wb') as f:
+            pickle.dump(values, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return filename
+
+
+def _load_column(directory, filename):
+    if filename.endswith('.npy'):
+        return np.load(os.path.join(directory, filename))
+    with open(os.path.join(directory, filename), 'rb') as f:
+        return pickle.load(f)
+
+
+def convert_csv(path, directory, **read_csv_kwargs):
+    r"""
+    Parses a csv and writes its index and columns to directory.
+    """
+    frame = pd.read_csv(path, **read_csv_kwargs)
+    tmp = tempfile.mkdtemp(dir=os.path.dirname(directory), suffix='.tmp')
+    try:
+        meta = {'source': os.path.abspath(path),
+                'read_csv': json.dumps(read_csv_kwargs, default=str),
+                'index': _save_column(tmp, 'index', frame.index),
+                'index_names': list(frame.index.names),
+                'columns': [[column, _save_column(tmp, number, frame[column])]
+                            for number, column in enumerate(frame.columns)]}
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        # a cache directory is complete once it exists
+        os.rename(tmp, directory)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.exists(os.path.join(directory, 'meta.json')):
+            raise
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+def read_csv_cached(path, columns=None, cache_dir=None, **read_csv_kwargs):
+    r"""
+    pd.read_csv with a binary cache of the parsed file.
+
+    Parameters
+    ----------
+    path : str
+        csv-file.
+
+    columns : list
+        Columns to read from the cache, default all. The csv is converted
+        with all columns (of usecols), so other projections are served by
+        the same cache.
+
+    cache_dir : str
+        Directory of the cache, default CACHE_DIR.
+
+    read_csv_kwargs
+        Arguments of pd.read_csv, e.g. sep=';' or parse_dates=True. They
+        are part of the cache key.
+
+    Returns
+    -------
+    frame : pd.DataFrame
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+    options = json.dumps(sorted(read_csv_kwargs.items()), default=str)
+    key = hashlib.sha1((file_hash(path, cache_dir) + options).encode())
+    directory = os.path.join(cache_dir, key.hexdigest()[:20])
+    if not os.path.exists(os.path.join(directory, 'meta.json')):
+        convert_csv(path, directory, **read_csv_kwargs)
+
+    meta_file = os.path.join(directory, 'meta.json')
+    with open(meta_file, 'r') as f:
+        meta = json.load(f)
+    # last use, see clear_cache
+    os.utime(meta_file)
+    stored = dict((column, filename) for column, filename in meta['columns'])
+    if columns is None:
+        columns = [column for column, _ in meta['columns']]
+    missing = [column for column in columns if column not in stored]
+    if missing:
+        raise KeyError(f'{missing} not in {path}')
+
+    index = _load_column(directory, meta['index'])
+    if not isinstance(index, pd.Index):
+        index = pd.Index(index)
+    index.names = meta['index_names']
+    frame = pd.DataFrame({column: _load_column(directory, stored[column])
+                          for column in columns}, index=index)
+
+    return frame
+
+
+def store_frame(frame, base):
+    r"""
+    Writes a frame with a RangeIndex to base.npy (numeric columns) and
+    base.json (column names and other columns).
+    """
+    numeric = frame.select_dtypes('number')
+    meta = {'columns': list(frame.columns),
+            'numeric': list(numeric.columns),
+            'other': {column: frame[column].tolist() for column in
+                      frame.columns if column not in numeric.columns},
+            'length': len(frame)}
+    values = np.ascontiguousarray(numeric.values, dtype=np.float64)
+
+    def write_values(tmp):
+        # a file object, np.save appends .npy to names without it
+        with open(tmp, 'wb') as f:
+            np.save(f, values)
+
+    def write_meta(tmp):
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+
+    _replace(write_values, base + '.npy')
+    _replace(write_meta, base + '.json')
+
+
+def load_frame(base):
+    r"""
+    DataFrame of a stored frame, the numeric columns on a read-only memory
+    map. The other columns follow the numeric ones, reordering the columns
+    would copy the data.
+    """
+    with open(base + '.json', 'r') as f:
+        meta = json.load(f)
+    values = np.load(base + '.npy', mmap_mode='r')
+    frame = pd.DataFrame(values, columns=meta['numeric'], copy=False)
+    for column, value in meta['other'].items():
+        frame[column] = value
+
+    return frame
+
+
+def shared_frame(path, shared_dir=None, cache_dir=None, **read_csv_kwargs):
+    r"""
+    Time series csv as DataFrame, parsed once per machine.
+
+    Parameters
+    ----------
+    path : str
+        csv-file, changes of the file (time or size) create a new store.
+
+    shared_dir : str
+        Directory of the stores, default SHARED_DIR.
+
+    cache_dir : str
+        Directory of the csv cache, see :func:`read_csv_cached`.
+
+    read_csv_kwargs
+        Arguments of pd.read_csv, e.g. sep=';'. The index has to be a
+        RangeIndex (no index_col).
+
+    Returns
+    -------
+    frame : pd.DataFrame
+        Numeric columns as float64 on a read-only memory map, followed by
+        the other columns.
+    """
+    shared_dir = shared_dir or SHARED_DIR
+    os.makedirs(shared_dir, exist_ok=True)
+    base = os.path.join(shared_dir, _store_key(path, read_csv_kwargs))
+    if not (os.path.exists(base + '.npy') and os.path.exists(base + '.json')):
+        frame = read_csv_cached(path, cache_dir=cache_dir, **read_csv_kwargs)
+        if not isinstance(frame.index, pd.RangeIndex):
+            raise ValueError('shared_frame needs a RangeIndex, '
+                             'do not pass index_col.')
+        store_frame(frame, base)
+
+    return load_frame(base)
+
+
+def read_time_series(path, shared=False, **read_csv_kwargs):
+    r"""
+    :func:`read_csv_cached` or, with shared=True, :func:`shared_frame`.
+    """
+    if shared:
+        return shared_frame(path, **read_csv_kwargs)
+    return read_csv_cached(path, **read_csv_kwargs)
+
+
+def clear_cache(cache_dir=None, max_age=None):
+    r"""
+    Removes the caches of :func:`read_csv_cached`.
+
+    Parameters
+    ----------
+    cache_dir : str
+        Directory of the cache, default CACHE_DIR.
+
+    max_age : float
+        Days since the last use of a cache after which it is removed,
+        default all caches. Hashes of files that do not exist any more
+        are removed in any case.
+
+    Returns
+    -------
+    removed : int
+        Number of removed caches.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return 0
+    now = time.time()
+    removed = 0
+    for name in os.listdir(cache_dir):
+        directory = os.path.join(cache_dir, name)
+        if not os.path.isdir(directory):
+            continue
+        meta_file = os.path.join(directory, 'meta.json')
+        if os.path.exists(meta_file):
+            age = now - os.path.getmtime(meta_file)
+            expired = max_age is None or age > max_age * 86400
+        elif name.endswith('.tmp'):
+            # left by an interrupted conversion, a day old at least so that
+            # running conversions are kept
+            age = now - os.path.getmtime(directory)
+            expired = age > max(max_age or 0, 1) * 86400
+        else:
+            continue
+        if expired:
+            shutil.rmtree(directory, ignore_errors=True)
+            removed += 1
+
+    hashes_file = os.path.join(cache_dir, 'hashes.json')
+    if os.path.exists(hashes_file):
+        with open(hashes_file, 'r') as f:
+            hashes = json.load(f)
+        hashes = {path: value for path, value in hashes.items()
+                  if os.path.exists(path)}
+
+        def write_hashes(tmp):
+            with open(tmp, 'w') as f:
+                json.dump(hashes, f, indent=1)
+
+        _replace(write_hashes, hashes_file)
+
+    return removed
+
+
+def clear_shared(shared_dir=None):
+    r"""
+    Removes the stores of :func:`shared_frame`. Frames that are in use
+    keep their data until they are deleted (Unix), later calls of
+    shared_frame parse the csv again.
+
+    Returns
+    -------
+    removed : int
+        Number of removed stores.
+    """
+    shared_dir = shared_dir or SHARED_DIR
+    if not os.path.isdir(shared_dir):
+        return 0
+    removed = 0
+    for name in os.listdir(shared_dir):
+        if name.endswith(('.npy', '.json')):
+            os.remove(os.path.join(shared_dir, name))
+            removed += name.endswith('.npy')
+
+    return removed
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description='Remove cached and shared input time series.')
+    parser.add_argument('--clear-cache', type=float, default=None,
+                        metavar='DAYS',
+                        help='remove csv caches not used for DAYS days, '
+                             '0 removes all')
+    parser.add_argument('--clear-shared', action='store_true',
+                        help=f'remove the shared time series in {SHARED_DIR}')
+    arguments = parser.parse_args()
+
+    if arguments.clear_cache is not None:
+        print(f'{clear_cache(max_age=arguments.clear_cache)} caches removed')
+    if arguments.clear_shared:
+        print(f'{clear_shared()} shared time series removed')
@@ -0,0 +1,151 @@
+"""
+Run a scenario in its own process with a memory and a time limit.
+
+A solver that runs out of control on a large investment model can use up
+the memory of a shared node and end the whole sweep. :func:`run_isolated`
+runs the function in a child process in its own process group. The
+address space of the child, and of the solver executables it starts, is
+limited to memory_limit (Unix only). After time_limit seconds the process
+group is terminated. Hitting a limit is returned as status 'limit' instead
+of raising: the time limit, a MemoryError, a SIGKILL (OOM killer) or a
+failure with a peak memory near the limit. Other failures and crashes of
+the child (e.g. a segmentation fault) are status 'failed'.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import logging
+import multiprocessing
+import os
+import signal
+import traceback
+
+# share of the memory limit used by a process that failed, above which the
+# failure is counted as hitting the limit (e.g. bad_alloc of the solver)
+MEMORY_LIMIT_SHARE = 0.9
+
+
+def _max_rss(who='both'):
+    # peak resident memory of the process ('self'), of its terminated
+    # children ('children') or of both in bytes
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = []
+    if who in ('self', 'both'):
+        rss.append(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    if who in ('children', 'both'):
+        rss.append(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return 1024 * max(rss)
+
+
+def _isolated_worker(func, args, kwargs, memory_limit, connection):
+    # own process group, so that the solver executable is terminated too
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    if memory_limit is not None:
+        try:
+            import resource
+            resource.setrlimit(resource.RLIMIT_AS,
+                               (memory_limit, memory_limit))
+        except (ImportError, ValueError) as e:
+            logging.warning(f'Memory limit is not set: {e}')
+
+    try:
+        result = func(*args, **kwargs)
+    except MemoryError:
+        connection.send(('limit', None, 'memory limit'))
+    except Exception:
+        error = traceback.format_exc(limit=-3)
+        max_rss = _max_rss()
+        if memory_limit is not None and max_rss is not None \
+                and max_rss >= MEMORY_LIMIT_SHARE * memory_limit:
+            connection.send(('limit', None, 'memory limit\n' + error))
+        else:
+            connection.send(('failed', None, error))
+    else:
+        connection.send(('done', result, None))
+    connection.close()
+
+
+def _terminate(process, grace=10):
+    for sig in [signal.SIGTERM, getattr(signal, 'SIGKILL', signal.SIGTERM)]:
+        if not process.is_alive():
+            return
+        try:
+            os.killpg(process.pid, sig)
+        except (AttributeError, ProcessLookupError, PermissionError):
+            process.terminate()
+        process.join(grace)
+
+
+def run_isolated(func, args=(), kwargs=None, memory_limit=None,
+                 time_limit=None, grace=10):
+    r"""
+    Runs func in a child process with limits.
+
+    Parameters
+    ----------
+    func : callable
+        Function of the scenario, its return value has to be picklable.
+
+    memory_limit : int
+        Bytes of address space of the child and the solver it starts.
+
+    time_limit : float
+        Seconds after which the child and the solver are terminated.
+
+    grace : float
+        Seconds between SIGTERM and SIGKILL.
+
+    Returns
+    -------
+    outcome : dict
+        'status' ('done', 'failed' or 'limit'), 'result' of func and
+        'error'.
+    """
+    context = multiprocessing.get_context(
+        'fork' if hasattr(os, 'fork') else 'spawn')
+    # the peak of the children only tells about this child if it grows
+    rss_before = _max_rss('children')
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(
+        target=_isolated_worker,
+        args=(func, args, kwargs or {}, memory_limit, sender))
+    process.start()
+    sender.close()
+
+    try:
+        if receiver.poll(time_limit):
+            status, result, error = receiver.recv()
+            process.join(grace)
+        else:
+            status, result, error = \
+                'limit', None, f'time limit of {time_limit} s'
+    except EOFError:
+        # the child died without an answer: killed (e.g. by the OOM
+        # killer), out of memory or crashed
+        process.join(grace)
+        exitcode = process.exitcode
+        rss = _max_rss('children')
+        near_limit = (memory_limit is not None and rss is not None
+                      and rss > (rss_before or 0)
+                      and rss >= MEMORY_LIMIT_SHARE * memory_limit)
+        if exitcode == -getattr(signal, 'SIGKILL', 9) or near_limit:
+            status = 'limit'
+        else:
+            status = 'failed'
+        result, error = None, f'process ended with exit code {exitcode}'
+    finally:
+        _terminate(process, grace)
+        process.join()
+        receiver.close()
+
+    if status == 'limit':
+        logging.warning(f'{getattr(func, "__name__", func)} hit a limit: '
+                        f'{error.splitlines()[0]}')
+
+    return {'status': status, 'result': result, 'error': error}
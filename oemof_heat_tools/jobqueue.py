@@ -0,0 +1,463 @@
+"""
+Job queue to run a sweep on several machines.
+
+A coordinator puts the scenarios of a sweep into a queue, workers on any
+machine that sees the queue and the results directory take them one by
+one and run them. A job names the function that runs the scenario and
+its arguments, e.g. a variation of the Oman model:
+
+>>> jobs = open_queue('sqlite:///../results/jobs.sqlite')
+>>> jobs.put('oman_thermal_5_3', {
+...     'path': '/home/user/oemof_heat/System_C/Oman/src',
+...     'func': 'SystemC_oman_thermal:run_model_thermal',
+...     'kwargs': {'config_path': config_path, 'var_number': 3},
+...     'output': '../results/dumps/oman_thermal_5_3.oemof'})
+
+and on each node
+
+    python -m oemof_heat_tools.jobqueue sqlite:////shared/results/jobs.sqlite
+
+The results (dumps, csv files) are written by the functions to the shared
+results directory, the queue keeps status, output location, worker and
+error of each job. With a memory or time limit every job runs in its own
+process (isolation.py), a job that hits a limit gets status 'limit' and is
+not retried. Jobs with a higher priority (the estimated runtime, see
+scheduling.py) are taken first. The default backend is a SQLite file on a shared file
+system, 'redis://host:port/db' uses a Redis server (needs the redis
+package).
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import contextlib
+import importlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import sys
+import time
+import traceback
+
+from .isolation import run_isolated
+from .scheduling import runtime_log_path, write_runtime_log
+from .solver import record_model_classes
+
+
+def _now():
+    return time.time()
+
+
+def _priority(payload, priority=None):
+    if priority is None:
+        priority = payload.get('predicted') or 0
+    return priority
+
+
+def default_worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+class SQLiteQueue(object):
+    r"""
+    Job queue in a SQLite file.
+
+    Parameters
+    ----------
+    path : str
+        SQLite file, created if it does not exist.
+
+    max_attempts : int
+        Attempts of a job before it stays failed.
+    """
+    def __init__(self, path, max_attempts=2):
+        self.path = os.path.abspath(path)
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with self._connect() as con:
+            con.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'key TEXT PRIMARY KEY, payload TEXT, status TEXT, '
+                'attempts INTEGER DEFAULT 0, worker TEXT, result TEXT, '
+                'error TEXT, enqueued REAL, started REAL, finished REAL, '
+                'priority REAL DEFAULT 0)')
+            columns = [row[1] for row in con.execute('PRAGMA table_info(jobs)')]
+            if 'priority' not in columns:
+                con.execute('ALTER TABLE jobs ADD COLUMN priority REAL DEFAULT 0')
+
+    @contextlib.contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=60)
+        try:
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    @staticmethod
+    def _job(row):
+        keys = ['key', 'payload', 'status', 'attempts', 'worker', 'result',
+                'error', 'enqueued', 'started', 'finished', 'priority']
+        job = dict(zip(keys, row))
+        job['payload'] = json.loads(job['payload'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def put(self, key, payload, priority=None):
+        r"""
+        Adds a job, a job with the same key is kept (also if it is done).
+
+        Parameters
+        ----------
+        priority : float
+            Jobs with higher priority are taken first, default
+            payload['predicted'] (estimated runtime) or 0.
+
+        Returns
+        -------
+        added : bool
+        """
+        priority = _priority(payload, priority)
+        with self._connect() as con:
+            cursor = con.execute(
+                'INSERT OR IGNORE INTO jobs '
+                '(key, payload, status, enqueued, priority) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, json.dumps(payload), 'pending', _now(), priority))
+        return cursor.rowcount == 1
+
+    def get(self, worker=None):
+        r"""
+        Takes the pending job with the highest priority, None if there is
+        none.
+        """
+        con = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            # the write lock makes sure a job is taken by one worker
+            con.execute('BEGIN IMMEDIATE')
+            row = con.execute(
+                "SELECT * FROM jobs WHERE status = 'pending' "
+                'ORDER BY priority DESC, enqueued, key LIMIT 1').fetchone()
+            if row is None:
+                con.execute('COMMIT')
+                return None
+            con.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, "
+                'attempts = attempts + 1, started = ?, error = NULL '
+                'WHERE key = ?',
+                (worker or default_worker_name(), _now(), row[0]))
+            con.execute('COMMIT')
+        finally:
+            con.close()
+
+        return self.job(row[0])
+
+    def job(self, key):
+        with self._connect() as con:
+            row = con.execute('SELECT * FROM jobs WHERE key = ?',
+                              (key,)).fetchone()
+        return self._job(row) if row else None
+
+    def jobs(self, status=None):
+        with self._connect() as con:
+            if status is None:
+                rows = con.execute('SELECT * FROM jobs ORDER BY key')
+            else:
+                rows = con.execute('SELECT * FROM jobs WHERE status = ? '
+                                   'ORDER BY key', (status,))
+            return [self._job(row) for row in rows.fetchall()]
+
+    def complete(self, key, result=None):
+        with self._connect() as con:
+            con.execute(
+                "UPDATE jobs SET status = 'done', result = ?, finished = ? "
+                'WHERE key = ?', (json.dumps(result), _now(), key))
+
+    def fail(self, key, error, status='failed'):
+        r"""
+        Marks a job as failed, it is pending again if it has attempts left.
+        """
+        job = self.job(key)
+        if status == 'failed' and job['attempts'] < self.max_attempts:
+            status = 'pending'
+        with self._connect() as con:
+            con.execute(
+                'UPDATE jobs SET status = ?, error = ?, finished = ? '
+                'WHERE key = ?', (status, error, _now(), key))
+
+    def requeue_stale(self, seconds):
+        r"""
+        Puts jobs back that are running for longer than seconds, e.g. of
+        workers on a node that was rebooted.
+        """
+        with self._connect() as con:
+            cursor = con.execute(
+                "UPDATE jobs SET status = 'pending', error = 'stale' "
+                "WHERE status = 'running' AND started < ?",
+                (_now() - seconds,))
+        return cursor.rowcount
+
+    def counts(self):
+        with self._connect() as con:
+            return dict(con.execute(
+                'SELECT status, COUNT(*) FROM jobs GROUP BY status'))
+
+
+class RedisQueue(object):
+    r"""
+    Job queue on a Redis server, same interface as :class:`SQLiteQueue`.
+
+    Parameters
+    ----------
+    url : str
+        e.g. 'redis://localhost:6379/0'.
+
+    name : str
+        Prefix of the Redis keys of this queue.
+    """
+    def __init__(self, url, name='oemof_heat', max_attempts=2):
+        import redis
+
+        self.redis = redis.Redis.from_url(url)
+        self.name = name
+        self.max_attempts = max_attempts
+
+    def _key(self, suffix):
+        return f'{self.name}:{suffix}'
+
+    def _save(self, job):
+        self.redis.hset(self._key('jobs'), job['key'], json.dumps(job))
+
+    def _push(self, job):
+        self.redis.zadd(self._key('pending'), {job['key']: job['priority']})
+
+    def put(self, key, payload, priority=None):
+        job = {'key': key, 'payload': payload, 'status': 'pending',
+               'attempts': 0, 'worker': None, 'result': None, 'error': None,
+               'enqueued': _now(), 'started': None, 'finished': None,
+               'priority': _priority(payload, priority)}
+        if not self.redis.hsetnx(self._key('jobs'), key, json.dumps(job)):
+            return False
+        self._push(job)
+        return True
+
+    def get(self, worker=None):
+        popped = self.redis.zpopmax(self._key('pending'))
+        if not popped:
+            return None
+        job = self.job(popped[0][0].decode())
+        job.update(status='running', worker=worker or default_worker_name(),
+                   attempts=job['attempts'] + 1, started=_now(), error=None)
+        self._save(job)
+        return job
+
+    def job(self, key):
+        value = self.redis.hget(self._key('jobs'), key)
+        return json.loads(value) if value else None
+
+    def jobs(self, status=None):
+        jobs = [json.loads(value) for value in
+                self.redis.hvals(self._key('jobs'))]
+        return sorted((job for job in jobs
+                       if status is None or job['status'] == status),
+                      key=lambda job: job['key'])
+
+    def complete(self, key, result=None):
+        job = self.job(key)
+        job.update(status='done', result=result, finished=_now())
+        self._save(job)
+
+    def fail(self, key, error, status='failed'):
+        job = self.job(key)
+        if status == 'failed' and job['attempts'] < self.max_attempts:
+            status = 'pending'
+        job.update(status=status, error=error, finished=_now())
+        self._save(job)
+        if status == 'pending':
+            self._push(job)
+
+    def requeue_stale(self, seconds):
+        stale = [job for job in self.jobs('running')
+                 if job['started'] < _now() - seconds]
+        for job in stale:
+            job.update(status='pending', error='stale')
+            self._save(job)
+            self._push(job)
+        return len(stale)
+
+    def counts(self):
+        counts = {}
+        for job in self.jobs():
+            counts[job['status']] = counts.get(job['status'], 0) + 1
+        return counts
+
+
+def open_queue(url, **kwargs):
+    r"""
+    Queue of an url, 'sqlite:///relative/path.sqlite',
+    'sqlite:////absolute/path.sqlite', 'redis://host:port/db' or a path of
+    a SQLite file.
+    """
+    if url.startswith('redis://'):
+        return RedisQueue(url, **kwargs)
+    if url.startswith('sqlite:///'):
+        url = url[len('sqlite:///'):]
+    return SQLiteQueue(url, **kwargs)
+
+
+def run_job(payload):
+    r"""
+    Runs the function of a job in the directory of the job.
+
+    Parameters
+    ----------
+    payload : dict
+        'func' as 'module:function', 'path' (directory of the module, the
+        function runs in it), 'args', 'kwargs' and 'output' (location of
+        the results, default the return value of the function).
+
+    Returns
+    -------
+    output
+    """
+    path = payload.get('path')
+    cwd = os.getcwd()
+    if path:
+        if path not in sys.path:
+            sys.path.insert(0, path)
+        os.chdir(path)
+    try:
+        module, function = payload['func'].split(':')
+        func = getattr(importlib.import_module(module), function)
+        result = func(*payload.get('args', []), **payload.get('kwargs', {}))
+    finally:
+        os.chdir(cwd)
+
+    return payload.get('output', result)
+
+
+def _run_job_classified(payload):
+    # output of the job and the class of the models it solved ('milp' if
+    # one of them is a MILP, None if it solved none)
+    with record_model_classes() as classes:
+        output = run_job(payload)
+    model_class = 'milp' if 'milp' in classes else ('lp' if classes else None)
+    return output, model_class
+
+
+def work(queue, worker=None, wait=False, poll=10, max_jobs=None,
+         runtime_log=None, memory_limit=None, time_limit=None):
+    r"""
+    Runs jobs of the queue until it is empty.
+
+    Parameters
+    ----------
+    queue : SQLiteQueue or RedisQueue
+
+    worker : str
+        Name of the worker, default host:pid.
+
+    wait : bool
+        Wait for new jobs (poll seconds) instead of stopping when the queue
+        is empty.
+
+    max_jobs : int
+        Stop after this number of jobs.
+
+    runtime_log : path
+        Runtimes of the jobs with payload['features'] are appended to it
+        for the estimates of later sweeps, with the model class of the
+        solved models. Default next to the queue, see
+        :func:`scheduling.runtime_log_path`, False does not log them.
+
+    memory_limit : int
+        Bytes of memory of a job, payload['memory_limit'] overrides it.
+
+    time_limit : float
+        Seconds of a job, payload['time_limit'] overrides it.
+
+    Returns
+    -------
+    done : int
+        Number of jobs the worker has run.
+    """
+    worker = worker or default_worker_name()
+    if runtime_log is None:
+        runtime_log = runtime_log_path(queue)
+    done = 0
+    while max_jobs is None or done < max_jobs:
+        job = queue.get(worker)
+        if job is None:
+            if not wait:
+                break
+            time.sleep(poll)
+            continue
+        logging.info(f'{worker} runs {job["key"]}')
+        payload = job['payload']
+        limits = {'memory_limit': memory_limit, 'time_limit': time_limit}
+        limits.update((name, payload[name]) for name in limits
+                      if payload.get(name) is not None)
+        if any(limit is not None for limit in limits.values()):
+            outcome = run_isolated(_run_job_classified, (payload,), **limits)
+        else:
+            try:
+                outcome = {'status': 'done',
+                           'result': _run_job_classified(payload)}
+            except Exception:
+                outcome = {'status': 'failed',
+                           'error': traceback.format_exc(limit=-3)}
+
+        if outcome['status'] != 'done':
+            logging.error(f'{job["key"]} {outcome["status"]}: '
+                          f'{outcome["error"].strip().splitlines()[-1]}')
+            queue.fail(job['key'], outcome['error'], status=outcome['status'])
+        else:
+            result, model_class = outcome['result']
+            queue.complete(job['key'], result)
+            features = dict(job['payload'].get('features') or {})
+            if runtime_log and features:
+                if model_class is not None:
+                    features['model_class'] = model_class
+                finished = queue.job(job['key'])
+                write_runtime_log(
+                    runtime_log, key=job['key'],
+                    predicted=job['payload'].get('predicted'),
+                    runtime=finished['finished'] - finished['started'],
+                    **features)
+        done += 1
+
+    return done
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run jobs of a queue.')
+    parser.add_argument('queue', help='sqlite:///path or redis://host:port/db')
+    parser.add_argument('--worker', default=None)
+    parser.add_argument('--wait', action='store_true',
+                        help='wait for new jobs when the queue is empty')
+    parser.add_argument('--poll', type=float, default=10)
+    parser.add_argument('--memory-limit', type=float, default=None,
+                        help='GB of memory of a job')
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help='seconds of a job')
+    parser.add_argument('--runtime-log', default=None,
+                        help='csv of the job runtimes, default next to the queue')
+    parser.add_argument('--report', action='store_true',
+                        help='print estimated and actual runtimes of the jobs')
+    arguments = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if arguments.report:
+        from .scheduling import runtime_report
+        print(runtime_report(open_queue(arguments.queue)).to_string())
+    else:
+        memory_limit = None if arguments.memory_limit is None \
+            else int(arguments.memory_limit * 1024 ** 3)
+        work(open_queue(arguments.queue), worker=arguments.worker,
+             wait=arguments.wait, poll=arguments.poll,
+             runtime_log=arguments.runtime_log, memory_limit=memory_limit, time_limit=arguments.time_limit)
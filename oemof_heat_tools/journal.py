@@ -0,0 +1,190 @@
+"""
+Journal of a sweep over scenarios (variations, experiment configs).
+
+The status of every scenario is written to a json file when it starts,
+finishes or fails. The file is replaced atomically, so a sweep that is
+killed (solver crash, out of memory, reboot) leaves a valid journal. A
+restarted sweep skips the scenarios that are done and retries the others
+until they have used up their attempts:
+
+>>> journal = SweepJournal('results/sweep_experiment_5.json', max_attempts=2)
+>>> for n in range(12):
+...     journal.run(f'thermal_{n}', run_model_thermal, config_path, n)
+
+A scenario that is still 'running' when the journal is opened was
+interrupted and counts as a failed attempt.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import json
+import logging
+import os
+import tempfile
+import time
+import traceback
+
+
+class SweepJournal(object):
+    r"""
+    Status and output of the scenarios of a sweep.
+
+    Parameters
+    ----------
+    path : str
+        Json file of the journal, created if it does not exist.
+
+    max_attempts : int
+        Attempts of a scenario over all runs of the sweep.
+
+    retry_delay : float
+        Seconds to wait before a failed scenario is tried again in the same
+        run.
+
+    retry_interrupted : bool
+        Retry scenarios that were interrupted (status 'running' when the
+        journal is opened). False marks them as failed for good, e.g. if
+        they run out of memory.
+
+    reraise : bool
+        Raise the error of a scenario after its last attempt instead of
+        going on with the next scenario.
+    """
+    def __init__(self, path, max_attempts=3, retry_delay=0,
+                 retry_interrupted=True, reraise=False):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.reraise = reraise
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.entries = json.load(f)
+
+        interrupted = [key for key, entry in self.entries.items()
+                       if entry['status'] == 'running']
+        for key in interrupted:
+            entry = self.entries[key]
+            entry['status'] = 'failed'
+            entry['error'] = 'interrupted'
+            if not retry_interrupted:
+                entry['attempts'] = max(entry['attempts'], max_attempts)
+        if interrupted:
+            logging.warning(f'Interrupted scenarios: {interrupted}')
+            self._write()
+
+    def _write(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+    def _update(self, key, **values):
+        entry = self.entries.setdefault(
+            key, {'status': 'pending', 'attempts': 0, 'output': None,
+                  'error': None})
+        entry.update(values)
+        entry['time'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        self._write()
+
+    def status(self, key):
+        r"""
+        'pending', 'running', 'done' or 'failed'.
+        """
+        return self.entries.get(key, {}).get('status', 'pending')
+
+    def output(self, key):
+        r"""
+        Output location of a scenario that is done.
+        """
+        return self.entries.get(key, {}).get('output')
+
+    def attempts(self, key):
+        return self.entries.get(key, {}).get('attempts', 0)
+
+    def pending(self, keys):
+        r"""
+        Scenarios of keys that still have to run.
+        """
+        return [key for key in keys if self.should_run(key)]
+
+    def should_run(self, key):
+        return (self.status(key) != 'done'
+                and self.attempts(key) < self.max_attempts)
+
+    def start(self, key):
+        self._update(key, status='running', attempts=self.attempts(key) + 1,
+                     output=None, error=None)
+
+    def finish(self, key, output=None):
+        self._update(key, status='done', output=output)
+
+    def fail(self, key, error):
+        self._update(key, status='failed', error=error)
+
+    def run(self, key, func, *args, output=None, **kwargs):
+        r"""
+        Runs a scenario unless it is done or out of attempts.
+
+        Parameters
+        ----------
+        key : str
+            Name of the scenario.
+
+        func : callable
+            Runs the scenario with args and kwargs.
+
+        output : str
+            Output location written to the journal, e.g. the dump file.
+            Default is the return value of func if it is a string.
+
+        Returns
+        -------
+        status : str
+            Status of the scenario after the run.
+        """
+        if self.status(key) == 'done':
+            logging.info(f'{key} is done: {self.output(key)}')
+            return 'done'
+
+        while self.attempts(key) < self.max_attempts:
+            self.start(key)
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                logging.error(f'{key} failed (attempt {self.attempts(key)}'
+                              f' of {self.max_attempts}): {e!r}')
+                self.fail(key, traceback.format_exc(limit=-3))
+                if self.attempts(key) >= self.max_attempts:
+                    if self.reraise:
+                        raise
+                    break
+                time.sleep(self.retry_delay)
+            else:
+                if output is None and isinstance(result, str):
+                    output = result
+                self.finish(key, output)
+                break
+        else:
+            logging.warning(f'{key} skipped, no attempts left.')
+
+        return self.status(key)
+
+    def summary(self):
+        r"""
+        Number of scenarios per status.
+        """
+        counts = {}
+        for entry in self.entries.values():
+            counts[entry['status']] = counts.get(entry['status'], 0) + 1
+        return counts
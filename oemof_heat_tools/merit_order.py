@@ -0,0 +1,293 @@
+"""
+Heuristic merit-order dispatch of System A.
+
+A fast alternative to the LP for screening scenarios of the System A heat
+and electricity system (CHP, boiler, P2H, thermal storage, battery). The
+dispatch follows fixed rules instead of an optimisation:
+
+* electricity: the negative residual load covers the electricity demand,
+  a surplus runs the P2H unit, then charges the battery, the rest is
+  excess. A deficit is covered by the battery, then the CHP, the rest is
+  shortage.
+* heat: P2H heat, CHP heat (limited by the back-pressure line of the
+  electricity-led CHP), thermal storage, boiler and shortage in this
+  order. Spare P2H and CHP heat charges the thermal storage, the rest of
+  the P2H heat is excess.
+
+The CHP is the extraction turbine described by parameter.csv
+(conversion_factor_chp_bel, conversion_factor_chp_bth,
+conv_factor_full_cond_chp), the storages start at their initial capacity
+and end freely. All time series may be 2-dimensional (time steps x
+scenarios) to dispatch many scenarios at once.
+
+The results have the format of outputlib.processing.results with labels
+instead of nodes and can be stored and plotted like the results of the
+LP.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import numpy as np
+import pandas as pd
+
+
+SYSTEM_A_PARAMETERS = [
+    'nom_val_neg_residual', 'nom_val_demand_el', 'nom_val_demand_th',
+    'nom_val_chp_out_el', 'nom_val_chp_out_th', 'conversion_factor_chp_bel',
+    'conversion_factor_chp_bth', 'conv_factor_full_cond_chp',
+    'nom_val_out_boiler', 'conversion_factor_boiler', 'nom_val_p2h_out_bth',
+    'conversion_factor_p2h',
+    'nom_capacity_storage_th', 'capacity_loss_storage_th',
+    'init_capacity_storage_th', 'inflow_conv_factor_storage_th',
+    'outflow_conv_factor_storage_th', 'nom_val_input_bth_storage_th',
+    'nom_val_output_bth_storage_th',
+    'nom_capacity_storage_el', 'capacity_loss_storage_el',
+    'init_capacity_storage_el', 'inflow_conv_factor_storage_el',
+    'outflow_conv_factor_storage_el', 'nom_val_input_bel_storage_el',
+    'nom_val_output_bel_storage_el']
+
+
+def system_a_parameters(param_value):
+    r"""
+    Picks the parameters of the dispatch from the 'value' column of
+    parameter.csv.
+    """
+    return {name: float(param_value[name]) for name in SYSTEM_A_PARAMETERS}
+
+
+def system_a_variable_costs(param_value):
+    r"""
+    Variable costs per flow as in the objective of app_flexCHP.py.
+    """
+    return {
+        ('electricity', 'excess_bel'): param_value['var_costs_excess_bel'],
+        ('heat', 'excess_bth'): param_value['var_costs_excess_bth'],
+        ('shortage_bel', 'electricity'): param_value['var_costs_shortage_bel'],
+        ('shortage_bth', 'heat'): param_value['var_costs_shortage_bth'],
+        ('rgas', 'natural_gas'): param_value['var_costs_gas'],
+        ('CHP', 'electricity'): param_value['var_costs_chp_out_el'],
+        ('CHP', 'heat'): param_value['var_costs_chp_out_th'],
+        ('boiler', 'heat'): param_value['var_costs_boiler'],
+        ('P2H', 'heat'): param_value['var_costs_p2h_out_bth'],
+        ('heat', 'storage_th'): param_value['var_costs_input_bth_storage_th'],
+        ('storage_th', 'heat'): param_value['var_costs_output_bth_storage_th'],
+        ('electricity', 'storage_el'):
+            param_value['var_costs_input_bel_storage_el'],
+        ('storage_el', 'electricity'):
+            param_value['var_costs_output_bel_storage_el']}
+
+
+def dispatch_system_a(demand_th, demand_el, neg_residual, param):
+    r"""
+    Dispatches System A by merit order.
+
+    Parameters
+    ----------
+    demand_th, demand_el, neg_residual : array-like
+        Normalised profiles (columns of the demand profile), 1-dimensional
+        or time steps x scenarios. They are scaled with nom_val_demand_th,
+        nom_val_demand_el and nom_val_neg_residual.
+
+    param : dict
+        See :func:`system_a_parameters`. Values may be arrays with one
+        value per scenario.
+
+    Returns
+    -------
+    flows : dict
+        Arrays of the flows keyed by (label, label) and of the storage
+        contents keyed by (label, None).
+    """
+    p = {k: np.asarray(v, dtype=float) for k, v in param.items()}
+    demand_th = np.asarray(demand_th, dtype=float) * p['nom_val_demand_th']
+    demand_el = np.asarray(demand_el, dtype=float) * p['nom_val_demand_el']
+    residual = (np.asarray(neg_residual, dtype=float)
+                * p['nom_val_neg_residual'])
+    demand_th, demand_el, residual = np.broadcast_arrays(
+        demand_th, demand_el, residual)
+    shape = demand_th.shape
+
+    # everything without storage is vectorised over time
+    net_el = demand_el - residual
+    surplus_el = np.maximum(-net_el, 0)
+    deficit_el = np.maximum(net_el, 0)
+    p2h_el = np.minimum(surplus_el,
+                        p['nom_val_p2h_out_bth'] / p['conversion_factor_p2h'])
+    surplus_el = surplus_el - p2h_el
+    p2h_th = p2h_el * p['conversion_factor_p2h']
+    need_th = demand_th - p2h_th
+    spare_p2h = np.maximum(-need_th, 0)
+    need_th = np.maximum(need_th, 0)
+
+    (el_charge, el_discharge, el_content, th_charge, th_discharge,
+     th_content, chp_el, chp_th, boiler, shortage_el, shortage_th,
+     excess_el, excess_th) = (np.zeros(shape) for _ in range(13))
+
+    heat_to_power = p['conversion_factor_chp_bth'] / p['conversion_factor_chp_bel']
+    cap_el = p['nom_capacity_storage_el']
+    cap_th = p['nom_capacity_storage_th']
+    content_el = p['init_capacity_storage_el'] * cap_el
+    content_th = p['init_capacity_storage_th'] * cap_th
+
+    # the storages couple the time steps
+    for t in range(shape[0]):
+        # battery
+        content_el = content_el * (1 - p['capacity_loss_storage_el'])
+        charge = np.minimum.reduce(np.broadcast_arrays(
+            surplus_el[t], p['nom_val_input_bel_storage_el'],
+            (cap_el - content_el) / p['inflow_conv_factor_storage_el']))
+        discharge = np.minimum.reduce(np.broadcast_arrays(
+            deficit_el[t], p['nom_val_output_bel_storage_el'],
+            content_el * p['outflow_conv_factor_storage_el']))
+        content_el = (content_el + charge * p['inflow_conv_factor_storage_el']
+                      - discharge / p['outflow_conv_factor_storage_el'])
+        el_charge[t], el_discharge[t], el_content[t] = \
+            charge, discharge, content_el
+        excess_el[t] = surplus_el[t] - charge
+
+        # CHP is electricity-led
+        rest_el = deficit_el[t] - discharge
+        chp_el[t] = np.minimum(rest_el, p['nom_val_chp_out_el'])
+        shortage_el[t] = rest_el - chp_el[t]
+
+        # heat
+        chp_th_max = np.minimum(chp_el[t] * heat_to_power,
+                                p['nom_val_chp_out_th'])
+        chp_heat = np.minimum(need_th[t], chp_th_max)
+        rest_th = need_th[t] - chp_heat
+
+        content_th = content_th * (1 - p['capacity_loss_storage_th'])
+        discharge = np.minimum.reduce(np.broadcast_arrays(
+            rest_th, p['nom_val_output_bth_storage_th'],
+            content_th * p['outflow_conv_factor_storage_th']))
+        rest_th = rest_th - discharge
+        boiler[t] = np.minimum(rest_th, p['nom_val_out_boiler'])
+        shortage_th[t] = rest_th - boiler[t]
+
+        charge_max = np.minimum(
+            p['nom_val_input_bth_storage_th'],
+            (cap_th - content_th) / p['inflow_conv_factor_storage_th'])
+        charge_p2h = np.minimum(spare_p2h[t], charge_max)
+        charge_chp = np.minimum(chp_th_max - chp_heat, charge_max - charge_p2h)
+        content_th = (content_th + (charge_p2h + charge_chp)
+                      * p['inflow_conv_factor_storage_th']
+                      - discharge / p['outflow_conv_factor_storage_th'])
+        th_charge[t] = charge_p2h + charge_chp
+        th_discharge[t], th_content[t] = discharge, content_th
+        chp_th[t] = chp_heat + charge_chp
+        excess_th[t] = spare_p2h[t] - charge_p2h
+
+    loss_index = ((p['conv_factor_full_cond_chp'] - p['conversion_factor_chp_bel'])
+                  / p['conversion_factor_chp_bth'])
+    chp_gas = (chp_el + loss_index * chp_th) / p['conv_factor_full_cond_chp']
+    boiler_gas = boiler / p['conversion_factor_boiler']
+
+    return {
+        ('rgas', 'natural_gas'): chp_gas + boiler_gas,
+        ('natural_gas', 'CHP'): chp_gas,
+        ('natural_gas', 'boiler'): boiler_gas,
+        ('CHP', 'electricity'): chp_el,
+        ('CHP', 'heat'): chp_th,
+        ('boiler', 'heat'): boiler,
+        ('residual_el', 'electricity'): residual,
+        ('electricity', 'demand_el'): demand_el,
+        ('heat', 'demand_th'): demand_th,
+        ('electricity', 'P2H'): p2h_el,
+        ('P2H', 'heat'): p2h_th,
+        ('electricity', 'storage_el'): el_charge,
+        ('storage_el', 'electricity'): el_discharge,
+        ('storage_el', None): el_content,
+        ('heat', 'storage_th'): th_charge,
+        ('storage_th', 'heat'): th_discharge,
+        ('storage_th', None): th_content,
+        ('shortage_bel', 'electricity'): shortage_el,
+        ('shortage_bth', 'heat'): shortage_th,
+        ('electricity', 'excess_bel'): excess_el,
+        ('heat', 'excess_bth'): excess_th}
+
+
+def to_results(flows, timeindex, scenario=None):
+    r"""
+    Converts the flows of :func:`dispatch_system_a` into a results dict.
+
+    Parameters
+    ----------
+    scenario : int
+        Column of 2-dimensional flows to convert, required for them.
+    """
+    results = {}
+    for key, values in flows.items():
+        if values.ndim > 1:
+            if scenario is None:
+                raise ValueError('The flows have several scenarios, pass '
+                                 'the scenario to convert.')
+            values = values[:, scenario]
+        column = 'capacity' if key[1] is None else 'flow'
+        results[key] = {'scalars': pd.Series(),
+                        'sequences': pd.DataFrame({column: values},
+                                                  index=timeindex)}
+
+    return results
+
+
+def dispatch_costs(results, variable_costs):
+    r"""
+    Variable costs of a dispatch, i.e. the objective of the LP without
+    investment costs.
+
+    Parameters
+    ----------
+    results : dict
+        Results dict with nodes or labels as keys, or flows of
+        :func:`dispatch_system_a`.
+
+    variable_costs : dict
+        Costs per (label, label), see :func:`system_a_variable_costs`.
+
+    Returns
+    -------
+    costs : float or np.array
+        One value per scenario for 2-dimensional flows.
+    """
+    costs = 0
+    for key, values in results.items():
+        label = tuple(str(n) for n in key)
+        if label not in variable_costs:
+            continue
+        if isinstance(values, dict):
+            values = values['sequences']['flow'].values
+        costs = costs + variable_costs[label] * values.sum(axis=0)
+
+    return costs
+
+
+def compare_dispatch(heuristic, optimum, variable_costs=None):
+    r"""
+    Compares the summed flows of two results dicts, e.g. of the merit
+    order and of the LP.
+
+    Returns
+    -------
+    comparison : pd.DataFrame
+        Summed flows (and costs, if variable_costs are given) with the
+        columns 'heuristic', 'optimum', 'difference' and 'relative'.
+    """
+    def _sums(results):
+        return pd.Series({
+            tuple(str(n) for n in key): res['sequences']['flow'].sum()
+            for key, res in results.items()
+            if 'flow' in res['sequences']})
+
+    comparison = pd.DataFrame({'heuristic': _sums(heuristic),
+                               'optimum': _sums(optimum)})
+    if variable_costs is not None:
+        comparison.loc[('costs', 'variable'), :] = [
+            dispatch_costs(heuristic, variable_costs),
+            dispatch_costs(optimum, variable_costs)]
+    comparison['difference'] = comparison['heuristic'] - comparison['optimum']
+    comparison['relative'] = (comparison['difference']
+                              / comparison['optimum'].abs().replace(0, np.nan))
+
+    return comparison
@@ -0,0 +1,177 @@
+"""
+Modify a built solph.Model and solve it again.
+
+Building the energy system and the pyomo model often takes longer than
+solving it. For sweeps over nominal capacities, flow bounds or costs the
+model is built once and only the affected bounds and the objective are
+updated. The solver instance is kept between the solves. For solvers
+with a persistent interface (e.g. gurobi) the changes are passed to the
+solver incrementally and it starts from the last basis.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import logging
+
+from .solver import solver_options, is_mip
+
+
+class ModelModifier(object):
+    r"""
+    Changes nominal capacities, nominal values and costs of a built model.
+
+    Parameters
+    ----------
+    model : solph.Model
+        Built optimisation model.
+
+    solver : str
+        Name of the solver.
+
+    options : dict
+        Generic solver options, see :func:`solver.solver_options`.
+
+    tee : bool
+        Show solver output.
+
+    Examples
+    --------
+    >>> modifier = ModelModifier(model, solver='cbc')
+    >>> for capacity in [0, 250, 500]:
+    ...     modifier.set_storage_capacity('storage_th', capacity)
+    ...     modifier.solve()
+    """
+    def __init__(self, model, solver='cbc', options=None, tee=False):
+        from pyomo.opt import SolverFactory
+
+        self.model = model
+        self.tee = tee
+        self.persistent = False
+        self.opt = None
+        try:
+            opt = SolverFactory(solver + '_persistent')
+            if opt.available(exception_flag=False):
+                self.opt, self.persistent = opt, True
+        except Exception:
+            pass
+        if self.opt is None:
+            self.opt = SolverFactory(solver)
+        for key, value in solver_options(
+                solver, options, milp=is_mip(model)).items():
+            self.opt.options[key] = value
+
+        self._instance_set = False
+        self._changed_vars = []
+        self._objective_changed = False
+
+    def _node(self, label):
+        return self.model.es.groups[label] if isinstance(label, str) \
+            else label
+
+    def _flow(self, source, target):
+        source, target = self._node(source), self._node(target)
+        return source, target, self.model.flows[source, target]
+
+    def set_storage_capacity(self, storage, nominal_capacity):
+        r"""
+        Sets the nominal capacity of a GenericStorage without investment.
+        """
+        m = self.model
+        node = self._node(storage)
+        block = getattr(m, 'GenericStorageBlock', None)
+        if block is None or node not in block.STORAGES:
+            raise ValueError(f'{node} is not a storage with fixed capacity.')
+
+        node.nominal_capacity = nominal_capacity
+        for t in m.TIMESTEPS:
+            var = block.capacity[node, t]
+            var.setlb(nominal_capacity * node.capacity_min[t])
+            var.setub(nominal_capacity * node.capacity_max[t])
+            self._changed_vars.append(var)
+        if node.initial_capacity is not None:
+            var = block.capacity[node, m.TIMESTEPS[-1]]
+            var.fix(node.initial_capacity * nominal_capacity)
+
+    def set_nominal_value(self, source, target, nominal_value):
+        r"""
+        Sets the nominal value of a Flow without investment and updates the
+        bounds of the flow variables.
+        """
+        m = self.model
+        source, target, flow = self._flow(source, target)
+        if getattr(flow, 'investment', None) is not None:
+            raise ValueError(f'Flow {source}->{target} is an investment flow.')
+        if flow.summed_max is not None or flow.summed_min is not None:
+            logging.warning(f'summed_max/summed_min of {source}->{target} '
+                            'are not updated.')
+
+        flow.nominal_value = nominal_value
+        for t in m.TIMESTEPS:
+            var = m.flow[source, target, t]
+            if flow.fixed:
+                var.fix(flow.actual_value[t] * nominal_value)
+            else:
+                var.setlb(flow.min[t] * nominal_value)
+                var.setub(flow.max[t] * nominal_value)
+            self._changed_vars.append(var)
+
+    def set_variable_costs(self, source, target, variable_costs):
+        r"""
+        Sets the variable costs of a Flow (scalar or sequence).
+        """
+        from oemof.solph.plumbing import sequence
+
+        source, target, flow = self._flow(source, target)
+        flow.variable_costs = sequence(variable_costs)
+        self._objective_changed = True
+
+    def _update_objective(self):
+        import pyomo.environ as po
+
+        m = self.model
+        sense = m.objective.sense
+        m.del_component('objective')
+        expr = 0
+        for block in m.component_data_objects():
+            if hasattr(block, '_objective_expression'):
+                expr += block._objective_expression()
+        m.objective = po.Objective(sense=sense, expr=expr)
+
+    def solve(self):
+        r"""
+        Solves the model with the current modifications.
+
+        Returns
+        -------
+        solver_results : pyomo results object
+        """
+        m = self.model
+        if self._objective_changed:
+            self._update_objective()
+
+        if self.persistent:
+            if not self._instance_set:
+                self.opt.set_instance(m)
+                self._instance_set = True
+            else:
+                for var in self._changed_vars:
+                    self.opt.update_var(var)
+                if self._objective_changed:
+                    self.opt.set_objective(m.objective)
+            results = self.opt.solve(tee=self.tee)
+        else:
+            results = self.opt.solve(m, tee=self.tee)
+
+        self._changed_vars = []
+        self._objective_changed = False
+
+        termination_condition = \
+            results['Solver'][0]['Termination condition'].key
+        if termination_condition != 'optimal':
+            logging.warning(f'Termination condition: {termination_condition}')
+        m.es.results = results
+        m.solver_results = results
+
+        return results
@@ -0,0 +1,214 @@
+"""
+Headless batch plotting.
+
+Figures are described as jobs (file name, plot function, data, keyword
+arguments). The plot function draws the data and returns the figure. The
+jobs are rendered in worker processes with the Agg backend and written
+to disk. A hash of function, data and arguments is stored per file in
+.plot_hashes.json of the plot directory; figures whose hash has not
+changed are skipped.
+
+Long time series are downsampled to the width of the axes before
+drawing (see :func:`downsample`), which keeps the peaks but draws at most
+two points per pixel.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import hashlib
+import inspect
+import json
+import logging
+import multiprocessing
+import os
+
+
+HASH_FILE = '.plot_hashes.json'
+
+
+def _update_hash(sha, data):
+    import pandas as pd
+
+    if isinstance(data, (pd.Series, pd.DataFrame)):
+        sha.update(repr(data.columns if isinstance(data, pd.DataFrame)
+                        else data.name).encode())
+        sha.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    elif isinstance(data, dict):
+        for key in sorted(data, key=repr):
+            sha.update(repr(key).encode())
+            _update_hash(sha, data[key])
+    elif isinstance(data, (list, tuple)):
+        for item in data:
+            _update_hash(sha, item)
+    else:
+        sha.update(repr(data).encode())
+
+
+def data_hash(function, data, kwargs=None):
+    r"""
+    Hash of a plot function (name and source), its data (pandas objects,
+    dicts, lists or values) and keyword arguments.
+    """
+    sha = hashlib.sha1()
+    sha.update('{0}.{1}'.format(function.__module__,
+                                function.__qualname__).encode())
+    # an edited plot function renders its figures again
+    try:
+        sha.update(inspect.getsource(function).encode())
+    except (OSError, TypeError):
+        code = function.__code__
+        sha.update(code.co_code)
+        sha.update(repr([c for c in code.co_consts
+                         if not inspect.iscode(c)]).encode())
+    _update_hash(sha, data)
+    _update_hash(sha, kwargs or {})
+    return sha.hexdigest()
+
+
+def downsample(data, points, total=False):
+    r"""
+    Peak-preserving downsampling: the time steps with the minimum and the
+    maximum of every column per bucket of time steps.
+
+    Whole time steps are kept, in time order, so the columns of a
+    downsampled frame belong together (e.g. the flows of a bus).
+
+    Parameters
+    ----------
+    data : pd.Series or pd.DataFrame
+        Numeric time series.
+
+    points : int
+        Maximum number of points. Data with fewer time steps is returned
+        unchanged.
+
+    total : bool
+        Keep the extremes of the sum of the columns instead of those of
+        every column, for stacked plots.
+
+    Returns
+    -------
+    downsampled : pd.Series or pd.DataFrame
+        Time steps of the data with the extremes of every bucket.
+    """
+    import numpy as np
+    import pandas as pd
+
+    steps = len(data)
+    if points < 2 or steps <= points:
+        return data
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    values = frame.values.astype(float)
+    if total:
+        values = values.sum(axis=1, keepdims=True)
+    columns = values.shape[1]
+
+    # two time steps per column and bucket
+    buckets = max(points // (2 * columns), 1)
+    size = int(np.ceil(steps / buckets))
+    buckets = int(np.ceil(steps / size))
+    padded = np.full((buckets * size, columns), np.nan)
+    padded[:steps] = values
+    padded = padded.reshape(buckets, size, columns)
+    first = (np.arange(buckets) * size)[:, None]
+    positions = np.concatenate([first + np.nanargmin(padded, axis=1),
+                                first + np.nanargmax(padded, axis=1)], axis=1)
+
+    return data.iloc[np.unique(positions)]
+
+
+def axes_points(ax):
+    r"""
+    Number of points worth drawing into an axes: two per pixel of its
+    width.
+    """
+    return 2 * int(ax.get_window_extent().width)
+
+
+def plot_series(ax, data, **kwargs):
+    r"""
+    Plots time series downsampled to the width of the axes.
+    """
+    return ax.plot(downsample(data, axes_points(ax)), **kwargs)
+
+
+def _render(job):
+    import matplotlib.pyplot as plt
+
+    path, function, data, kwargs = job
+    try:
+        plt.switch_backend('Agg')
+        fig = function(data, **kwargs)
+        fig.savefig(path)
+        plt.close(fig)
+    except Exception as e:
+        return path, f'{type(e).__name__}: {e}'
+    return path, None
+
+
+def render_figures(jobs, plot_dir, processes=None, force=False):
+    r"""
+    Renders figures in worker processes and saves them.
+
+    Parameters
+    ----------
+    jobs : list
+        Tuples (file name, function, data) or (file name, function, data,
+        kwargs). function(data, \*\*kwargs) returns a matplotlib figure.
+
+    plot_dir : str
+        Directory of the figures.
+
+    processes : int
+        Number of worker processes. None uses all CPUs.
+
+    force : bool
+        Render all figures, even if their data has not changed.
+
+    Returns
+    -------
+    status : dict
+        'rendered', 'unchanged' or the error per file name.
+    """
+    if not os.path.exists(plot_dir):
+        os.makedirs(plot_dir)
+    hash_file = os.path.join(plot_dir, HASH_FILE)
+    hashes = {}
+    if os.path.isfile(hash_file):
+        with open(hash_file) as f:
+            hashes = json.load(f)
+
+    status, todo, new_hashes = {}, [], {}
+    for job in jobs:
+        filename, function, data = job[:3]
+        kwargs = job[3] if len(job) > 3 else {}
+        path = os.path.join(plot_dir, filename)
+        new_hashes[filename] = data_hash(function, data, kwargs)
+        if not force and os.path.isfile(path) \
+                and hashes.get(filename) == new_hashes[filename]:
+            status[filename] = 'unchanged'
+            continue
+        todo.append((path, function, data, kwargs))
+    logging.info(f'Render {len(todo)} figures, {len(status)} unchanged')
+
+    if todo:
+        context = multiprocessing.get_context(
+            'fork' if hasattr(os, 'fork') else 'spawn')
+        with context.Pool(min(processes or os.cpu_count() or 1,
+                              len(todo))) as pool:
+            for path, error in pool.imap_unordered(_render, todo):
+                filename = os.path.basename(path)
+                if error is None:
+                    status[filename] = 'rendered'
+                    hashes[filename] = new_hashes[filename]
+                else:
+                    logging.warning(f'Figure {filename} failed: {error}')
+                    status[filename] = error
+                    hashes.pop(filename, None)
+
+        with open(hash_file, 'w') as f:
+            json.dump(hashes, f, indent=1, sort_keys=True)
+
+    return status
@@ -0,0 +1,280 @@
+"""
+Race several locally installed solvers on the same model.
+
+The model is written to an lp-file once. Every solver solves this file in
+its own process, the first optimal solution is loaded back into the model
+and the remaining solvers are terminated. The winner of every race is
+appended to a history file, which :func:`best_solver` uses to pick the
+solver for a model class without racing. If no solver is optimal, a
+feasible solution (e.g. at a time limit) is used, but not logged as a win.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import csv
+import datetime
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+import signal
+import tempfile
+import time
+
+from .solver import solver_options, is_mip
+
+
+RACE_SOLVERS = ['cbc', 'glpk', 'highs']
+
+RACE_LOG = os.path.join(os.path.expanduser('~'), '.oemof', 'solver_races.csv')
+
+RACE_LOG_COLUMNS = ['timestamp', 'label', 'model_class', 'variables',
+                    'constraints', 'winner', 'runtime', 'solvers']
+
+# termination conditions of a solver that stopped early with a feasible
+# solution
+FEASIBLE_CONDITIONS = ['feasible', 'maxTimeLimit', 'maxIterations',
+                       'maxEvaluations', 'intermediateNonInteger',
+                       'userInterrupt', 'resourceInterrupt']
+
+
+def available_solvers(solvers=None):
+    r"""
+    Returns the solvers of the list that are installed on this machine.
+    """
+    from pyomo.opt import SolverFactory
+
+    solvers = RACE_SOLVERS if solvers is None else solvers
+    installed = []
+    for solver in solvers:
+        try:
+            if SolverFactory(solver).available(exception_flag=False):
+                installed.append(solver)
+        except Exception:
+            pass
+
+    return installed
+
+
+def _race_worker(solver, lp_file, cmdline_options, tee, result_queue):
+    # own process group, so that the solver executable is terminated too
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+
+    from pyomo.opt import SolverFactory
+
+    start = time.time()
+    try:
+        opt = SolverFactory(solver)
+        for key, value in cmdline_options.items():
+            opt.options[key] = value
+        results = opt.solve(lp_file, tee=tee)
+        status = results['Solver'][0]['Status'].key
+        termination_condition = \
+            results['Solver'][0]['Termination condition'].key
+        # only results with a solution can be loaded into the model
+        results = pickle.dumps(results) if len(results.solution) else None
+    except Exception as e:
+        logging.warning(f'Solver {solver} failed: {e}')
+        status, termination_condition, results = 'error', str(e), None
+
+    result_queue.put((solver, status, termination_condition,
+                      time.time() - start, results))
+
+
+def _terminate(process):
+    if not process.is_alive():
+        return
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except (AttributeError, ProcessLookupError, PermissionError):
+        process.terminate()
+
+
+def race_solvers(model, solvers=None, options=None, label=None,
+                 race_log=RACE_LOG, timeout=None, tee=False):
+    r"""
+    Solves a built solph.Model with several solvers in parallel and keeps
+    the first optimal solution.
+
+    Parameters
+    ----------
+    model : solph.Model
+        Built optimisation model.
+
+    solvers : list
+        Solvers to race. Solvers that are not installed are skipped.
+        Defaults to RACE_SOLVERS.
+
+    options : dict
+        Generic solver options, see :func:`solver.solver_options`.
+
+    label : str
+        Name of the model, written to the race log.
+
+    race_log : path
+        csv-file the result of the race is appended to. None disables
+        the log.
+
+    timeout : float
+        Seconds after which the race is stopped.
+
+    tee : bool
+        Show the output of the solvers.
+
+    Returns
+    -------
+    solver_results : pyomo results object
+        Results of the winning solver, or of a solver with a feasible
+        solution if none is optimal. Its name is stored in
+        ``solver_results.solver.name``.
+    """
+    solvers = available_solvers(solvers)
+    if not solvers:
+        raise ValueError('None of the solvers to race is installed.')
+
+    milp = is_mip(model)
+    tmp_dir = tempfile.mkdtemp(prefix='solver_race_')
+    lp_file = os.path.join(tmp_dir, 'model.lp')
+    lp_file, smap_id = model.write(
+        lp_file, io_options={'symbolic_solver_labels': False})
+
+    context = multiprocessing.get_context(
+        'fork' if hasattr(os, 'fork') else 'spawn')
+    result_queue = context.Queue()
+    processes = {}
+    for solver in solvers:
+        process = context.Process(
+            target=_race_worker,
+            args=(solver, lp_file, solver_options(solver, options, milp=milp),
+                  tee, result_queue))
+        process.start()
+        processes[solver] = process
+    logging.info(f'Race {", ".join(solvers)} on {lp_file}')
+
+    start = time.time()
+    winner, fallback, finished = None, None, 0
+    try:
+        while winner is None and finished < len(processes):
+            if timeout is not None and time.time() - start > timeout:
+                logging.warning(f'Solver race stopped after {timeout} s.')
+                break
+            try:
+                result = result_queue.get(timeout=1)
+            except queue.Empty:
+                if not any(p.is_alive() for p in processes.values()) \
+                        and result_queue.empty():
+                    break
+                continue
+            finished += 1
+            solver, status, termination_condition, runtime, _ = result
+            logging.info(f'{solver} finished after {runtime:.1f} s with '
+                         f'status {status}, {termination_condition}')
+            if status == 'ok' and termination_condition == 'optimal' \
+                    and result[4] is not None:
+                winner = result
+            elif result[4] is not None and fallback is None \
+                    and termination_condition in FEASIBLE_CONDITIONS:
+                fallback = result
+    finally:
+        for process in processes.values():
+            _terminate(process)
+        for process in processes.values():
+            process.join()
+        try:
+            os.remove(lp_file)
+            os.rmdir(tmp_dir)
+        except OSError:
+            pass
+
+    optimal = winner is not None
+    if not optimal:
+        if fallback is None:
+            raise RuntimeError('No solver of the race returned a feasible '
+                               'solution.')
+        logging.warning('No solver of the race found an optimal solution. '
+                        f'Using the feasible solution of {fallback[0]} '
+                        f'({fallback[2]}).')
+        winner = fallback
+
+    solver, _, _, runtime, results = winner
+    results = pickle.loads(results)
+    results._smap_id = smap_id
+    model.solutions.load_from(results)
+    model.solutions.delete_symbol_map(smap_id)
+    results.solver.name = solver
+    model.es.results = results
+    model.solver_results = results
+    if not optimal:
+        return results
+    logging.info(f'{solver} won the solver race after {runtime:.1f} s.')
+
+    if race_log is not None:
+        write_race_log(race_log, label=label,
+                       model_class='milp' if milp else 'lp',
+                       variables=model.nvariables(),
+                       constraints=model.nconstraints(),
+                       winner=solver, runtime=runtime, solvers=solvers)
+
+    return results
+
+
+def write_race_log(race_log, **record):
+    r"""
+    Appends the result of a race to the race log.
+    """
+    record['timestamp'] = datetime.datetime.now().isoformat(timespec='seconds')
+    record['solvers'] = ' '.join(record.get('solvers', []))
+    os.makedirs(os.path.dirname(os.path.abspath(race_log)), exist_ok=True)
+    new_file = not os.path.exists(race_log)
+    with open(race_log, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RACE_LOG_COLUMNS)
+        if new_file:
+            writer.writeheader()
+        writer.writerow(record)
+
+
+def best_solver(model_class, label=None, race_log=RACE_LOG, default='cbc'):
+    r"""
+    Picks the solver that won most races for a model class.
+
+    Races of the same model (label) are preferred over races of other
+    models of the same class.
+
+    Parameters
+    ----------
+    model_class : str
+        'lp' or 'milp'.
+
+    label : str
+        Name of the model.
+
+    race_log : path
+        csv-file written by :func:`race_solvers`.
+
+    default : str
+        Solver returned if there is no record of the model class.
+
+    Returns
+    -------
+    solver : str
+    """
+    if race_log is None or not os.path.exists(race_log):
+        return default
+
+    with open(race_log, newline='') as f:
+        records = [row for row in csv.DictReader(f)
+                   if row['model_class'] == model_class]
+    if label is not None and any(row['label'] == label for row in records):
+        records = [row for row in records if row['label'] == label]
+    if not records:
+        return default
+
+    wins = {}
+    for row in records:
+        wins[row['winner']] = wins.get(row['winner'], 0) + 1
+
+    return max(wins, key=wins.get)
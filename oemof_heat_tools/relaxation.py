@@ -0,0 +1,154 @@
+"""
+LP relaxation quick-look for mixed-integer models.
+
+Models with e.g. GenericCHP or a Flow with min > 0 and investment contain
+binary variables. Their LP relaxation is solved in a fraction of the time
+and gives a lower bound of the objective together with a relaxed
+dispatch and relaxed capacities, which is often enough to screen a
+scenario.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import logging
+
+from .solver import solve_model
+
+
+def relax_integrality(model):
+    r"""
+    Replaces the domain of all binary and integer variables by the reals.
+
+    Returns
+    -------
+    saved : list
+        (variable, domain, lb, ub) of the relaxed variables, to be passed
+        to :func:`restore_integrality`.
+    """
+    import pyomo.environ as po
+
+    saved = []
+    for var in model.component_data_objects(po.Var, active=True):
+        if not (var.is_binary() or var.is_integer()):
+            continue
+        saved.append((var, var.domain, var.lb, var.ub))
+        lb, ub = var.lb, var.ub
+        binary = var.is_binary()
+        var.domain = po.Reals
+        if binary:
+            lb, ub = (0 if lb is None else lb), (1 if ub is None else ub)
+        var.setlb(lb)
+        var.setub(ub)
+
+    return saved
+
+
+def restore_integrality(model, saved):
+    r"""
+    Restores the domains changed by :func:`relax_integrality`.
+    """
+    for var, domain, lb, ub in saved:
+        var.domain = domain
+        var.setlb(lb)
+        var.setub(ub)
+
+
+def solve_relaxation(model, solver='cbc', options=None, tee=False):
+    r"""
+    Solves the LP relaxation of a model. The integrality of the model is
+    restored afterwards.
+
+    Returns
+    -------
+    relaxation : dict
+        'objective': objective of the relaxation (a lower bound of the
+        MILP), 'main': results dict of the relaxed solution,
+        'relaxed_variables': number of relaxed variables.
+    """
+    import oemof.outputlib as outputlib
+
+    saved = relax_integrality(model)
+    logging.info(f'Solve LP relaxation ({len(saved)} integer variables)')
+    try:
+        solve_model(model, solver=solver, options=options, tee=tee)
+        relaxation = {'objective': model.objective(),
+                      'main': outputlib.processing.results(model),
+                      'relaxed_variables': len(saved)}
+    finally:
+        restore_integrality(model, saved)
+
+    logging.info('LP relaxation: objective bound {0:.2f}'.format(
+        relaxation['objective']))
+
+    return relaxation
+
+
+def relaxation_summary(relaxation):
+    r"""
+    Summed flows and investments of a relaxed solution.
+
+    Returns
+    -------
+    summary : pd.Series
+        Indexed by ((label, label), 'flow' or 'invest').
+    """
+    import pandas as pd
+
+    summary = {}
+    for (n1, n2), res in relaxation['main'].items():
+        key = (str(n1), str(n2))
+        sequences = res.get('sequences')
+        if sequences is not None and 'flow' in sequences:
+            summary[(key, 'flow')] = sequences['flow'].sum()
+        scalars = res.get('scalars')
+        if scalars is not None and 'invest' in scalars:
+            summary[(key, 'invest')] = scalars['invest']
+    summary[(('objective', 'bound'), 'relaxation')] = relaxation['objective']
+
+    return pd.Series(summary)
+
+
+def solve_quick_look(model, solver='cbc', options=None, tee=False,
+                     skip_milp=None):
+    r"""
+    Solves the LP relaxation first and then, unless skipped, the MILP.
+
+    Parameters
+    ----------
+    model : solph.Model
+        Built optimisation model.
+
+    skip_milp : callable
+        Called with the relaxation dict; if it returns True the MILP is
+        not solved. None always solves the MILP.
+
+    Returns
+    -------
+    relaxation : dict
+        See :func:`solve_relaxation`. If the MILP was solved, 'gap' holds
+        the relative gap between relaxation and MILP.
+
+    solved : bool
+        True if the model holds the exact solution, i.e. the MILP was
+        solved or the model is an LP.
+    """
+    relaxation = solve_relaxation(model, solver=solver, options=options,
+                                  tee=tee)
+    if not relaxation['relaxed_variables']:
+        logging.info('Model is an LP, the relaxation is the solution.')
+        return relaxation, True
+
+    if skip_milp is not None and skip_milp(relaxation):
+        logging.info('Skip the MILP, keep the LP relaxation.')
+        return relaxation, False
+
+    solve_model(model, solver=solver, options=options, tee=tee)
+    objective = model.objective()
+    if objective:
+        relaxation['gap'] = (objective - relaxation['objective']) / abs(objective)
+        logging.info('MILP objective {0:.2f}, gap to relaxation {1:.2%}'.format(
+            objective, relaxation['gap']))
+
+    return relaxation, True
@@ -0,0 +1,112 @@
+"""
+Temporal resolution of the models.
+
+All input time series are hourly. They are resampled to the resolution
+of a run, e.g. '15min', 'H', '2H' or 'D':
+
+* 'mean' for powers and relative profiles (demand, residual load, solar
+  gain, temperature): the mean over coarser steps, constant values
+  within finer steps. Powers times the length of the time step (the
+  timeincrement of solph) keep the energy of the hourly series.
+* 'sum' for energies per time step: summed for coarser steps and split
+  evenly into finer steps.
+
+Parameters per time step have to be scaled as well, e.g. the capacity
+loss of storages (see :func:`scale_capacity_loss`) and gradients
+(see :func:`scale_gradient`).
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import pandas as pd
+
+
+RESOLUTIONS = ['15min', 'H', '2H', 'D']
+
+
+def _freq(resolution):
+    # newer pandas versions only know 'h' for hours
+    try:
+        pd.tseries.frequencies.to_offset(resolution)
+    except ValueError:
+        return resolution.replace('H', 'h')
+    return resolution
+
+
+def hours_per_step(resolution):
+    r"""
+    Length of a time step in hours, e.g. 0.25 for '15min'.
+    """
+    start = pd.Timestamp('2017-01-01')
+    offset = pd.tseries.frequencies.to_offset(_freq(resolution))
+    return (start + offset - start) / pd.Timedelta(hours=1)
+
+
+def create_timeindex(start, hours, resolution='H'):
+    r"""
+    Time index covering the given number of hours at a resolution.
+    """
+    return pd.date_range(start, periods=int(round(hours / hours_per_step(resolution))),
+                         freq=_freq(resolution))
+
+
+def resample(data, resolution='H', kind='mean', start='1/1/2017'):
+    r"""
+    Resamples hourly time series.
+
+    Parameters
+    ----------
+    data : pd.Series or pd.DataFrame
+        Hourly time series. Without a DatetimeIndex, hourly steps from
+        start are assumed. Non-numeric columns are dropped.
+
+    resolution : str
+        Target resolution, e.g. '15min', 'H', '2H' or 'D'.
+
+    kind : str
+        'mean' for powers and relative profiles, 'sum' for energies per
+        time step.
+
+    Returns
+    -------
+    resampled : pd.Series or pd.DataFrame
+        With a DatetimeIndex at the target resolution.
+    """
+    if kind not in ('mean', 'sum'):
+        raise ValueError(f'Unknown kind {kind}.')
+    if isinstance(data, pd.DataFrame):
+        data = data.select_dtypes('number')
+    if not isinstance(data.index, pd.DatetimeIndex):
+        data = data.copy()
+        data.index = pd.date_range(start, periods=len(data), freq=_freq('H'))
+
+    hours = hours_per_step(resolution)
+    if hours == 1:
+        return data
+    if hours > 1:
+        resampled = data.resample(_freq(resolution))
+        return resampled.mean() if kind == 'mean' else resampled.sum()
+
+    # finer steps: every hour is split into 1 / hours steps
+    index = pd.date_range(data.index[0], periods=int(round(len(data) / hours)),
+                          freq=_freq(resolution))
+    resampled = data.reindex(index, method='ffill')
+    return resampled if kind == 'mean' else resampled * hours
+
+
+def scale_capacity_loss(capacity_loss, resolution='H'):
+    r"""
+    Converts the relative capacity loss of a storage per hour into the
+    loss per time step.
+    """
+    return 1 - (1 - capacity_loss) ** hours_per_step(resolution)
+
+
+def scale_gradient(gradient, resolution='H'):
+    r"""
+    Converts a gradient (relative to the nominal value) per hour into the
+    gradient per time step.
+    """
+    return min(gradient * hours_per_step(resolution), 1)
@@ -0,0 +1,131 @@
+"""
+Indexed access to the results of a run.
+
+outputlib.views.node converts the keys of the whole results dict to
+strings and concatenates the frames of the node on every call.
+:class:`Results` builds one sequences frame (columns from, to, type) and
+one scalars series (index from, to, type) per results dict and answers
+the queries of the postprocessing from them:
+
+* ``res.node('thermal')`` like ``outputlib.views.node(results, 'thermal')``
+* ``res[('boiler', 'thermal')]`` like
+  ``outputlib.views.convert_keys_to_strings(results)[('boiler', 'thermal')]``
+* ``res.flow('boiler', 'thermal')`` the flow as a Series
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import numpy as np
+import pandas as pd
+
+
+class Results:
+    r"""
+    Sequences and scalars of a results dict (main or param) in one frame
+    and one series.
+
+    Parameters
+    ----------
+    results : dict
+        Results of outputlib.processing.results or parameter_as_dict, keys
+        as nodes or strings.
+
+    Attributes
+    ----------
+    sequences : pd.DataFrame
+        Columns (from, to, type), e.g. ('boiler', 'thermal', 'flow').
+
+    scalars : pd.Series
+        Index (from, to, type), e.g. ('storage_cool', 'None', 'invest').
+    """
+    def __init__(self, results):
+        sequences, scalars = {}, {}
+        for (n1, n2), res in results.items():
+            key = (str(n1), str(n2))
+            for name, sequence in res['sequences'].items():
+                sequences[key + (name,)] = sequence
+            for name, value in res['scalars'].items():
+                scalars[key + (name,)] = value
+
+        names = ['from', 'to', 'type']
+        self.sequences = pd.concat(sequences, axis=1, names=names) \
+            if sequences else pd.DataFrame(
+                columns=pd.MultiIndex.from_tuples([], names=names))
+        self.sequences.sort_index(axis=1, inplace=True)
+        self.scalars = pd.Series(
+            list(scalars.values()), dtype=object,
+            index=pd.MultiIndex.from_tuples(list(scalars) or [], names=names))
+        self.scalars = self.scalars.infer_objects().sort_index()
+
+    @classmethod
+    def from_energysystem(cls, energysystem, key='main'):
+        r"""
+        Results of a (restored) energy system, key 'main' or 'param'.
+        """
+        return cls(energysystem.results[key])
+
+    @staticmethod
+    def _select(index, n1=None, n2=None):
+        mask = np.ones(len(index), dtype=bool)
+        if n1 is not None:
+            mask &= index.get_level_values('from') == n1
+        if n2 is not None:
+            mask &= index.get_level_values('to') == n2
+        return mask
+
+    def keys(self):
+        r"""
+        (from, to) of all flows and nodes with results.
+        """
+        return sorted(set(self.sequences.columns.droplevel('type'))
+                      | set(self.scalars.index.droplevel('type')))
+
+    def items(self):
+        for key in self.keys():
+            yield key, self[key]
+
+    def __contains__(self, key):
+        return tuple(key) in self.keys()
+
+    def __getitem__(self, key):
+        n1, n2 = key
+        seq_mask = self._select(self.sequences.columns, n1, n2)
+        scal_mask = self._select(self.scalars.index, n1, n2)
+        if not (seq_mask.any() or scal_mask.any()):
+            raise KeyError(key)
+        sequences = self.sequences.loc[:, seq_mask]
+        sequences.columns = sequences.columns.get_level_values('type')
+        scalars = self.scalars[scal_mask]
+        scalars.index = scalars.index.get_level_values('type')
+
+        return {'sequences': sequences, 'scalars': scalars}
+
+    def flow(self, n1, n2, name='flow'):
+        r"""
+        Sequence of a flow (or 'capacity' of a storage with n2='None').
+        """
+        return self.sequences[(n1, n2, name)]
+
+    def node(self, label):
+        r"""
+        Sequences and scalars of all flows from or to a node, in the format
+        of outputlib.views.node (keys ((from, to), type)).
+        """
+        filtered = {}
+        mask = self._select(self.scalars.index, n1=label) \
+            | self._select(self.scalars.index, n2=label)
+        if mask.any():
+            scalars = self.scalars[mask]
+            scalars.index = [((n1, n2), name) for n1, n2, name in scalars.index]
+            filtered['scalars'] = scalars
+        mask = self._select(self.sequences.columns, n1=label) \
+            | self._select(self.sequences.columns, n2=label)
+        if mask.any():
+            sequences = self.sequences.loc[:, mask]
+            sequences.columns = [((n1, n2), name)
+                                 for n1, n2, name in sequences.columns]
+            filtered['sequences'] = sequences
+
+        return filtered
@@ -0,0 +1,163 @@
+"""
+Runtime estimates for the jobs of a sweep.
+
+The solve times of the scenarios differ a lot, e.g. MILP variants
+(GenericCHP, Desal with min=0.5) and pure LP dispatch. Workers take the
+jobs with the longest estimated runtime first, so that no worker is left
+with a long job at the end of the sweep. The runtime of a job is
+estimated from the runtimes of earlier jobs of the same model per time
+step (runtime log), or from :data:`SECONDS_PER_STEP` if there are none.
+The workers log the model class of a job as found by
+:func:`solver.is_mip` when it is solved, the coordinator takes it from
+the log unless it is given. The runtime log of a SQLite queue lies next
+to the queue file, so coordinator and workers share it (see
+:func:`runtime_log_path`). :func:`runtime_report` compares estimated and
+actual runtimes of a queue.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import csv
+import datetime
+import os
+import statistics
+
+
+RUNTIME_LOG = os.path.join(os.path.expanduser('~'), '.oemof', 'job_runtimes.csv')
+
+RUNTIME_LOG_COLUMNS = ['timestamp', 'key', 'label', 'model_class', 'size',
+                       'predicted', 'runtime']
+
+# rough runtime per time step without history
+SECONDS_PER_STEP = {'lp': 0.01, 'milp': 0.1}
+
+
+def job_features(label, size, model_class=None):
+    r"""
+    Features of a job used for the estimate.
+
+    Parameters
+    ----------
+    label : str
+        Name of the model, e.g. 'oman_thermal'.
+
+    size : int
+        Number of time steps (or another measure of the model size).
+
+    model_class : str
+        'lp' or 'milp', default the class logged for the label by the
+        workers, else 'lp'.
+    """
+    return {'label': label, 'size': size, 'model_class': model_class}
+
+
+def runtime_log_path(queue):
+    r"""
+    Runtime log next to the file of a SQLite queue, RUNTIME_LOG for other
+    queues.
+    """
+    path = getattr(queue, 'path', None)
+    if path is None:
+        return RUNTIME_LOG
+    return os.path.join(os.path.dirname(path), 'job_runtimes.csv')
+
+
+def read_runtime_log(runtime_log=RUNTIME_LOG):
+    if not os.path.exists(runtime_log):
+        return []
+    with open(runtime_log, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def write_runtime_log(runtime_log=RUNTIME_LOG, **record):
+    r"""
+    Appends the runtime of a job to the runtime log.
+    """
+    record['timestamp'] = datetime.datetime.now().isoformat(timespec='seconds')
+    os.makedirs(os.path.dirname(os.path.abspath(runtime_log)), exist_ok=True)
+    new_file = not os.path.exists(runtime_log)
+    with open(runtime_log, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=RUNTIME_LOG_COLUMNS,
+                                extrasaction='ignore')
+        if new_file:
+            writer.writeheader()
+        writer.writerow(record)
+
+
+def estimate_runtime(features, history=None):
+    r"""
+    Estimated runtime of a job in seconds.
+
+    The median runtime per size of earlier jobs of the same label and model
+    class is used, else of the same model class, else
+    :data:`SECONDS_PER_STEP`. Without a model class the last one logged
+    for the label is used, else 'lp'.
+
+    Parameters
+    ----------
+    features : dict
+        See :func:`job_features`.
+
+    history : list
+        Records of the runtime log, default read from RUNTIME_LOG.
+    """
+    history = read_runtime_log() if history is None else history
+    size = max(float(features['size']), 1)
+    model_class = features.get('model_class')
+    if model_class is None:
+        logged = [r['model_class'] for r in history
+                  if r['label'] == features['label'] and r['model_class']]
+        model_class = logged[-1] if logged else 'lp'
+
+    records = [r for r in history if r['model_class'] == model_class
+               and float(r['size']) > 0 and r['runtime'] not in ('', None)]
+    same_label = [r for r in records if r['label'] == features['label']]
+    for matches in [same_label, records]:
+        if matches:
+            return size * statistics.median(
+                float(r['runtime']) / float(r['size']) for r in matches)
+
+    return size * SECONDS_PER_STEP.get(model_class, SECONDS_PER_STEP['milp'])
+
+
+def longest_first(jobs, history=None):
+    r"""
+    Sorts (key, payload) pairs by estimated runtime, longest first, and
+    writes the estimate to payload['predicted'].
+    """
+    history = read_runtime_log() if history is None else history
+    for _, payload in jobs:
+        if 'features' in payload:
+            payload['predicted'] = estimate_runtime(payload['features'],
+                                                    history)
+
+    return sorted(jobs, key=lambda job: -job[1].get('predicted', 0))
+
+
+def runtime_report(queue):
+    r"""
+    Estimated and actual runtimes of the finished jobs of a queue.
+
+    Returns
+    -------
+    report : pd.DataFrame
+        Index key, columns worker, status, predicted, runtime and ratio
+        (runtime / predicted).
+    """
+    import pandas as pd
+
+    rows = []
+    for job in queue.jobs():
+        if job['finished'] is None or job['started'] is None:
+            continue
+        rows.append({'key': job['key'], 'worker': job['worker'],
+                     'status': job['status'],
+                     'predicted': job['payload'].get('predicted'),
+                     'runtime': job['finished'] - job['started']})
+    report = pd.DataFrame(rows, columns=['key', 'worker', 'status',
+                                         'predicted', 'runtime'])
+    report['ratio'] = report['runtime'] / report['predicted']
+
+    return report.set_index('key')
@@ -0,0 +1,251 @@
+"""
+Solver option profiles for the models of oemof_heat.
+
+Options are given with generic names and translated to the names the
+respective solver understands before they are passed to
+``solph.Model.solve`` as ``cmdline_options``:
+
+* ``mip_gap``: relative gap at which a MILP is accepted as solved
+* ``time_limit``: wall-clock limit in seconds
+* ``threads``: number of threads the solver may use
+* ``presolve``: switch the presolver on (True) or off (False)
+
+Keys without a generic name are passed to the solver unchanged.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import contextlib
+import contextvars
+import logging
+
+
+# list collecting the model classes of the solved models, set by
+# record_model_classes
+_model_classes = contextvars.ContextVar('model_classes', default=None)
+
+OPTION_NAMES = {
+    'cbc': {'mip_gap': 'ratioGap', 'time_limit': 'sec',
+            'threads': 'threads', 'presolve': 'presolve'},
+    'glpk': {'mip_gap': 'mipgap', 'time_limit': 'tmlim'},
+    'gurobi': {'mip_gap': 'MIPGap', 'time_limit': 'TimeLimit',
+               'threads': 'Threads', 'presolve': 'Presolve'},
+    'highs': {'mip_gap': 'mip_rel_gap', 'time_limit': 'time_limit',
+              'threads': 'threads', 'presolve': 'presolve'},
+}
+
+PRESOLVE_VALUES = {
+    'cbc': {True: 'on', False: 'off'},
+    'glpk': {True: True, False: False},
+    'gurobi': {True: -1, False: 0},
+    'highs': {True: 'on', False: 'off'},
+}
+
+# Defaults per solver for pure LP and mixed-integer models (e.g. with
+# GenericCHP or a Flow with min > 0 and investment).
+DEFAULT_PROFILES = {
+    'cbc': {'lp': {'presolve': True},
+            'milp': {'presolve': True, 'mip_gap': 0.005}},
+    'glpk': {'lp': {},
+             'milp': {'mip_gap': 0.005}},
+    'gurobi': {'lp': {'threads': 1},
+               'milp': {'mip_gap': 0.005}},
+    'highs': {'lp': {'presolve': True},
+              'milp': {'presolve': True, 'mip_gap': 0.005}},
+}
+
+
+def solver_options(solver, options=None, milp=False):
+    r"""
+    Merges the default profile of a solver with user defined options
+    and translates them to solver specific command line options.
+
+    Parameters
+    ----------
+    solver : str
+        Name of the solver, e.g. 'cbc', 'glpk', 'gurobi' or 'highs'.
+
+    options : dict
+        Generic options. Options in the sub-dicts 'lp' and 'milp' only
+        apply to the respective model class and take precedence.
+
+    milp : bool
+        True if the model contains integer variables.
+
+    Returns
+    -------
+    cmdline_options : dict
+        Options to be passed to ``solph.Model.solve``.
+    """
+    model_class = 'milp' if milp else 'lp'
+    options = dict(options or {})
+
+    merged = dict(DEFAULT_PROFILES.get(solver, {}).get(model_class, {}))
+    merged.update({key: value for key, value in options.items()
+                   if key not in ('lp', 'milp')})
+    merged.update(options.get(model_class) or {})
+
+    if not milp:
+        merged.pop('mip_gap', None)
+
+    names = OPTION_NAMES.get(solver, {})
+    cmdline_options = {}
+    for key, value in merged.items():
+        if value is None:
+            continue
+        if key == 'presolve' and solver in PRESOLVE_VALUES:
+            value = PRESOLVE_VALUES[solver][bool(value)]
+        if key in ('mip_gap', 'time_limit', 'threads', 'presolve') \
+                and key not in names:
+            logging.warning(f'Solver {solver} does not support option '
+                            f'{key}. It is ignored.')
+            continue
+        cmdline_options[names.get(key, key)] = value
+
+    return cmdline_options
+
+
+def solver_options_from_parameters(param_value, prefix='solver_'):
+    r"""
+    Collects solver options from a parameter series as used in System A,
+    e.g. the rows 'solver_mip_gap' or 'solver_time_limit'.
+
+    Parameters
+    ----------
+    param_value : pd.Series
+        Parameter values indexed by var_name.
+
+    prefix : str
+        Prefix of the rows holding solver options.
+
+    Returns
+    -------
+    options : dict
+        Generic solver options.
+    """
+    options = {}
+    for key, value in param_value.items():
+        if not isinstance(key, str) or not key.startswith(prefix):
+            continue
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            continue
+        if value != value:  # empty cell
+            continue
+        if value.is_integer() and key != prefix + 'mip_gap':
+            value = int(value)
+        options[key[len(prefix):]] = value
+
+    return options
+
+
+def is_mip(model):
+    r"""
+    Returns True if a pyomo model contains binary or integer variables.
+    """
+    import pyomo.environ as po
+
+    # all elements of an indexed Var share its domain, check the first one
+    for var in model.component_objects(po.Var, active=True):
+        for data in var.values():
+            if data.is_binary() or data.is_integer():
+                return True
+            break
+
+    return False
+
+
+@contextlib.contextmanager
+def record_model_classes():
+    r"""
+    Collects the model classes ('lp', 'milp') of the models solved by
+    :func:`solve_model` inside the context, e.g. by a job of the job queue.
+
+    >>> with record_model_classes() as classes:
+    ...     run_model_thermal(config_path, var_number=3)
+    """
+    classes = []
+    token = _model_classes.set(classes)
+    try:
+        yield classes
+    finally:
+        _model_classes.reset(token)
+
+
+def solve_model(model, solver='cbc', options=None, tee=False, label=None,
+                warmstart=False, **kwargs):
+    r"""
+    Solves a solph.Model with the option profile matching its model class.
+
+    Parameters
+    ----------
+    model : solph.Model
+        Built optimisation model.
+
+    solver : str or list
+        Name of the solver. A list of solvers (or 'race') races them
+        against each other, 'auto' picks the solver that won most races
+        for this model class, see :mod:`race`.
+
+    options : dict
+        Generic solver options, see :func:`solver_options`.
+
+    tee : bool
+        Show solver output.
+
+    label : str
+        Name of the model in the solver race log.
+
+    warmstart : bool
+        Pass the initial values of the variables to the solver, see
+        :mod:`warm_start`. Ignored by solvers without MIP start, a
+        solver race raises a ValueError.
+
+    kwargs
+        Passed to solph.Model.solve, a solver race takes timeout and
+        race_log (see :func:`race.race_solvers`) instead.
+
+    Returns
+    -------
+    solver_results : pyomo results object
+    """
+    milp = is_mip(model)
+    if _model_classes.get() is not None:
+        _model_classes.get().append('milp' if milp else 'lp')
+
+    if solver == 'auto':
+        from .race import best_solver
+        solver = best_solver('milp' if milp else 'lp', label=label)
+    elif solver == 'race':
+        solver = None
+    if solver is None or isinstance(solver, (list, tuple)):
+        from .race import race_solvers
+        if warmstart:
+            raise ValueError('A solver race solves an lp-file, it cannot '
+                             'take a warm start.')
+        race_kwargs = {key: kwargs.pop(key) for key in ['timeout', 'race_log']
+                       if key in kwargs}
+        if kwargs:
+            raise TypeError(f'{", ".join(sorted(kwargs))} not supported by '
+                            'a solver race.')
+        return race_solvers(model, solvers=solver, options=options,
+                            label=label, tee=tee, **race_kwargs)
+
+    cmdline_options = solver_options(solver, options, milp=milp)
+    logging.info('Solve {0} with {1} and options {2}'.format(
+        'MILP' if milp else 'LP', solver, cmdline_options))
+
+    solve_kwargs = dict(kwargs.pop('solve_kwargs', {}))
+    solve_kwargs.setdefault('tee', tee)
+    if warmstart:
+        from .warm_start import warm_start_capable
+        if warm_start_capable(solver):
+            solve_kwargs['warmstart'] = True
+        else:
+            logging.info(f'{solver} does not accept a warm start.')
+
+    return model.solve(solver=solver, solve_kwargs=solve_kwargs,
+                       cmdline_options=cmdline_options, **kwargs)
@@ -0,0 +1,66 @@
+"""
+Import time of the model modules.
+
+Worker processes that only build and solve a model should not load the
+packages of other stages (plotting, demand generation, data access).
+:func:`import_profile` imports a module in a fresh interpreter and
+reports the import time and which of these packages were loaded, also
+after running a stage of the model.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import json
+import subprocess
+import sys
+
+
+HEAVY_MODULES = ['matplotlib', 'oemof_visio', 'oemof.graph', 'networkx',
+                 'demandlib', 'workalendar', 'pygraphviz', 'sqlalchemy']
+
+_PROFILE = """
+import json, sys, time
+sys.path.insert(0, {path!r})
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+{call}
+print(json.dumps({{'seconds': seconds,
+                  'heavy': sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def import_profile(module, path='.', heavy=None, call=None):
+    r"""
+    Imports a module in a new interpreter.
+
+    Parameters
+    ----------
+    module : str
+        Name of the module, e.g. 'model_dessau'.
+
+    path : str
+        Directory of the module.
+
+    heavy : list
+        Packages that should not be loaded, default HEAVY_MODULES.
+
+    call : str
+        Statement run after the import, e.g.
+        "model_dessau.run_model_dessau('debug.yml', 'model_runs/debug')".
+
+    Returns
+    -------
+    profile : dict
+        'seconds' of the import and the 'heavy' packages loaded by the
+        import and the call.
+    """
+    script = _PROFILE.format(path=path, module=module, call=call or '',
+                             heavy=heavy or HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', script], cwd=path,
+                            stdout=subprocess.PIPE, check=True,
+                            universal_newlines=True).stdout
+
+    return json.loads(output.strip().splitlines()[-1])
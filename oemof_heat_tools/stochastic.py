@@ -0,0 +1,196 @@
+"""
+Two-stage stochastic investment models.
+
+The capacities (investment variables, e.g. of CHP, storage_th and
+storage_el) are the first stage and have to be the same in every
+scenario, the dispatch is the second stage and adapts to each scenario,
+e.g. to the negative residual load of one historical year. Minimising
+investment costs plus the expected operating costs gives capacities that
+hedge against all scenarios, which a separate model per scenario does
+not.
+
+The model is solved either as extensive form, i.e. one model holding the
+dispatch of all scenarios, or decomposed by scenario with
+:func:`decomposition.benders`, which solves the scenarios in parallel.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import logging
+
+import pandas as pd
+
+from .decomposition import benders, _invest_variables
+from .solver import solver_options, is_mip
+
+
+def scenarios_from_years(series, timeindex, years=None):
+    r"""
+    Cuts a time series of several years into one profile per year.
+
+    Parameters
+    ----------
+    series : pd.Series
+        Time series with a DatetimeIndex, e.g. the negative residual load
+        of several historical years.
+
+    timeindex : pd.DatetimeIndex
+        Time index of the model. The 29th of February is dropped, years
+        shorter than the time index are skipped.
+
+    years : list
+        Years to use. None uses all years.
+
+    Returns
+    -------
+    scenarios : pd.DataFrame
+        One column per year with the time index of the model.
+    """
+    series = series[~((series.index.month == 2) & (series.index.day == 29))]
+    profiles = {}
+    for year, profile in series.groupby(series.index.year):
+        if years is not None and year not in years:
+            continue
+        if len(profile) < len(timeindex):
+            logging.warning(f'Skip year {year}, it has only {len(profile)} '
+                            'time steps.')
+            continue
+        profiles[year] = profile.values[:len(timeindex)]
+
+    return pd.DataFrame(profiles, index=timeindex)
+
+
+def _probabilities(scenarios, probabilities):
+    if probabilities is None:
+        return {s: 1 / len(scenarios) for s in scenarios}
+    total = sum(probabilities[s] for s in scenarios)
+    if abs(total - 1) > 1e-6:
+        logging.warning(f'Probabilities sum up to {total}, they are '
+                        'normalised.')
+    return {s: probabilities[s] / total for s in scenarios}
+
+
+def extensive_form(build_energysystem, scenarios, probabilities=None):
+    r"""
+    Builds the extensive form: one solph.Model per scenario as block of a
+    common model, their investment variables linked to common
+    capacities and their objectives weighted by probability.
+
+    Returns
+    -------
+    model : pyomo.ConcreteModel
+        The model with the blocks 'scenario_0', 'scenario_1', ... and the
+        first-stage variables 'capacity'.
+
+    models : dict
+        solph.Model per scenario.
+    """
+    import pyomo.environ as po
+    import oemof.solph as solph
+
+    probabilities = _probabilities(scenarios, probabilities)
+    model = po.ConcreteModel()
+    models = {}
+    for n, scenario in enumerate(scenarios):
+        logging.info(f'Build scenario {scenario}')
+        models[scenario] = solph.Model(build_energysystem(scenario))
+        models[scenario].objective.deactivate()
+        model.add_component(f'scenario_{n}', models[scenario])
+
+    variables = {s: _invest_variables(m) for s, m in models.items()}
+    keys = sorted(next(iter(variables.values())))
+    model.INVEST = po.Set(initialize=keys, dimen=2, ordered=True)
+    model.capacity = po.Var(model.INVEST)
+    model.first_stage = po.ConstraintList()
+    for scenario in scenarios:
+        for key in keys:
+            model.first_stage.add(
+                variables[scenario][key] == model.capacity[key])
+
+    # the investment costs are part of every objective and count once as
+    # the probabilities sum up to one
+    model.objective = po.Objective(
+        expr=sum(probabilities[s] * models[s].objective.expr
+                 for s in scenarios),
+        sense=po.minimize)
+
+    return model, models
+
+
+def solve_stochastic(build_energysystem, scenarios, probabilities=None,
+                     solver='cbc', options=None, tee=False, decomposed=False,
+                     processes=None, **kwargs):
+    r"""
+    Solves a two-stage stochastic investment model.
+
+    Parameters
+    ----------
+    build_energysystem : callable
+        Returns the solph.EnergySystem of a scenario.
+
+    scenarios : list
+        Scenarios passed to build_energysystem, e.g. the columns of
+        :func:`scenarios_from_years`.
+
+    probabilities : dict
+        Probability per scenario. None weights all scenarios equally.
+
+    decomposed : bool
+        Solve by Benders decomposition with the scenarios in parallel
+        worker processes instead of the extensive form.
+
+    processes : int
+        Number of worker processes of the decomposition.
+
+    \*\*kwargs :
+        Passed to :func:`decomposition.benders`.
+
+    Returns
+    -------
+    stochastic : dict
+        'invest': first-stage capacities, 'objective': investment plus
+        expected operating costs, 'probabilities', 'scenarios': results
+        dict (keys as strings) per scenario.
+    """
+    import oemof.outputlib as outputlib
+    from pyomo.opt import SolverFactory
+
+    scenarios = list(scenarios)
+    probabilities = _probabilities(scenarios, probabilities)
+
+    if decomposed:
+        decomposition = benders(
+            build_energysystem, scenarios, solver=solver, options=options,
+            processes=processes,
+            weights=[probabilities[s] for s in scenarios], **kwargs)
+        return {'invest': decomposition['invest'],
+                'objective': decomposition['objective'],
+                'probabilities': pd.Series(probabilities),
+                'scenarios': dict(zip(scenarios, decomposition['main']))}
+
+    model, models = extensive_form(build_energysystem, scenarios,
+                                   probabilities)
+    opt = SolverFactory(solver)
+    for key, value in solver_options(solver, options,
+                                     milp=is_mip(model)).items():
+        opt.options[key] = value
+    logging.info(f'Solve the extensive form of {len(scenarios)} scenarios')
+    solver_results = opt.solve(model, tee=tee)
+    termination_condition = \
+        solver_results['Solver'][0]['Termination condition'].key
+    if termination_condition != 'optimal':
+        logging.warning(f'Termination condition: {termination_condition}')
+
+    results = {}
+    for scenario, scenario_model in models.items():
+        scenario_model.es.results = solver_results
+        results[scenario] = outputlib.views.convert_keys_to_strings(
+            outputlib.processing.results(scenario_model))
+
+    return {'invest': pd.Series({k: model.capacity[k].value
+                                 for k in model.INVEST}),
+            'objective': model.objective(),
+            'probabilities': pd.Series(probabilities),
+            'scenarios': results}
@@ -0,0 +1,35 @@
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+from oemof_heat_tools.economies_of_scale import bracket_costs, cost_curve
+
+
+def test_bracket_costs():
+    brackets = [(25, 650), (50, 600), (75, 400), (None, 200)]
+    assert bracket_costs(0, brackets) == 650
+    assert bracket_costs(24.9, brackets) == 650
+    # a size equal to a bound belongs to the next bracket
+    assert bracket_costs(25, brackets) == 600
+    assert bracket_costs(1000, brackets) == 200
+    try:
+        bracket_costs(100, [(25, 650), (50, 600)])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('missing last bracket is not detected')
+
+
+def test_cost_curve():
+    # the curve has a jump at each bound and agrees with bracket_costs
+    brackets = [(25, 1000), (50, 900), (75, 625), (100, 550), (None, 400)]
+    points, costs = cost_curve(brackets, 120)
+    assert points == [0, 25, 25, 50, 50, 75, 75, 100, 100, 120]
+    assert costs == [0, 25000, 22500, 45000, 31250, 46875, 41250, 55000,
+                     40000, 48000]
+    for size in [25, 50, 100, 120]:
+        upper = [c for p, c in zip(points, costs) if p == size][-1]
+        assert upper == size * bracket_costs(size, brackets)
+
+    points, costs = cost_curve(brackets, 40)
+    assert points == [0, 25, 25, 40]
+    assert costs == [0, 25000, 22500, 36000]
@@ -0,0 +1,92 @@
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import hashlib
+import os
+import tempfile
+
+import pandas as pd
+
+from oemof_heat_tools.inputs import (read_csv_cached, shared_frame, file_hash,
+                                     clear_cache, clear_shared)
+
+
+CSV = """timestamp;demand;price;region
+2017-01-01 00:00:00;1.5;30;DE
+2017-01-01 01:00:00;2.0;-5;DE
+2017-01-01 02:00:00;2.5;12;AT
+"""
+
+
+def test_read_csv_cached():
+    # the cached frames equal those of pd.read_csv
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'ts.csv')
+        cache_dir = os.path.join(tmp, 'cache')
+        with open(path, 'w') as f:
+            f.write(CSV)
+
+        for kwargs in [{'sep': ';'},
+                       {'sep': ';', 'index_col': 0, 'parse_dates': True},
+                       {'sep': ';', 'usecols': ['timestamp', 'price']}]:
+            expected = pd.read_csv(path, **kwargs)
+            for _ in range(2):  # conversion and cache
+                pd.testing.assert_frame_equal(
+                    read_csv_cached(path, cache_dir=cache_dir, **kwargs),
+                    expected)
+        pd.testing.assert_frame_equal(
+            read_csv_cached(path, columns=['region', 'demand'],
+                            cache_dir=cache_dir, sep=';', index_col=0),
+            pd.read_csv(path, sep=';', index_col=0)[['region', 'demand']])
+
+        with open(path, 'rb') as f:
+            assert file_hash(path, cache_dir) == \
+                hashlib.sha1(f.read()).hexdigest()
+
+        # a changed file is converted again
+        with open(path, 'a') as f:
+            f.write('2017-01-01 03:00:00;3.0;8;AT\n')
+        with open(path, 'rb') as f:
+            assert file_hash(path, cache_dir) == \
+                hashlib.sha1(f.read()).hexdigest()
+        cached = read_csv_cached(path, cache_dir=cache_dir, sep=';')
+        assert len(cached) == 4
+        pd.testing.assert_frame_equal(cached, pd.read_csv(path, sep=';'))
+
+        assert clear_cache(cache_dir, max_age=1) == 0
+        assert clear_cache(cache_dir) == 5
+        assert [name for name in os.listdir(cache_dir)] == ['hashes.json']
+
+
+def test_shared_frame():
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'ts.csv')
+        shared_dir = os.path.join(tmp, 'shared')
+        cache_dir = os.path.join(tmp, 'cache')
+        with open(path, 'w') as f:
+            f.write(CSV)
+
+        expected = pd.read_csv(path, sep=';')
+        expected = expected[['demand', 'price', 'timestamp', 'region']]
+        expected['price'] = expected['price'].astype(float)
+        for _ in range(2):
+            frame = shared_frame(path, shared_dir, cache_dir, sep=';')
+            pd.testing.assert_frame_equal(frame, expected)
+        assert not frame['demand'].values.flags.writeable
+
+        with open(path, 'a') as f:
+            f.write('2017-01-01 03:00:00;3.0;8;AT\n')
+        assert len(shared_frame(path, shared_dir, cache_dir, sep=';')) == 4
+
+        try:
+            shared_frame(path, shared_dir, cache_dir, sep=';', index_col=0)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('index_col is not rejected')
+
+        del frame
+        assert clear_shared(shared_dir) == 2
+        assert os.listdir(shared_dir) == []
@@ -0,0 +1,51 @@
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import faulthandler
+import os
+import signal
+import time
+
+from oemof_heat_tools.isolation import run_isolated
+
+
+# the functions run by run_isolated are module level, so that they can be
+# passed to the child process
+def _sleep(seconds):
+    time.sleep(seconds)
+
+
+def _allocate(gigabytes):
+    return len(bytearray(int(gigabytes * 1024 ** 3)))
+
+
+def _exit(code):
+    os._exit(code)
+
+
+def _segfault():
+    # no traceback of the fault handler of pytest
+    faulthandler.disable()
+    os.kill(os.getpid(), signal.SIGSEGV)
+
+
+def _raise():
+    raise RuntimeError('broken scenario')
+
+
+def test_isolation_limits():
+    outcome = run_isolated(_allocate, (0.01,), memory_limit=2 * 1024 ** 3)
+    assert outcome == {'status': 'done', 'result': int(0.01 * 1024 ** 3),
+                       'error': None}
+
+    outcome = run_isolated(_sleep, (30,), time_limit=1, grace=1)
+    assert outcome['status'] == 'limit', outcome
+    assert 'time limit' in outcome['error']
+
+    outcome = run_isolated(_allocate, (4,), memory_limit=1024 ** 3)
+    assert outcome['status'] == 'limit', outcome
+
+    # crashes are failures, also with a memory limit
+    for func, args in [(_exit, (3,)), (_segfault, ()), (_raise, ())]:
+        outcome = run_isolated(func, args, memory_limit=1024 ** 3)
+        assert outcome['status'] == 'failed', (func.__name__, outcome)
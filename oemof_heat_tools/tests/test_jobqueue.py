@@ -0,0 +1,54 @@
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import os
+import tempfile
+
+from oemof_heat_tools.jobqueue import open_queue, work
+from oemof_heat_tools.scheduling import (job_features, read_runtime_log,
+                                         runtime_log_path)
+from oemof_heat_tools.solver import record_model_classes, _model_classes
+
+
+def _job(value):
+    # stands in for solve_model of a MILP
+    if _model_classes.get() is not None:
+        _model_classes.get().append('milp')
+    return value
+
+
+def _broken_job():
+    raise RuntimeError('broken scenario')
+
+
+def test_record_model_classes():
+    assert _model_classes.get() is None
+    with record_model_classes() as classes:
+        _job(1)
+        with record_model_classes() as inner:
+            _job(2)
+        assert inner == ['milp']
+    assert classes == ['milp']
+    assert _model_classes.get() is None
+
+
+def test_work():
+    path = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = open_queue('sqlite:///' + os.path.join(tmp, 'jobs.sqlite'))
+        queue.put('a', {'path': path, 'func': 'test_jobqueue:_job',
+                        'args': [1], 'features': job_features('test', 10)})
+        queue.put('b', {'path': path, 'func': 'test_jobqueue:_job',
+                        'args': [2], 'time_limit': 60,
+                        'features': job_features('test', 10)})
+        queue.put('c', {'path': path, 'func': 'test_jobqueue:_broken_job'})
+        assert work(queue) == 4
+        assert queue.counts() == {'done': 2, 'failed': 1}
+        assert [job['result'] for job in queue.jobs('done')] == [1, 2]
+
+        # the workers log the model class of the solved models next to the
+        # queue
+        log = read_runtime_log(runtime_log_path(queue))
+        assert os.path.dirname(runtime_log_path(queue)) == tmp
+        assert [(r['key'], r['model_class']) for r in log] == \
+            [('a', 'milp'), ('b', 'milp')]
@@ -0,0 +1,31 @@
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import os
+import tempfile
+
+from oemof_heat_tools.journal import SweepJournal
+
+
+def test_sweep_journal_resume():
+    # a restarted sweep skips the done scenarios and retries failed ones
+    runs = []
+
+    def scenario(name, fail):
+        runs.append(name)
+        if fail:
+            raise RuntimeError(name)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sweep.json')
+        journal = SweepJournal(path, max_attempts=2)
+        journal.run('a', scenario, 'a', False, output='a.oemof')
+        journal.run('b', scenario, 'b', True)
+        assert runs == ['a', 'b', 'b']
+
+        journal = SweepJournal(path, max_attempts=3)
+        assert journal.pending(['a', 'b']) == ['b']
+        assert journal.run('a', scenario, 'a', False) == 'done'
+        assert journal.run('b', scenario, 'b', False) == 'done'
+        assert runs == ['a', 'b', 'b', 'b']
+        assert journal.output('a') == 'a.oemof'
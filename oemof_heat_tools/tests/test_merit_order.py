@@ -0,0 +1,91 @@
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from oemof_heat_tools.merit_order import (dispatch_system_a, to_results,
+                                          dispatch_costs)
+
+
+PARAM = {
+    'nom_val_neg_residual': 10, 'nom_val_demand_el': 10,
+    'nom_val_demand_th': 10,
+    'nom_val_chp_out_el': 5, 'nom_val_chp_out_th': 10,
+    'conversion_factor_chp_bel': 0.3, 'conversion_factor_chp_bth': 0.5,
+    'conv_factor_full_cond_chp': 0.4,
+    'nom_val_out_boiler': 100, 'conversion_factor_boiler': 0.9,
+    'nom_val_p2h_out_bth': 4, 'conversion_factor_p2h': 1,
+    'nom_capacity_storage_th': 10, 'capacity_loss_storage_th': 0,
+    'init_capacity_storage_th': 0, 'inflow_conv_factor_storage_th': 1,
+    'outflow_conv_factor_storage_th': 1, 'nom_val_input_bth_storage_th': 5,
+    'nom_val_output_bth_storage_th': 5,
+    # no battery
+    'nom_capacity_storage_el': 0, 'capacity_loss_storage_el': 0,
+    'init_capacity_storage_el': 0, 'inflow_conv_factor_storage_el': 1,
+    'outflow_conv_factor_storage_el': 1, 'nom_val_input_bel_storage_el': 0,
+    'nom_val_output_bel_storage_el': 0}
+
+DEMAND_TH = [0.5, 0.1, 0.8]
+DEMAND_EL = [0.2, 0.0, 0.4]
+NEG_RESIDUAL = [0.8, 1.0, 0.0]
+
+
+def test_dispatch_system_a():
+    flows = dispatch_system_a(DEMAND_TH, DEMAND_EL, NEG_RESIDUAL, PARAM)
+    # t0: surplus of 6 runs the P2H unit (4), 2 are excess, the boiler
+    #     covers the rest of the heat demand
+    # t1: spare P2H heat of 3 charges the thermal storage
+    # t2: the electricity-led CHP (4 kW el, 20/3 kW th) and the storage
+    #     cover the heat demand
+    expected = {
+        ('electricity', 'P2H'): [4, 4, 0],
+        ('P2H', 'heat'): [4, 4, 0],
+        ('electricity', 'excess_bel'): [2, 6, 0],
+        ('CHP', 'electricity'): [0, 0, 4],
+        ('CHP', 'heat'): [0, 0, 20 / 3],
+        ('boiler', 'heat'): [1, 0, 0],
+        ('heat', 'storage_th'): [0, 3, 0],
+        ('storage_th', 'heat'): [0, 0, 8 - 20 / 3],
+        ('storage_th', None): [0, 3, 3 - (8 - 20 / 3)],
+        ('heat', 'excess_bth'): [0, 0, 0],
+        ('shortage_bth', 'heat'): [0, 0, 0],
+        ('shortage_bel', 'electricity'): [0, 0, 0],
+        ('natural_gas', 'CHP'): [0, 0, (4 + 0.2 * 20 / 3) / 0.4],
+        ('natural_gas', 'boiler'): [1 / 0.9, 0, 0]}
+    for key, values in expected.items():
+        assert np.allclose(flows[key], values), key
+
+    # the buses are balanced
+    heat_in = (flows[('CHP', 'heat')] + flows[('boiler', 'heat')]
+               + flows[('P2H', 'heat')] + flows[('storage_th', 'heat')]
+               + flows[('shortage_bth', 'heat')])
+    heat_out = (flows[('heat', 'demand_th')] + flows[('heat', 'storage_th')]
+                + flows[('heat', 'excess_bth')])
+    assert np.allclose(heat_in, heat_out)
+
+    costs = dispatch_costs(flows, {('boiler', 'heat'): 2,
+                                   ('electricity', 'excess_bel'): 1})
+    assert np.isclose(costs, 2 * 1 + 8)
+
+
+def test_dispatch_scenarios():
+    # scenarios as columns give the flows of the single dispatches
+    flows = dispatch_system_a(np.column_stack([DEMAND_TH, DEMAND_TH[::-1]]),
+                              np.column_stack([DEMAND_EL, DEMAND_EL[::-1]]),
+                              np.column_stack([NEG_RESIDUAL,
+                                               NEG_RESIDUAL[::-1]]),
+                              PARAM)
+    single = dispatch_system_a(DEMAND_TH[::-1], DEMAND_EL[::-1],
+                               NEG_RESIDUAL[::-1], PARAM)
+    timeindex = pd.date_range('2017-01-01', periods=3, freq='60min')
+    results = to_results(flows, timeindex, scenario=1)
+    for key, values in single.items():
+        column = 'capacity' if key[1] is None else 'flow'
+        assert np.allclose(results[key]['sequences'][column], values), key
+
+    with pytest.raises(ValueError):
+        to_results(flows, timeindex)
+    results = to_results(single, timeindex)
+    assert list(results[('storage_th', None)]['sequences']) == ['capacity']
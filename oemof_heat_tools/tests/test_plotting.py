@@ -0,0 +1,37 @@
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import numpy as np
+import pandas as pd
+
+from oemof_heat_tools.plotting import downsample
+
+
+def test_downsample_keeps_order_of_extremes():
+    # a ramp up and down stays a ramp up and down
+    index = pd.date_range('2017-01-01', periods=20, freq='60min')
+    series = pd.Series(list(range(10)) + list(range(9, -1, -1)), index=index)
+    downsampled = downsample(series, 4)
+    assert downsampled.tolist() == [0, 9, 9, 0]
+    assert list(downsampled.index) == [index[0], index[9], index[10],
+                                       index[19]]
+    assert downsample(series, 20) is series
+
+
+def test_downsample_whole_time_steps():
+    # the columns of a downsampled frame are rows of the data
+    rng = np.random.RandomState(0)
+    frame = pd.DataFrame(rng.rand(1000, 3), columns=['a', 'b', 'c'])
+    for total in [False, True]:
+        downsampled = downsample(frame, 120, total=total)
+        assert len(downsampled) <= 120
+        assert downsampled.index.is_monotonic_increasing
+        pd.testing.assert_frame_equal(downsampled,
+                                      frame.loc[downsampled.index])
+
+    # the peaks of every column are kept
+    downsampled = downsample(frame, 120)
+    assert (downsampled.max() == frame.max()).all()
+    assert (downsampled.min() == frame.min()).all()
+    total = downsample(frame, 120, total=True).sum(axis=1)
+    assert total.max() == frame.sum(axis=1).max()
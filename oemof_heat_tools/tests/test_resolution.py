@@ -0,0 +1,58 @@
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import numpy as np
+import pandas as pd
+
+from oemof_heat_tools.resolution import (hours_per_step, create_timeindex,
+                                         resample, scale_capacity_loss,
+                                         scale_gradient)
+
+
+def hourly_profile():
+    # two days of hourly powers and energies
+    rng = np.random.RandomState(0)
+    index = create_timeindex('1/1/2017', 48)
+    return pd.DataFrame({'power': rng.rand(48) * 100,
+                         'energy': rng.rand(48) * 10,
+                         'name': 'a'}, index=index)
+
+
+def test_hours_per_step():
+    assert hours_per_step('15min') == 0.25
+    assert hours_per_step('H') == 1
+    assert hours_per_step('2H') == 2
+    assert hours_per_step('D') == 24
+    assert len(create_timeindex('1/1/2017', 24, '15min')) == 96
+    assert len(create_timeindex('1/1/2017', 48, 'D')) == 2
+
+
+def test_resample_keeps_energy():
+    data = hourly_profile()
+    for resolution in ['15min', 'H', '2H', 'D']:
+        hours = hours_per_step(resolution)
+        power = resample(data['power'], resolution, kind='mean')
+        energy = resample(data['energy'], resolution, kind='sum')
+        assert len(power) == 48 / hours, resolution
+        assert np.isclose(power.sum() * hours, data['power'].sum()), resolution
+        assert np.isclose(energy.sum(), data['energy'].sum()), resolution
+        # the peak is kept by finer steps
+        if hours < 1:
+            assert power.max() == data['power'].max()
+
+    # non-numeric columns are dropped, a RangeIndex gets hourly time steps
+    frame = resample(data.reset_index(drop=True), '2H')
+    assert list(frame.columns) == ['power', 'energy']
+    assert frame.index[1] - frame.index[0] == pd.Timedelta(hours=2)
+
+
+def test_scale_per_step():
+    # the loss of one step at '2H' equals two hourly losses, four steps at
+    # '15min' one hourly loss
+    loss = 0.01
+    assert np.isclose(1 - scale_capacity_loss(loss, '2H'), (1 - loss) ** 2)
+    assert np.isclose((1 - scale_capacity_loss(loss, '15min')) ** 4, 1 - loss)
+    assert np.isclose(scale_capacity_loss(loss, 'H'), loss)
+
+    assert scale_gradient(0.2, '15min') == 0.05
+    assert scale_gradient(0.2, 'D') == 1
@@ -0,0 +1,105 @@
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import pandas as pd
+import pytest
+
+from oemof_heat_tools.results import Results
+
+
+class Node:
+    # stands in for the nodes of a solph.EnergySystem
+    def __init__(self, label):
+        self.label = label
+
+    def __str__(self):
+        return self.label
+
+
+def results_dict():
+    index = pd.date_range('2017-01-01', periods=3, freq='60min')
+    boiler, thermal = Node('boiler'), Node('thermal')
+    storage, demand, chp = Node('storage'), Node('demand'), Node('chp')
+    return {
+        (boiler, thermal): {
+            'sequences': pd.DataFrame({'flow': [1., 2., 3.]}, index=index),
+            'scalars': pd.Series({'invest': 10.})},
+        (thermal, storage): {
+            'sequences': pd.DataFrame({'flow': [0., 1., 0.]}, index=index),
+            'scalars': pd.Series(dtype=float)},
+        (storage, None): {
+            'sequences': pd.DataFrame({'capacity': [5., 6., 6.]},
+                                      index=index),
+            'scalars': pd.Series({'invest': 20.})},
+        (thermal, demand): {
+            'sequences': pd.DataFrame({'flow': [1., 1., 3.]}, index=index),
+            'scalars': pd.Series(dtype=float)},
+        # scalars only, e.g. the parameters of a node
+        (chp, None): {
+            'sequences': pd.DataFrame(),
+            'scalars': pd.Series({'efficiency': 0.4})}}
+
+
+def test_results_access():
+    res = Results(results_dict())
+    assert res.keys() == [('boiler', 'thermal'), ('chp', 'None'),
+                          ('storage', 'None'), ('thermal', 'demand'),
+                          ('thermal', 'storage')]
+    assert ('storage', 'None') in res
+    assert res.flow('boiler', 'thermal').tolist() == [1., 2., 3.]
+    assert res.flow('storage', 'None', 'capacity').tolist() == [5., 6., 6.]
+
+    storage = res[('storage', 'None')]
+    assert storage['scalars'].to_dict() == {'invest': 20.}
+    assert list(storage['sequences'].columns) == ['capacity']
+    chp = res[('chp', 'None')]
+    assert chp['sequences'].empty
+    assert chp['scalars'].to_dict() == {'efficiency': 0.4}
+    with pytest.raises(KeyError):
+        res[('boiler', 'demand')]
+
+    thermal = res.node('thermal')
+    assert sorted(thermal['sequences'].columns) == [
+        (('boiler', 'thermal'), 'flow'), (('thermal', 'demand'), 'flow'),
+        (('thermal', 'storage'), 'flow')]
+    assert thermal['scalars'].to_dict() == {(('boiler', 'thermal'),
+                                             'invest'): 10.}
+    assert 'sequences' not in res.node('chp')
+
+
+def test_results_like_views():
+    # the same frames as outputlib.views
+    views = pytest.importorskip('oemof.outputlib.views')
+    results = results_dict()
+    res = Results(results)
+
+    converted = views.convert_keys_to_strings(results)
+    assert sorted(converted) == res.keys()
+    for key, expected in converted.items():
+        if not expected['sequences'].empty:
+            pd.testing.assert_frame_equal(
+                res[key]['sequences'], expected['sequences'],
+                check_names=False)
+        if expected['scalars'].empty:
+            assert res[key]['scalars'].empty
+        else:
+            pd.testing.assert_series_equal(
+                res[key]['scalars'].sort_index(),
+                expected['scalars'].sort_index(), check_names=False)
+        if 'flow' in expected['sequences']:
+            pd.testing.assert_series_equal(
+                res.flow(*key), expected['sequences']['flow'],
+                check_names=False)
+
+    for label in ['boiler', 'thermal', 'storage', 'chp']:
+        expected = views.node(results, label)
+        node = res.node(label)
+        assert sorted(node) == sorted(expected)
+        if 'sequences' in expected:
+            pd.testing.assert_frame_equal(
+                node['sequences'].sort_index(axis=1),
+                expected['sequences'].sort_index(axis=1), check_names=False)
+        if 'scalars' in expected:
+            pd.testing.assert_series_equal(
+                node['scalars'].sort_index(),
+                expected['scalars'].sort_index(), check_names=False)
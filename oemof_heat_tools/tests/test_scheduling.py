@@ -0,0 +1,39 @@
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+from oemof_heat_tools.scheduling import (job_features, estimate_runtime,
+                                         longest_first, SECONDS_PER_STEP)
+
+
+def test_estimate_runtime():
+    history = [
+        {'label': 'dessau', 'model_class': 'lp', 'size': '100', 'runtime': '2'},
+        {'label': 'dessau', 'model_class': 'lp', 'size': '200', 'runtime': '6'},
+        {'label': 'dessau', 'model_class': 'lp', 'size': '100', 'runtime': '3'},
+        {'label': 'oman', 'model_class': 'milp', 'size': '10', 'runtime': '50'},
+        {'label': 'oman', 'model_class': 'milp', 'size': '10', 'runtime': ''}]
+    # median runtime per step of the label
+    assert abs(estimate_runtime(job_features('dessau', 1000, 'lp'),
+                                history) - 30) < 1e-9
+    # other label of the same class
+    assert estimate_runtime(job_features('new', 10, 'milp'), history) == 50
+    # model class logged for the label
+    assert estimate_runtime(job_features('oman', 20), history) == 100
+    # no history
+    assert estimate_runtime(job_features('new', 100, 'lp'), []) \
+        == 100 * SECONDS_PER_STEP['lp']
+    assert estimate_runtime(job_features('new', 100), []) \
+        == 100 * SECONDS_PER_STEP['lp']
+
+
+def test_longest_first():
+    history = [
+        {'label': 'oman', 'model_class': 'milp', 'size': '10', 'runtime': '50'}]
+    jobs = [('short', {'features': job_features('dessau', 100, 'lp')}),
+            ('none', {}),
+            ('long', {'features': job_features('oman', 10)}),
+            ('middle', {'features': job_features('dessau', 5, 'milp')})]
+    ordered = longest_first(jobs, history)
+    assert [key for key, _ in ordered] == ['long', 'middle', 'short', 'none']
+    assert ordered[0][1]['predicted'] == 50
+    assert 'predicted' not in ordered[-1][1]
@@ -0,0 +1,47 @@
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import pandas as pd
+import pytest
+
+from oemof_heat_tools.solver import (solver_options,
+                                     solver_options_from_parameters)
+
+
+@pytest.mark.parametrize('solver, options, milp, expected', [
+    # default profiles
+    ('cbc', None, False, {'presolve': 'on'}),
+    ('cbc', None, True, {'presolve': 'on', 'ratioGap': 0.005}),
+    ('glpk', None, True, {'mipgap': 0.005}),
+    ('gurobi', None, False, {'Threads': 1}),
+    ('unknown', None, True, {}),
+    # user options are merged into the profile
+    ('cbc', {'time_limit': 60}, False, {'presolve': 'on', 'sec': 60}),
+    ('gurobi', {'presolve': False}, True,
+     {'MIPGap': 0.005, 'Presolve': 0}),
+    ('highs', {'presolve': None}, False, {}),
+    # options of the model class take precedence
+    ('cbc', {'mip_gap': 0.01, 'milp': {'mip_gap': 0.02}}, True,
+     {'presolve': 'on', 'ratioGap': 0.02}),
+    ('highs', {'threads': 2, 'lp': {'threads': 4}, 'milp': {'threads': 8}},
+     False, {'presolve': 'on', 'threads': 4}),
+    # mip_gap only applies to MILPs
+    ('gurobi', {'mip_gap': 0.01}, False, {'Threads': 1}),
+    # unsupported generic options are dropped, others passed unchanged
+    ('glpk', {'threads': 2, 'presolve': True, 'nomip': True}, False,
+     {'nomip': True}),
+])
+def test_solver_options(solver, options, milp, expected):
+    assert solver_options(solver, options, milp) == expected
+
+
+def test_solver_options_from_parameters():
+    param_value = pd.Series({'solver_mip_gap': '1', 'solver_time_limit': 60.0,
+                             'solver_threads': float('nan'),
+                             'solver_presolve': 'yes', 'price_gas': 30})
+    options = solver_options_from_parameters(param_value)
+    assert options == {'mip_gap': 1.0, 'time_limit': 60}
+    assert isinstance(options['mip_gap'], float)
+    assert isinstance(options['time_limit'], int)
+    assert solver_options('cbc', options, milp=True) == {
+        'presolve': 'on', 'ratioGap': 1.0, 'sec': 60}
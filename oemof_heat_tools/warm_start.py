@@ -0,0 +1,165 @@
+"""
+Warm start a solph.Model from a previous solution.
+
+The previous solution is a results dict as created by
+``outputlib.processing.results`` and stored in the dumps, e.g. of a run
+with fewer time steps or of the neighbouring point of a sweep. Nodes are
+matched by their label, so the solution can stem from another energy
+system object with the same components.
+
+The values are set as initial values of the variables. Solvers that
+support it (cbc, gurobi, cplex) use them as MIP start. Optionally the
+investment variables are fixed or restricted to a window around the
+previous solution.
+
+"""
+
+__copyright__ = "Reiner Lemoine Institut"
+__license__ = "GPLv3"
+
+import logging
+
+
+def _label(node):
+    return 'None' if node is None else str(node)
+
+
+def _get_var(model, block, var):
+    block = getattr(model, block, None)
+    if block is None:
+        return None
+    return getattr(block, var, None)
+
+
+def _invest_vars(model, n1, n2):
+    r"""
+    Returns the investment variable of a flow or storage, if any.
+    """
+    if n2 is None:
+        invest = _get_var(model, 'GenericInvestmentStorageBlock', 'invest')
+        key = n1
+    else:
+        invest = _get_var(model, 'InvestmentFlow', 'invest')
+        key = (n1, n2)
+    if invest is None or key not in invest:
+        return None
+    return invest[key]
+
+
+def _storage_capacity(model, node):
+    for block in ('GenericStorageBlock', 'GenericInvestmentStorageBlock'):
+        capacity = _get_var(model, block, 'capacity')
+        if capacity is not None and (node, 0) in capacity:
+            return capacity
+    return None
+
+
+def apply_warm_start(model, results, fix_invest=False, invest_window=None):
+    r"""
+    Sets the values of a previous solution as initial values of a model.
+
+    Parameters
+    ----------
+    model : solph.Model
+        Built optimisation model.
+
+    results : dict
+        Results dict of a previous run (energysystem.results['main']).
+
+    fix_invest : bool
+        Fix the investment variables to their previous value.
+
+    invest_window : float
+        Restrict the investment variables to previous value * (1 +- window),
+        e.g. 0.2. Ignored if fix_invest is True and for investments that
+        were 0 in the previous solution, they keep their bounds.
+
+    Returns
+    -------
+    count : int
+        Number of variables with an initial value.
+
+    Raises
+    ------
+    ValueError
+        If the previous solution has another number of time steps (e.g.
+        another resolution), its values would be set at the wrong times.
+    """
+    nodes = {_label(node): node for node in model.es.nodes}
+    nodes['None'] = None
+    timesteps = list(model.TIMESTEPS)
+    count = 0
+
+    for (n1, n2), res in results.items():
+        try:
+            node_1, node_2 = nodes[_label(n1)], nodes[_label(n2)]
+        except KeyError:
+            continue
+
+        sequences = res.get('sequences')
+        if sequences is not None and len(sequences) \
+                and len(sequences) != len(timesteps):
+            raise ValueError(
+                f'The previous solution has {len(sequences)} time steps, '
+                f'the model {len(timesteps)}.')
+        if sequences is not None:
+            if 'flow' in sequences and node_2 is not None:
+                var, keys = model.flow, [(node_1, node_2, t) for t in timesteps]
+                values = sequences['flow'].values
+            elif 'capacity' in sequences and node_2 is None:
+                var = _storage_capacity(model, node_1)
+                keys = [(node_1, t) for t in timesteps]
+                values = sequences['capacity'].values
+            else:
+                var = None
+            if var is not None:
+                for key, value in zip(keys, values):
+                    if key in var:
+                        var[key].value = value
+                        count += 1
+
+        scalars = res.get('scalars')
+        if scalars is None or 'invest' not in scalars:
+            continue
+        invest = _invest_vars(model, node_1, node_2)
+        if invest is None:
+            continue
+        value = scalars['invest']
+        invest.value = value
+        count += 1
+        if fix_invest:
+            invest.fix(value)
+        elif invest_window is not None and value > 0:
+            lb, ub = invest.lb, invest.ub
+            new_lb = value * (1 - invest_window)
+            new_ub = value * (1 + invest_window)
+            invest.setlb(new_lb if lb is None else max(lb, new_lb))
+            invest.setub(new_ub if ub is None else min(ub, new_ub))
+
+    logging.info(f'Warm start: initial values for {count} variables.')
+
+    return count
+
+
+def warm_start_capable(solver):
+    r"""
+    Returns True if the solver accepts the initial values as MIP start.
+    """
+    from pyomo.opt import SolverFactory
+
+    try:
+        return SolverFactory(solver).warm_start_capable()
+    except Exception:
+        return False
+
+
+def restore_results(dpath, filename):
+    r"""
+    Restores the results of a dumped energy system.
+    """
+    import oemof.solph as solph
+
+    energysystem = solph.EnergySystem()
+    energysystem.restore(dpath=dpath, filename=filename)
+
+    return energysystem.results['main']